@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+外部API呼び出し台帳
+- get_me / create_tweet / ChatCompletion などの全呼び出しを記録（エンドポイント・所要時間・結果・OpenAIトークン数）
+- 呼び出し1件ごとにJSONLへ追記し、月別集計は別ファイルに保持（監視ツールは集計のみ読み込み）
+- config.API_BUDGETS の月間予算（リクエスト数・トークン数）を超える呼び出しは実行前に拒否
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, Callable, Optional
+
+from clock import SystemClock
+from config import API_BUDGETS
+
+
+class BudgetExceeded(Exception):
+    """月間予算超過による呼び出し拒否"""
+
+    def __init__(self, endpoint: str, kind: str, used: int, limit: int):
+        self.endpoint = endpoint
+        self.kind = kind
+        self.used = used
+        self.limit = limit
+        super().__init__(f"{endpoint} の月間{kind}予算超過 ({used}/{limit})")
+
+
+def empty_totals() -> Dict[str, Any]:
+    """エンドポイント1件分の月間集計初期値"""
+    return {'requests': 0, 'errors': 0, 'refused': 0, 'prompt_tokens': 0,
+            'completion_tokens': 0, 'total_tokens': 0, 'latency_sum': 0.0}
+
+
+def response_usage(response: Any) -> Dict[str, int]:
+    """OpenAI応答のトークン使用量（ストリーミング生成は受信済みの StreamResult.usage、usage がない応答は空）"""
+    usage = getattr(response, 'usage', None)
+    if usage is None:
+        return {}
+    return {key: int(usage.get(key, 0)) for key in ('prompt_tokens', 'completion_tokens', 'total_tokens')}
+
+
+class ApiLedger:
+    """外部API呼び出し台帳＋月間予算管理"""
+
+    def __init__(self, ledger_file: str = 'api_ledger.jsonl', summary_file: str = 'api_ledger_summary.json',
+                 budgets: Optional[Dict[str, Dict[str, int]]] = None, clock: Optional[SystemClock] = None):
+        self.ledger_file = ledger_file
+        self.summary_file = summary_file
+        self.budgets = API_BUDGETS if budgets is None else budgets
+        self.clock = clock or SystemClock()
+        self.lock = threading.Lock()
+        self.summary = self.load()
+
+    def load(self) -> Dict[str, Any]:
+        """月別集計読み込み"""
+        try:
+            with open(self.summary_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {'months': {}}
+
+    def save(self) -> None:
+        """月別集計保存（一時ファイル経由で置換）"""
+        tmp_file = f"{self.summary_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.summary, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, self.summary_file)
+
+    def totals(self, endpoint: str, month: Optional[str] = None) -> Dict[str, Any]:
+        """エンドポイントの月間集計"""
+        month = month or self.clock.now().strftime('%Y-%m')
+        return self.summary['months'].get(month, {}).get(endpoint, empty_totals())
+
+    def check(self, endpoint: str, estimated_tokens: int = 0) -> None:
+        """月間予算の事前確認（超過する場合は BudgetExceeded）"""
+        budget = self.budgets.get(endpoint)
+        if not budget:
+            return
+
+        totals = self.totals(endpoint)
+        request_limit = budget.get('monthly_requests')
+        if request_limit is not None and totals['requests'] + 1 > request_limit:
+            self.refuse(endpoint)
+            raise BudgetExceeded(endpoint, 'リクエスト', totals['requests'], request_limit)
+
+        token_limit = budget.get('monthly_tokens')
+        if token_limit is not None and totals['total_tokens'] + estimated_tokens > token_limit:
+            self.refuse(endpoint)
+            raise BudgetExceeded(endpoint, 'トークン', totals['total_tokens'], token_limit)
+
+    def call(self, endpoint: str, func: Callable[..., Any], *args: Any, account: Optional[str] = None,
+             estimated_tokens: int = 0, **kwargs: Any) -> Any:
+        """予算確認の上で呼び出し、結果を記録（例外はそのまま再送出）"""
+        self.check(endpoint, estimated_tokens)
+
+        started = time.perf_counter()
+        try:
+            response = func(*args, **kwargs)
+        except Exception as e:
+            self.record(endpoint, time.perf_counter() - started, type(e).__name__, account)
+            raise
+
+        self.record(endpoint, time.perf_counter() - started, 'ok', account, response_usage(response))
+        return response
+
+    def record(self, endpoint: str, latency: float, status: str, account: Optional[str] = None,
+               usage: Optional[Dict[str, int]] = None) -> None:
+        """呼び出し1件を記録（台帳追記と月別集計更新）"""
+        usage = usage or {}
+        now = self.clock.now()
+        entry = {
+            'timestamp': now.isoformat(),
+            'endpoint': endpoint,
+            'account': account,
+            'status': status,
+            'latency_ms': round(latency * 1000, 1),
+        }
+        entry.update(usage)
+
+        with self.lock:
+            with open(self.ledger_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+            totals = self.month_totals(now.strftime('%Y-%m'), endpoint)
+            totals['requests'] += 1
+            if status != 'ok':
+                totals['errors'] += 1
+            for key, value in usage.items():
+                totals[key] += value
+            totals['latency_sum'] = round(totals['latency_sum'] + latency, 3)
+            self.save()
+
+    def refuse(self, endpoint: str) -> None:
+        """予算超過で拒否した件数を記録"""
+        with self.lock:
+            self.month_totals(self.clock.now().strftime('%Y-%m'), endpoint)['refused'] += 1
+            self.save()
+
+    def month_totals(self, month: str, endpoint: str) -> Dict[str, Any]:
+        """月別集計の該当エントリ（なければ作成）"""
+        return self.summary['months'].setdefault(month, {}).setdefault(endpoint, empty_totals())
+
+    def report(self, month: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """エンドポイント別の月間使用量と予算比"""
+        month = month or self.clock.now().strftime('%Y-%m')
+        endpoints = set(self.summary['months'].get(month, {})) | set(self.budgets)
+        result = {}
+        for endpoint in sorted(endpoints):
+            totals = self.totals(endpoint, month)
+            budget = self.budgets.get(endpoint, {})
+            requests = totals['requests']
+            result[endpoint] = dict(
+                totals,
+                avg_latency_ms=round(totals['latency_sum'] / requests * 1000, 1) if requests else 0.0,
+                request_budget=budget.get('monthly_requests'),
+                token_budget=budget.get('monthly_tokens')
+            )
+        return result
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+非同期投稿パイプライン
+- 生成 → 品質・重複ゲート → 投稿 の3段を有界キューで接続
+- 投稿しなかった基準達成コンテンツ（停止・制限到達・レート制限・投稿失敗）はプールに戻す（重複ストアへの記録は投稿成功時のみ）
+- 次枠の生成を現在枠の投稿と並行して実行（キュー容量でバックプレッシャー）
+- ブロッキングなAPI呼び出し・ストアI/Oはスレッドに逃がし、イベントループを止めない
+- 複数アカウントのパイプラインを1プロセス・1イベントループで並行実行可能
+"""
+
+import asyncio
+from typing import Any, List, Optional
+
+# 段の終了を下流に伝える番兵
+END_OF_STREAM = None
+
+
+class AsyncPostingPipeline:
+    """1アカウント分の非同期投稿パイプライン"""
+
+    def __init__(self, bot, slots: int = 1, queue_size: int = 2, interval: Optional[float] = None):
+        self.bot = bot
+        self.slots = slots
+        self.queue_size = queue_size
+        self.interval = bot.MIN_INTERVAL if interval is None else interval
+        self.logger = bot.logger
+
+    async def generate_stage(self, out_queue: asyncio.Queue, stop: asyncio.Event) -> None:
+        """コンテンツ取得（プール優先、空なら生成）"""
+        for slot in range(self.slots):
+            if stop.is_set():
+                break
+            try:
+                content_data = await asyncio.to_thread(self.bot.acquire_content)
+            except Exception as e:
+                self.logger.error(f"❌ パイプライン生成エラー (枠{slot + 1}): {e}")
+                continue
+            await out_queue.put(content_data)
+        await out_queue.put(END_OF_STREAM)
+
+    async def gate_stage(self, in_queue: asyncio.Queue, out_queue: asyncio.Queue, stop: asyncio.Event) -> None:
+        """品質・重複ゲート（停止後に届いた未判定コンテンツはプールに戻す）"""
+        while True:
+            content_data = await in_queue.get()
+            if content_data is END_OF_STREAM:
+                break
+            if stop.is_set():
+                await asyncio.to_thread(self.bot.return_to_pool, content_data)
+                continue
+            try:
+                passed = await asyncio.to_thread(self.bot.gate_content, content_data)
+            except Exception as e:
+                self.logger.error(f"❌ パイプライン判定エラー: {e}")
+                continue
+            if passed:
+                await out_queue.put(content_data)
+        await out_queue.put(END_OF_STREAM)
+
+    async def post_stage(self, in_queue: asyncio.Queue, stop: asyncio.Event) -> List[bool]:
+        """投稿（投稿間隔・制限チェック込み、制限到達で上流を停止）"""
+        loop = asyncio.get_running_loop()
+        results: List[bool] = []
+        last_post: Optional[float] = None
+
+        while True:
+            content_data = await in_queue.get()
+            if content_data is END_OF_STREAM:
+                break
+            if stop.is_set():
+                await asyncio.to_thread(self.bot.return_to_pool, content_data)
+                continue
+
+            if last_post is not None:
+                delay = self.interval - (loop.time() - last_post)
+                if delay > 0:
+                    self.logger.info(f"⏳ 次枠まで待機: {delay:.0f}秒")
+                    await asyncio.sleep(delay)
+
+            if not await asyncio.to_thread(self.bot.check_posting_limits):
+                stop.set()
+                await asyncio.to_thread(self.bot.return_to_pool, content_data)
+                continue
+
+            # ゲート通過後に投稿された内容との重複を再確認（先行コンテンツの投稿で重複になる場合）
+            if not await asyncio.to_thread(self.bot.gate_content, content_data):
+                continue
+
+            success = await asyncio.to_thread(self.bot.post_content, content_data)
+            results.append(success)
+            if success:
+                last_post = loop.time()
+                continue
+
+            # 投稿できなかったコンテンツはプールに戻す（レート制限時は残り枠も次回実行に回す）
+            await asyncio.to_thread(self.bot.return_to_pool, content_data)
+            if self.bot.next_allowed_at:
+                stop.set()
+
+        return results
+
+    async def run(self) -> List[bool]:
+        """パイプライン実行（投稿試行毎の成否を返す）"""
+        if not await asyncio.to_thread(self.bot.check_posting_limits):
+            self.logger.info("🛑 投稿制限により実行終了")
+            return []
+
+        stop = asyncio.Event()
+        generated: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        gated: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+
+        _, _, results = await asyncio.gather(
+            self.generate_stage(generated, stop),
+            self.gate_stage(generated, gated, stop),
+            self.post_stage(gated, stop)
+        )
+
+        self.logger.info(f"🎉 パイプライン完了: 投稿 {sum(results)}/{self.slots}枠")
+        return results
+
+
+async def run_pipelines(bots: List[Any], slots: int = 1, queue_size: int = 2) -> List[List[bool]]:
+    """複数アカウントのパイプラインを並行実行"""
+    return await asyncio.gather(*(
+        AsyncPostingPipeline(bot, slots=slots, queue_size=queue_size).run()
+        for bot in bots
+    ))
+
+
+def run_pipeline(bot, slots: int = 1, queue_size: int = 2, interval: Optional[float] = None) -> List[bool]:
+    """同期呼び出し用ラッパー"""
+    return asyncio.run(AsyncPostingPipeline(bot, slots=slots, queue_size=queue_size, interval=interval).run())
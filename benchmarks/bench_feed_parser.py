@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+フィードパーサー ベンチマーク
+- 大容量RSS/Atomフィクスチャでストリーミング解析とfeedparserを比較
+- 先頭N件の抽出結果が一致することも確認
+
+使い方: python benchmarks/bench_feed_parser.py [--items 2000] [--limit 5] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from feed_parser import parse_feed_stream, parse_with_feedparser  # noqa: E402
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+CHUNK_SIZE = 16384
+
+
+def build_rss(items: int) -> bytes:
+    """大容量RSS 2.0フィクスチャ生成（本文付き）"""
+    body = "<p>GPUアクセラレーションによる生成AIの最新動向。</p>" * 40
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/">',
+        '<channel><title>Benchmark Blog</title><link>https://example.com/</link>',
+    ]
+    for i in range(items):
+        parts.append(
+            f'<item><title>記事 {i}: 生成AIアップデート</title>'
+            f'<link>https://example.com/posts/{i}</link>'
+            f'<pubDate>Mon, 06 May 2024 10:{i % 60:02d}:00 +0000</pubDate>'
+            f'<description>概要 {i}</description>'
+            f'<content:encoded><![CDATA[{body}]]></content:encoded></item>'
+        )
+    parts.append('</channel></rss>')
+    return '\n'.join(parts).encode('utf-8')
+
+
+def build_atom(items: int) -> bytes:
+    """大容量Atomフィクスチャ生成（本文付き）"""
+    body = "&lt;p&gt;拡散モデルの推論最適化について。&lt;/p&gt;" * 40
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<feed xmlns="http://www.w3.org/2005/Atom"><title>Benchmark Atom</title>',
+    ]
+    for i in range(items):
+        parts.append(
+            f'<entry><title>エントリ {i}</title>'
+            f'<link rel="alternate" href="https://example.com/atom/{i}"/>'
+            f'<published>2024-05-06T10:{i % 60:02d}:00Z</published>'
+            f'<content type="html">{body}</content></entry>'
+        )
+    parts.append('</feed>')
+    return '\n'.join(parts).encode('utf-8')
+
+
+def build_malformed(items: int) -> bytes:
+    """不正XMLフィクスチャ（未定義実体参照）"""
+    return build_rss(items).replace('概要'.encode('utf-8'), '&nbsp;概要'.encode('utf-8'))
+
+
+def load_fixture(name: str, builder, items: int) -> bytes:
+    """fixtures/ に記録済みならそれを使用、なければ生成"""
+    path = os.path.join(FIXTURE_DIR, f"{name}.xml")
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            return f.read()
+    return builder(items)
+
+
+def chunked(data: bytes):
+    """ネットワーク受信を模したチャンク列"""
+    for start in range(0, len(data), CHUNK_SIZE):
+        yield data[start:start + CHUNK_SIZE]
+
+
+def measure(func, repeat: int) -> float:
+    """最良実行時間（ミリ秒）"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='フィードパーサー ベンチマーク')
+    parser.add_argument('--items', type=int, default=2000)
+    parser.add_argument('--limit', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    fixtures = {
+        'large_rss': load_fixture('large_rss', build_rss, args.items),
+        'large_atom': load_fixture('large_atom', build_atom, args.items),
+        'malformed_rss': load_fixture('malformed_rss', build_malformed, args.items),
+    }
+
+    results = {}
+    for name, data in fixtures.items():
+        streaming = parse_feed_stream(chunked(data), args.limit)
+        reference = parse_with_feedparser(data, args.limit)
+
+        stream_ms = measure(lambda: parse_feed_stream(chunked(data), args.limit), args.repeat)
+        feedparser_ms = measure(lambda: parse_with_feedparser(data, args.limit), args.repeat)
+
+        results[name] = {
+            'bytes': len(data),
+            'streaming_ms': round(stream_ms, 3),
+            'feedparser_ms': round(feedparser_ms, 3),
+            'speedup': round(feedparser_ms / stream_ms, 1) if stream_ms else None,
+            'titles_match': [e['title'] for e in streaming] == [e['title'] for e in reference],
+            'links_match': [e['link'] for e in streaming] == [e['link'] for e in reference],
+        }
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+品質スコア ベンチマーク
+- 10万件の候補を採点し、従来実装（キーワード毎の部分文字列走査）と比較
+- 全件でスコアが一致することを確認
+
+使い方: python benchmarks/bench_quality_score.py [--count 100000]
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from quality_scorer import (  # noqa: E402
+    QualityScorer, CONCRETE_WORDS, ACTION_WORDS, VALUE_WORDS, STRUCTURE_CHARS
+)
+
+KEYWORDS = CONCRETE_WORDS + ACTION_WORDS + VALUE_WORDS + STRUCTURE_CHARS + ["30", "5"]
+FILLER = list("会議前に今日決めることをホワイトボードへ書く議論が脱線した時の軌道修正が劇的に早くなる"
+              "毎朝分間で最重要タスクを決定する習慣他の緊急追われても必ず完了達成感と成長実感段違い")
+
+
+def legacy_score(content, topic_info):
+    """従来のcalculate_quality_score（比較用の複製）"""
+    score = 0.6
+    concrete_count = sum(1 for word in CONCRETE_WORDS if word in content)
+    if concrete_count >= 3:
+        score += 0.15
+    elif concrete_count >= 2:
+        score += 0.1
+    elif concrete_count >= 1:
+        score += 0.05
+    if sum(1 for word in ACTION_WORDS if word in content) >= 2:
+        score += 0.1
+    elif any(word in content for word in ACTION_WORDS):
+        score += 0.05
+    if any(word in content for word in VALUE_WORDS):
+        score += 0.1
+    if re.search(r'\d+', content):
+        score += 0.03
+    if any(char in content for char in STRUCTURE_CHARS):
+        score += 0.02
+    content_length = len(content)
+    if 90 <= content_length <= 180:
+        score += 0.05
+    elif 70 <= content_length <= 220:
+        score += 0.03
+    final_score = score * topic_info.get('quality_multiplier', 1.0)
+    return round(min(final_score, 1.0), 3)
+
+
+def build_candidates(count, seed=42):
+    """決定的なランダム候補生成（生成ツイート相当の長さ・キーワード密度）"""
+    rng = random.Random(seed)
+    candidates = []
+    for _ in range(count):
+        target_length = rng.randint(60, 180)
+        parts, length = [], 0
+        while length < target_length:
+            part = rng.choice(KEYWORDS) if rng.random() < 0.04 else rng.choice(FILLER)
+            parts.append(part)
+            length += len(part)
+        candidates.append(''.join(parts))
+    return candidates
+
+
+def main():
+    parser = argparse.ArgumentParser(description='品質スコア ベンチマーク')
+    parser.add_argument('--count', type=int, default=100000)
+    args = parser.parse_args()
+
+    candidates = build_candidates(args.count)
+    topic_info = {'quality_multiplier': 0.95}
+    scorer = QualityScorer()
+
+    start = time.perf_counter()
+    legacy_scores = [legacy_score(content, topic_info) for content in candidates]
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_scores = scorer.score_batch(candidates, topic_info)
+    batch_seconds = time.perf_counter() - start
+
+    mismatches = sum(1 for a, b in zip(legacy_scores, batch_scores) if a != b)
+
+    print(json.dumps({
+        'candidates': args.count,
+        'legacy_seconds': round(legacy_seconds, 3),
+        'score_batch_seconds': round(batch_seconds, 3),
+        'legacy_per_second': round(args.count / legacy_seconds),
+        'score_batch_per_second': round(args.count / batch_seconds),
+        'mismatches': mismatches,
+    }, indent=2))
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
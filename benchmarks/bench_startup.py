@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+起動時間ベンチマーク
+- python -X importtime で free_tier_bot 読み込み時のモジュール別時間を計測
+- 認証キャッシュ済み状態での初期化完了まで（最初の処理開始まで）の実時間を計測
+- tweepy / openai の読み込み時間も参考値として計測（遅延読み込みで省略される分）
+
+使い方: python benchmarks/bench_startup.py [--runs 5] [--max-ms 1500]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from identity_cache import IdentityCache, credential_fingerprint  # noqa: E402
+
+DUMMY_CREDENTIALS = {
+    'bearer_token': 'bench',
+    'consumer_key': 'bench',
+    'consumer_secret': 'bench',
+    'access_token': 'bench',
+    'access_token_secret': 'bench',
+}
+
+INIT_SNIPPET = """
+import time
+started = time.perf_counter()
+from free_tier_bot import FreeTierOptimizedBot
+bot = FreeTierOptimizedBot(credentials={credentials!r}, state_dir='state')
+ready = time.perf_counter()
+import sys
+print(round((ready - started) * 1000, 2), 'tweepy' in sys.modules, 'openai' in sys.modules)
+bot.close()
+"""
+
+
+def child_env():
+    """リポジトリ直下を import パスに追加した環境変数"""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [REPO_ROOT, env.get('PYTHONPATH')]))
+    return env
+
+
+def import_profile(module, cwd, top=10):
+    """-X importtime の出力からモジュール別の累積時間を集計"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=cwd, env=child_env(), capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        return None
+
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules.append({'module': name.strip(), 'self_us': int(self_us), 'cumulative_us': int(cumulative_us)})
+
+    target = next((m for m in modules if m['module'] == module), None)
+    return {
+        'total_ms': round(target['cumulative_us'] / 1000, 2) if target else None,
+        'top': sorted(modules, key=lambda m: m['cumulative_us'], reverse=True)[:top],
+    }
+
+
+def prime_identity_cache(state_dir):
+    """認証キャッシュを事前作成（get_me を呼ばない起動経路を計測するため）"""
+    os.makedirs(state_dir, exist_ok=True)
+    cache = IdentityCache(os.path.join(state_dir, 'identity_cache.json'))
+    cache.store(credential_fingerprint(DUMMY_CREDENTIALS), '0', 'bench')
+
+
+def measure_startup(cwd, runs):
+    """初期化完了までの時間（プロセス起動込みの実時間と、プロセス内の計測値）"""
+    wall_ms, init_ms, heavy_loaded = [], [], False
+    snippet = INIT_SNIPPET.format(credentials=DUMMY_CREDENTIALS)
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, '-c', snippet], cwd=cwd, env=child_env(),
+                                capture_output=True, text=True, check=True)
+        wall_ms.append((time.perf_counter() - started) * 1000)
+
+        init, tweepy_loaded, openai_loaded = result.stdout.split()[-3:]
+        init_ms.append(float(init))
+        heavy_loaded = heavy_loaded or tweepy_loaded == 'True' or openai_loaded == 'True'
+
+    return {
+        'runs': runs,
+        'wall_ms_median': round(statistics.median(wall_ms), 2),
+        'init_ms_median': round(statistics.median(init_ms), 2),
+        'heavy_clients_loaded': heavy_loaded,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='起動時間ベンチマーク')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--max-ms', type=float, default=None,
+                        help='起動時間の上限（超過時は終了コード1）')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        prime_identity_cache(os.path.join(workdir, 'state'))
+        results = {
+            'import_free_tier_bot': import_profile('free_tier_bot', workdir),
+            'startup': measure_startup(workdir, args.runs),
+            'deferred_imports_ms': {
+                name: (profile or {}).get('total_ms')
+                for name, profile in (
+                    ('tweepy', import_profile('tweepy', workdir, top=0)),
+                    ('openai', import_profile('openai', workdir, top=0)),
+                )
+            },
+        }
+
+    print(json.dumps(results, indent=2, ensure_ascii=False))
+
+    if args.max_ms is not None and results['startup']['wall_ms_median'] > args.max_ms:
+        print(f"起動時間が上限を超過: {results['startup']['wall_ms_median']}ms > {args.max_ms}ms", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+オフラインベンチマーク用の外部ライブラリ代替
+- tweepy / openai / feedparser / requests を決定的な代替モジュールに差し替え（sys.modules へ登録）
+- 呼び出し毎の遅延・失敗率を設定可能（乱数はシード固定）
+- 本番コードは変更せず、Bot モジュールの import 前に install() を呼び出して使用
+"""
+
+import itertools
+import random
+import sys
+import threading
+import time
+import types
+import xml.etree.ElementTree as ET
+import zlib
+from typing import Dict, Any, List, Optional
+
+# 生成テキストの素材（品質スコア判定のキーワードを適度に含み、組み合わせで重複を避ける）
+PHRASES = [
+    "会議の冒頭で目的を1行で共有する", "タスクを3つに絞って朝10分で計画する", "チェックリストで手順を標準化する",
+    "週1回の振り返りで改善点を1つ決める", "テンプレートを使って資料作成を30分短縮する", "通知をまとめて確認し集中時間を確保する",
+    "ステップ1で現状を数値化する", "ツールの自動化機能で定型作業を削減する", "質問を先に書き出して打ち合わせを効率化する",
+    "小さな成功を記録して継続の習慣にする", "優先順位を緊急度と重要度で判断する", "共有ドキュメントで情報の属人化を防ぐ",
+]
+SUBJECTS = [
+    "新人研修", "週次定例", "月末処理", "見積作成", "日報", "顧客対応", "採用面接", "企画会議",
+    "経費精算", "議事録", "引き継ぎ", "在庫管理", "メール返信", "進捗報告", "品質確認", "予算計画",
+]
+ENDINGS = ["今日から実践できる方法です。", "効果は1週間で実感できる。", "チームの生産性が確実に上がる。", "改善のコツはシンプルさ。"]
+
+
+class StubConfig:
+    """遅延・失敗率設定"""
+
+    def __init__(self, latency: float = 0.0, failure_rate: float = 0.0, seed: int = 42,
+                 overrides: Optional[Dict[str, Dict[str, float]]] = None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.overrides = overrides or {}
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls: Dict[str, int] = {}
+
+    def call(self, endpoint: str, error_class: type) -> random.Random:
+        """呼び出し1回分の遅延・失敗注入（以降の乱数生成用に rng を返す）"""
+        settings = self.overrides.get(endpoint, {})
+        with self.lock:
+            self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+            failed = self.rng.random() < settings.get('failure_rate', self.failure_rate)
+        latency = settings.get('latency', self.latency)
+        if latency:
+            time.sleep(latency)
+        if failed:
+            raise error_class(f"stub failure: {endpoint}")
+        return self.rng
+
+
+def build_tweepy(config: StubConfig) -> types.ModuleType:
+    """tweepy 代替（Client.get_me / create_tweet）"""
+    module = types.ModuleType('tweepy')
+    tweet_ids = itertools.count(10 ** 18)
+
+    class TweepyException(Exception):
+        pass
+
+    class HTTPException(TweepyException):
+        def __init__(self, response=None, message=''):
+            self.response = response
+            super().__init__(message)
+
+    class TooManyRequests(HTTPException):
+        pass
+
+    class Unauthorized(HTTPException):
+        pass
+
+    class Forbidden(HTTPException):
+        pass
+
+    class Response:
+        def __init__(self, data):
+            self.data = data
+
+    class Client:
+        def __init__(self, **kwargs):
+            self.kwargs = kwargs
+
+        def get_me(self):
+            config.call('get_me', TweepyException)
+            return Response(types.SimpleNamespace(id=1, username='benchmark'))
+
+        def create_tweet(self, text):
+            config.call('create_tweet', TweepyException)
+            return Response({'id': str(next(tweet_ids)), 'text': text})
+
+    for item in (TweepyException, HTTPException, TooManyRequests, Unauthorized, Forbidden, Response, Client):
+        setattr(module, item.__name__, item)
+    return module
+
+
+def generate_text(rng: random.Random) -> str:
+    """生成テキスト1件"""
+    phrases = rng.sample(PHRASES, 3)
+    subjects = rng.sample(SUBJECTS, 2)
+    return (f"{subjects[0]}では{phrases[0]}。{subjects[1]}も{phrases[1]}。"
+            f"さらに{phrases[2]}と{rng.randint(2, 9)}割楽になる。{rng.choice(ENDINGS)}")
+
+
+def build_openai(config: StubConfig) -> types.ModuleType:
+    """openai 0.27 代替（ChatCompletion.create、n・stream 対応）"""
+    module = types.ModuleType('openai')
+    error_module = types.ModuleType('openai.error')
+
+    class OpenAIError(Exception):
+        pass
+
+    class RateLimitError(OpenAIError):
+        pass
+
+    error_module.OpenAIError = OpenAIError
+    error_module.RateLimitError = RateLimitError
+
+    class ChatCompletion:
+        @staticmethod
+        def create(**kwargs):
+            rng = config.call('chat_completion', OpenAIError)
+            n = kwargs.get('n', 1)
+            with config.lock:
+                texts = [generate_text(rng) for _ in range(n)]
+
+            if kwargs.get('stream'):
+                return stream_chunks(texts)
+
+            return attr_dict(
+                choices=[
+                    attr_dict(index=index, message=attr_dict(role='assistant', content=text), finish_reason='stop')
+                    for index, text in enumerate(texts)
+                ],
+                usage=attr_dict(prompt_tokens=120, completion_tokens=60 * n, total_tokens=120 + 60 * n)
+            )
+
+    module.api_key = None
+    module.error = error_module
+    module.ChatCompletion = ChatCompletion
+    sys.modules['openai.error'] = error_module
+    return module
+
+
+class attr_dict(dict):
+    """属性アクセス可能な dict（openai の OpenAIObject 相当）"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+
+def stream_chunks(texts: List[str], size: int = 4):
+    """stream=True 応答（数文字ずつの差分チャンク）"""
+    for index, text in enumerate(texts):
+        for start in range(0, len(text), size):
+            yield attr_dict(choices=[attr_dict(index=index, delta=attr_dict(content=text[start:start + size]),
+                                               finish_reason=None)])
+        yield attr_dict(choices=[attr_dict(index=index, delta=attr_dict(), finish_reason='stop')])
+
+
+def build_rss(items: int = 20, prefix: str = 'feed') -> bytes:
+    """RSSフィクスチャ"""
+    entries = "".join(
+        f"<item><title>{prefix} 記事 {i}: 生成AIアップデート</title>"
+        f"<link>https://example.com/{prefix}/{i}</link>"
+        f"<pubDate>Mon, 06 May 2024 10:{i % 60:02d}:00 +0000</pubDate></item>"
+        for i in range(items)
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>{prefix}</title>{entries}</channel></rss>'.encode('utf-8')
+
+
+def build_feedparser(config: StubConfig) -> types.ModuleType:
+    """feedparser 代替（parse のみ、RSS 2.0 の item を抽出）"""
+    module = types.ModuleType('feedparser')
+
+    def parse(content):
+        config.call('feedparser_parse', ValueError)
+        entries = []
+        try:
+            root = ET.fromstring(content)
+            for item in root.iter('item'):
+                entry = {child.tag: (child.text or '') for child in item}
+                entry['published'] = item.findtext('pubDate', '')
+                entries.append(entry)
+        except ET.ParseError:
+            pass
+        return types.SimpleNamespace(entries=entries, bozo=not entries)
+
+    module.parse = parse
+    return module
+
+
+def build_requests(config: StubConfig, items: int = 20) -> types.ModuleType:
+    """requests 代替（Session.get でRSSを返す）"""
+    module = types.ModuleType('requests')
+
+    class RequestException(Exception):
+        pass
+
+    class Response:
+        def __init__(self, url):
+            self.url = url
+            self.status_code = 200
+            self.headers = {'ETag': f'"{zlib.crc32(url.encode())}"'}
+            self.content = build_rss(items, prefix=url.rsplit('/', 2)[-2] if '/' in url else url)
+
+        def raise_for_status(self):
+            pass
+
+        def iter_content(self, chunk_size=1):
+            for start in range(0, len(self.content), chunk_size):
+                yield self.content[start:start + chunk_size]
+
+        def close(self):
+            pass
+
+    class Session:
+        def __init__(self):
+            self.headers = {}
+
+        def get(self, url, timeout=None, headers=None, stream=False):
+            config.call('feed_fetch', RequestException)
+            return Response(url)
+
+    module.RequestException = RequestException
+    module.Response = Response
+    module.Session = Session
+    return module
+
+
+def install(config: Optional[StubConfig] = None) -> StubConfig:
+    """代替モジュールを sys.modules に登録（Bot モジュールの import 前に呼び出す）"""
+    config = config or StubConfig()
+    sys.modules['tweepy'] = build_tweepy(config)
+    sys.modules['openai'] = build_openai(config)
+    sys.modules['feedparser'] = build_feedparser(config)
+    sys.modules['requests'] = build_requests(config)
+    return config
+
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+オフラインベンチマークスイート
+- tweepy / openai / feedparser / requests を決定的な代替モジュールに差し替えてネットワークなしで実行
+- 計測項目:
+  e2e           run_optimized_system の1回あたり所要時間（段階別内訳付き）
+  quality       calculate_quality_score のスループット
+  dedup         check_content_duplicate の1回あたりコスト（履歴件数別）
+  usage         load_usage_data / save_usage_data / 投稿記録のコスト（JSON・SQLite）
+  feeds         collect_trending_content の所要時間
+- 結果はJSONで出力（バージョン間の比較用）
+
+使い方: python benchmarks/run_benchmarks.py [--only e2e,dedup] [--api-latency 20] [--output results.json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.join(REPO_ROOT, 'src'))
+
+from offline_stubs import StubConfig, install  # noqa: E402
+
+# Botのログ設定（basicConfig）より先に設定し、ログファイル作成・大量出力を抑止
+logging.basicConfig(level=logging.WARNING, handlers=[logging.NullHandler()])
+
+DUMMY_CREDENTIALS = {
+    'bearer_token': 'bench',
+    'consumer_key': 'bench',
+    'consumer_secret': 'bench',
+    'access_token': 'bench',
+    'access_token_secret': 'bench',
+}
+TEXT_CHARS = list("会議前今日決議論脱線軌道修正劇的早毎朝分間最重要習慣緊急完了達成成長実感段違効率改善手順集中共有")
+SCENARIOS = ('e2e', 'quality', 'dedup', 'usage', 'feeds')
+
+
+def timing_summary(samples_ms):
+    """所要時間の要約（ミリ秒）"""
+    ordered = sorted(samples_ms)
+    return {
+        'runs': len(ordered),
+        'mean_ms': round(statistics.mean(ordered), 3),
+        'median_ms': round(statistics.median(ordered), 3),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        'max_ms': round(ordered[-1], 3),
+    }
+
+
+def random_text(rng, length=110):
+    """重複しない投稿相当のテキスト"""
+    return ''.join(rng.choice(TEXT_CHARS) for _ in range(length))
+
+
+def create_bot(state_dir, retry_backoff=0.0, **kwargs):
+    """ベンチマーク用Bot（投稿上限・レート制限なし、状態は一時ディレクトリ）"""
+    from content_pool import ContentPool
+    from free_tier_bot import FreeTierOptimizedBot
+    from rate_limiter import RateLimiter
+
+    unlimited = {'create_tweet': (10 ** 9, 1), 'get_me': (10 ** 9, 1)}
+    bot = FreeTierOptimizedBot(
+        credentials=DUMMY_CREDENTIALS,
+        state_dir=state_dir,
+        content_pool=ContentPool(os.path.join(state_dir, 'content_pool.json')),
+        rate_limiter=RateLimiter(state_file=None, limits=unlimited),
+        **kwargs
+    )
+    bot.DAILY_LIMIT = bot.MONTHLY_LIMIT = 10 ** 9
+    bot.api_ledger.budgets = {}
+    bot.RETRY_BACKOFF = retry_backoff
+    return bot
+
+
+def bench_e2e(workdir, runs, retry_backoff):
+    """run_optimized_system の所要時間と段階別内訳"""
+    from instrumentation import REGISTRY, STAGE_METRIC
+
+    bot = create_bot(os.path.join(workdir, 'e2e'), retry_backoff)
+    REGISTRY.reset()
+    samples, successes = [], 0
+    try:
+        for _ in range(runs):
+            started = time.perf_counter()
+            successes += bool(bot.run_optimized_system())
+            samples.append((time.perf_counter() - started) * 1000)
+    finally:
+        bot.close()
+
+    stages = {}
+    for key, histogram in REGISTRY.histograms.get(STAGE_METRIC, {}).items():
+        stage = dict(key)['stage']
+        stages[stage] = {'count': histogram.count, 'mean_ms': round(histogram.sum / histogram.count * 1000, 3)}
+
+    return dict(timing_summary(samples), posted=successes, stages=stages)
+
+
+def bench_quality(count):
+    """calculate_quality_score のスループット"""
+    from bench_quality_score import build_candidates
+    from free_tier_bot import FreeTierOptimizedBot
+
+    candidates = build_candidates(count)
+    topic_info = FreeTierOptimizedBot.PREMIUM_TOPICS[0]
+    with tempfile.TemporaryDirectory() as state_dir:
+        bot = create_bot(state_dir)
+        started = time.perf_counter()
+        for content in candidates:
+            bot.calculate_quality_score(content, topic_info)
+        elapsed = time.perf_counter() - started
+        bot.close()
+
+    return {'count': count, 'seconds': round(elapsed, 4), 'per_second': round(count / elapsed, 1)}
+
+
+def bench_dedup(workdir, history_sizes, checks):
+    """check_content_duplicate の1回あたりコスト（投稿済み履歴件数別）"""
+    results = []
+    rng = random.Random(7)
+    for size in history_sizes:
+        bot = create_bot(os.path.join(workdir, f'dedup_{size}'))
+        for _ in range(size):
+            bot.check_content_duplicate(random_text(rng))
+
+        samples = []
+        for _ in range(checks):
+            content = random_text(rng)
+            started = time.perf_counter()
+            bot.check_content_duplicate(content)
+            samples.append((time.perf_counter() - started) * 1000)
+        bot.close()
+        results.append(dict(timing_summary(samples), history_size=size))
+    return results
+
+
+def bench_usage(workdir, runs):
+    """使用量データの読み込み・保存・投稿記録コスト（ストア別）"""
+    from usage_store import create_usage_store
+
+    results = {}
+    content_data = {'quality_score': 0.9, 'topic': 'bench', 'content_length': 120, 'hashtags': ['#bench']}
+    for backend in ('json', 'sqlite'):
+        state_dir = os.path.join(workdir, f'usage_{backend}')
+        bot = create_bot(state_dir)
+        bot.usage_store.close()
+        bot.usage_store = create_usage_store(backend, state_dir)
+
+        load, save, record = [], [], []
+        for index in range(runs):
+            bot.usage_data = None
+            started = time.perf_counter()
+            data = bot.load_usage_data()
+            load.append((time.perf_counter() - started) * 1000)
+
+            started = time.perf_counter()
+            bot.save_usage_data(data)
+            save.append((time.perf_counter() - started) * 1000)
+
+            started = time.perf_counter()
+            bot.update_usage_after_success(content_data, str(index))
+            record.append((time.perf_counter() - started) * 1000)
+        bot.close()
+
+        results[backend] = {
+            'load_usage_data': timing_summary(load),
+            'save_usage_data': timing_summary(save),
+            'update_usage_after_success': timing_summary(record),
+        }
+    return results
+
+
+def bench_feeds(workdir, runs):
+    """collect_trending_content の所要時間（フィードキャッシュ込み）"""
+    from feed_cache import FeedCache
+    from feed_collector import FeedCollector
+    from tweet_bot import BasicAITweetBot
+
+    bot = BasicAITweetBot.__new__(BasicAITweetBot)
+    bot.feed_collector = FeedCollector(cache=FeedCache(os.path.join(workdir, 'feed_cache.json')))
+
+    samples, candidates = [], 0
+    for _ in range(runs):
+        started = time.perf_counter()
+        candidates = len(bot.collect_trending_content())
+        samples.append((time.perf_counter() - started) * 1000)
+    return dict(timing_summary(samples), feeds=len(BasicAITweetBot.RSS_FEEDS), candidates=candidates)
+
+
+def git_revision():
+    """計測対象のリビジョン"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='オフラインベンチマークスイート')
+    parser.add_argument('--only', default=','.join(SCENARIOS), help=f"実行する項目 ({','.join(SCENARIOS)})")
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--api-latency', type=float, default=0.0, help='tweepy/openai 呼び出し毎の遅延（ミリ秒）')
+    parser.add_argument('--feed-latency', type=float, default=20.0, help='フィード取得毎の遅延（ミリ秒）')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='API呼び出しの失敗率 (0-1)')
+    parser.add_argument('--retry-backoff', type=float, default=0.0,
+                        help='投稿失敗時の再試行待機（秒×試行回数、本番値は15）')
+    parser.add_argument('--quality-count', type=int, default=100000)
+    parser.add_argument('--history-sizes', default='100,1000,5000', help='重複判定の履歴件数（カンマ区切り）')
+    parser.add_argument('--dedup-checks', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=None, help='結果JSONの保存先')
+    args = parser.parse_args()
+
+    latency = args.api_latency / 1000
+    config = install(StubConfig(
+        latency=latency,
+        failure_rate=args.failure_rate,
+        seed=args.seed,
+        overrides={
+            'feed_fetch': {'latency': args.feed_latency / 1000, 'failure_rate': args.failure_rate},
+            'feedparser_parse': {'latency': 0.0, 'failure_rate': 0.0},
+        }
+    ))
+    selected = [name.strip() for name in args.only.split(',') if name.strip()]
+
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            if 'e2e' in selected:
+                results['e2e'] = bench_e2e(workdir, args.runs, args.retry_backoff)
+            if 'quality' in selected:
+                results['quality'] = bench_quality(args.quality_count)
+            if 'dedup' in selected:
+                sizes = [int(size) for size in args.history_sizes.split(',')]
+                results['dedup'] = bench_dedup(workdir, sizes, args.dedup_checks)
+            if 'usage' in selected:
+                results['usage'] = bench_usage(workdir, args.runs)
+            if 'feeds' in selected:
+                results['feeds'] = bench_feeds(workdir, args.runs)
+        finally:
+            os.chdir(cwd)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'stubs': {
+                'api_latency_ms': args.api_latency,
+                'feed_latency_ms': args.feed_latency,
+                'failure_rate': args.failure_rate,
+                'retry_backoff': args.retry_backoff,
+                'seed': args.seed,
+                'calls': config.calls,
+            },
+        },
+        'results': results,
+    }
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+投稿枠消化シミュレーション
+- 仮想時刻（VirtualClock）上で投稿枠ごとに run_optimized_system を実行し、数ヶ月分の運用を数秒で再現
+- 外部APIは offline_stubs の代替モジュールを使用（ネットワーク・認証情報不要）
+- 月別の投稿数・スキップ理由（日次上限・月次上限・レート制限・品質/重複不合格・失敗）・月次上限到達日・状態ファイルサイズを出力
+
+使い方: python benchmarks/simulate_quota.py [--days 365] [--slots 09:00,13:00,19:00] [--monthly-limit 90] [--output sim.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from run_benchmarks import DUMMY_CREDENTIALS, git_revision  # noqa: E402
+from offline_stubs import StubConfig, install  # noqa: E402
+
+OUTCOMES = ('posted', 'daily_limit', 'monthly_limit', 'rate_limited', 'rejected', 'failed')
+REJECTION_EVENTS = ('quality_rejection', 'duplicate_rejection')
+
+
+def parse_slots(value):
+    """投稿時刻（HH:MM のカンマ区切り）"""
+    slots = []
+    for item in value.split(','):
+        hour, minute = item.strip().split(':')
+        slots.append((int(hour), int(minute)))
+    return sorted(slots)
+
+
+def slot_times(start, days, slots):
+    """仮想時間軸上の投稿枠"""
+    for day in range(days):
+        date = start + timedelta(days=day)
+        for hour, minute in slots:
+            yield date.replace(hour=hour, minute=minute, second=0, microsecond=0)
+
+
+def state_sizes(state_dir):
+    """状態ファイル別サイズ（バイト）"""
+    sizes = {}
+    for name in sorted(os.listdir(state_dir)):
+        path = os.path.join(state_dir, name)
+        if os.path.isfile(path):
+            sizes[name] = os.path.getsize(path)
+    return sizes
+
+
+def create_bot(state_dir, clock, args):
+    """シミュレーション用Bot（無料枠の既定レート制限、状態は state_dir）"""
+    from content_pool import ContentPool
+    from free_tier_bot import FreeTierOptimizedBot
+    from rate_limiter import RateLimiter
+
+    bot = FreeTierOptimizedBot(
+        credentials=DUMMY_CREDENTIALS,
+        state_dir=state_dir,
+        content_pool=ContentPool(os.path.join(state_dir, 'content_pool.json')),
+        rate_limiter=RateLimiter(os.path.join(state_dir, 'rate_limits.json')),
+        clock=clock
+    )
+    if args.daily_limit is not None:
+        bot.DAILY_LIMIT = args.daily_limit
+    if args.monthly_limit is not None:
+        bot.MONTHLY_LIMIT = args.monthly_limit
+    return bot
+
+
+def rejection_count():
+    """品質・重複不合格の累計件数"""
+    from instrumentation import EVENT_METRIC, REGISTRY
+
+    return sum(value for key, value in REGISTRY.counters.get(EVENT_METRIC, {}).items()
+               if dict(key)['event'] in REJECTION_EVENTS)
+
+
+def classify_slot(bot, clock):
+    """1枠分を実行して結果を分類"""
+    data = bot.load_usage_data()
+    if data.get('daily_count', 0) >= bot.DAILY_LIMIT:
+        return 'daily_limit'
+    if data.get('monthly_count', 0) >= bot.MONTHLY_LIMIT:
+        return 'monthly_limit'
+
+    bot.next_allowed_at = None
+    rejections = rejection_count()
+    if bot.run_optimized_system():
+        return 'posted'
+    if bot.next_allowed_at is not None and bot.next_allowed_at > clock.time():
+        return 'rate_limited'
+    if rejection_count() > rejections:
+        return 'rejected'
+    return 'failed'
+
+
+def simulate(state_dir, args):
+    """仮想時間軸で全枠を実行し、月別集計を返す"""
+    from clock import VirtualClock
+
+    start = datetime.strptime(args.start, '%Y-%m-%d')
+    clock = VirtualClock(start)
+    bot = create_bot(state_dir, clock, args)
+    months = {}
+    started = time.perf_counter()
+
+    try:
+        for moment in slot_times(start, args.days, parse_slots(args.slots)):
+            # 前の枠の待機で時刻が進んでいる場合はそのまま実行
+            if moment > clock.now():
+                clock.set(moment)
+
+            month = moment.strftime('%Y-%m')
+            summary = months.setdefault(month, dict({outcome: 0 for outcome in OUTCOMES},
+                                                    slots=0, exhausted_on=None))
+            outcome = classify_slot(bot, clock)
+            summary['slots'] += 1
+            summary[outcome] += 1
+            if outcome == 'monthly_limit' and summary['exhausted_on'] is None:
+                summary['exhausted_on'] = moment.strftime('%Y-%m-%d %H:%M')
+
+            # 月末（次の枠が翌月）で状態ファイルサイズを記録
+            next_moment = moment + timedelta(days=1)
+            if next_moment.month != moment.month:
+                summary['state_bytes'] = sum(state_sizes(state_dir).values())
+    finally:
+        bot.close()
+
+    elapsed = time.perf_counter() - started
+    totals = {outcome: sum(summary[outcome] for summary in months.values()) for outcome in OUTCOMES}
+    totals['slots'] = sum(summary['slots'] for summary in months.values())
+    return {
+        'elapsed_seconds': round(elapsed, 2),
+        'virtual_days': args.days,
+        'virtual_slept_seconds': round(clock.slept, 1),
+        'limits': {'daily': bot.DAILY_LIMIT, 'monthly': bot.MONTHLY_LIMIT},
+        'totals': totals,
+        'months': months,
+        'state_files': state_sizes(state_dir),
+    }
+
+
+def format_report(result):
+    """月別集計の表形式出力"""
+    lines = [
+        f"仮想期間: {result['virtual_days']}日 / 実時間: {result['elapsed_seconds']}秒 "
+        f"/ 上限: 日{result['limits']['daily']}・月{result['limits']['monthly']}",
+        f"{'月':<8} {'枠':>4} {'投稿':>4} {'日上限':>6} {'月上限':>6} {'制限':>4} {'不合格':>6} {'失敗':>4}  {'月上限到達':<16} {'状態(KB)':>8}",
+    ]
+    for month, summary in result['months'].items():
+        state_kb = f"{summary['state_bytes'] / 1024:.1f}" if 'state_bytes' in summary else '-'
+        lines.append(
+            f"{month:<8} {summary['slots']:>4} {summary['posted']:>4} {summary['daily_limit']:>6} "
+            f"{summary['monthly_limit']:>6} {summary['rate_limited']:>4} {summary['rejected']:>6} {summary['failed']:>4}  "
+            f"{summary['exhausted_on'] or '-':<16} {state_kb:>8}"
+        )
+    totals = result['totals']
+    lines.append(
+        f"{'合計':<8} {totals['slots']:>4} {totals['posted']:>4} {totals['daily_limit']:>6} "
+        f"{totals['monthly_limit']:>6} {totals['rate_limited']:>4} {totals['rejected']:>6} {totals['failed']:>4}"
+    )
+    lines.append("状態ファイル:")
+    for name, size in result['state_files'].items():
+        lines.append(f"  {name:<32} {size:>10,} bytes")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='投稿枠消化シミュレーション（仮想時刻）')
+    parser.add_argument('--start', default='2025-01-01', help='開始日 (YYYY-MM-DD)')
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--slots', default='09:00,13:00,19:00', help='1日の投稿時刻（カンマ区切り）')
+    parser.add_argument('--daily-limit', type=int, default=None, help='日次上限の上書き')
+    parser.add_argument('--monthly-limit', type=int, default=None, help='月次上限の上書き')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='API呼び出しの失敗率 (0-1)')
+    parser.add_argument('--usage-backend', default=None, help='使用量ストア (json / sqlite)')
+    parser.add_argument('--state-dir', default=None, help='状態ディレクトリ（省略時は一時ディレクトリ）')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default=None, help='結果JSONの保存先')
+    args = parser.parse_args()
+
+    install(StubConfig(failure_rate=args.failure_rate, seed=args.seed))
+    if args.usage_backend:
+        os.environ['USAGE_STORE'] = args.usage_backend
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        state_dir = os.path.abspath(args.state_dir) if args.state_dir else os.path.join(workdir, 'state')
+        os.chdir(workdir)
+        try:
+            result = simulate(state_dir, args)
+        finally:
+            os.chdir(cwd)
+
+    result['meta'] = {
+        'revision': git_revision(),
+        'start': args.start,
+        'slots': args.slots,
+        'failure_rate': args.failure_rate,
+        'seed': args.seed,
+    }
+    print(format_report(result))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+常駐デーモンモード（セルフホスト運用向け）
+- APIクライアント・キャッシュ・使用量状態をプロセス内で保持し、投稿毎の起動コストを排除
+- 優先度付きキューのスケジューラーで投稿枠・プール補充・フィード更新を実行
+- 更新したフィードの最新見出しは生成プロンプトに話題の参考として添える
+- SIGTERM / SIGINT で実行中タスクの完了を待って終了
+"""
+
+import argparse
+import heapq
+import itertools
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from config import RSS_FEEDS
+from free_tier_bot import FreeTierOptimizedBot
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+logger = logging.getLogger('bot_daemon')
+
+# 優先度（同時刻の場合は小さい方から実行）
+PRIORITY_POST = 0
+PRIORITY_REFILL = 1
+PRIORITY_FEEDS = 2
+
+
+class Scheduler:
+    """優先度付きキューによるタスクスケジューラー"""
+
+    def __init__(self):
+        self.queue: List[Tuple[float, int, int, str, Callable[[], Optional[float]]]] = []
+        self.counter = itertools.count()
+        self.stop_event = threading.Event()
+
+    def schedule(self, run_at: float, priority: int, name: str, task: Callable[[], Optional[float]]) -> None:
+        """タスク登録（taskは次回実行時刻を返す。Noneなら再登録しない）"""
+        heapq.heappush(self.queue, (run_at, priority, next(self.counter), name, task))
+
+    def stop(self) -> None:
+        """停止要求"""
+        self.stop_event.set()
+
+    def run(self) -> None:
+        """停止要求まで実行"""
+        while self.queue and not self.stop_event.is_set():
+            run_at, priority, _, name, task = self.queue[0]
+            wait_time = run_at - time.time()
+            if wait_time > 0:
+                # 停止要求で即座に起床
+                self.stop_event.wait(wait_time)
+                continue
+
+            heapq.heappop(self.queue)
+            try:
+                next_run = task()
+            except Exception as e:
+                logger.error(f"❌ タスク実行エラー [{name}]: {e}")
+                next_run = time.time() + 300
+
+            if next_run is not None:
+                self.schedule(next_run, priority, name, task)
+
+
+def next_slot_time(slots: List[str], tz: ZoneInfo, now: Optional[datetime] = None) -> float:
+    """次の投稿枠（HH:MM、指定タイムゾーン）のUNIX時刻"""
+    now = now or datetime.now(tz)
+    candidates = []
+    for slot in slots:
+        hour, minute = (int(part) for part in slot.split(':'))
+        slot_time = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if slot_time <= now:
+            slot_time += timedelta(days=1)
+        candidates.append(slot_time)
+    return min(candidates).timestamp()
+
+
+class BotDaemon:
+    """常駐Bot"""
+
+    def __init__(self, slots: List[str], timezone: str = 'Asia/Tokyo', refill_interval: float = 6 * 3600,
+                 pool_low_watermark: int = 7, feed_interval: Optional[float] = 1800):
+        self.slots = slots
+        self.tz = ZoneInfo(timezone)
+        self.refill_interval = refill_interval
+        self.pool_low_watermark = pool_low_watermark
+        self.feed_interval = feed_interval
+
+        self.bot = FreeTierOptimizedBot()
+        self.scheduler = Scheduler()
+        self.feed_collector = None
+        self.feed_urls: List[str] = []
+
+    def post_slot(self) -> Optional[float]:
+        """投稿枠タスク（レート制限で見送った場合は解除時刻に再試行）"""
+        self.bot.next_allowed_at = None
+        self.bot.run_optimized_system()
+        self.bot.rate_limiter.save()
+
+        next_slot = next_slot_time(self.slots, self.tz)
+        retry_at = self.bot.next_allowed_at
+        if retry_at and retry_at < next_slot:
+            self.scheduler.schedule(retry_at, PRIORITY_POST, 'post-retry', self.post_retry)
+        return next_slot
+
+    def post_retry(self) -> Optional[float]:
+        """レート制限解除後の再投稿（1回限り）"""
+        self.bot.next_allowed_at = None
+        self.bot.run_optimized_system()
+        self.bot.rate_limiter.save()
+        return None
+
+    def refill_pool(self) -> Optional[float]:
+        """プール在庫が下限を下回っていれば補充"""
+        if self.bot.content_pool.size() < self.pool_low_watermark:
+            self.bot.fill_content_pool()
+        return time.time() + self.refill_interval
+
+    def refresh_feeds(self) -> Optional[float]:
+        """RSSフィードキャッシュの更新（見出しを生成プロンプトに反映）"""
+        results = self.feed_collector.collect(self.feed_urls)
+        if results:
+            self.bot.update_feed_context(results)
+        logger.info(f"📰 フィード更新: {len(results)}/{len(self.feed_urls)}件 (見出し{len(self.bot.feed_headlines)}件)")
+        return time.time() + self.feed_interval
+
+    def setup_feeds(self) -> None:
+        """フィード収集の準備（src/ の収集モジュールを利用）"""
+        from feed_cache import FeedCache
+        from feed_collector import FeedCollector
+
+        self.feed_urls = RSS_FEEDS
+        self.feed_collector = FeedCollector(cache=FeedCache(self.bot.state_path('feed_cache.json')))
+
+    def install_signal_handlers(self) -> None:
+        """SIGTERM / SIGINT で停止"""
+        def handle_signal(signum, frame):
+            logger.info(f"🛑 シグナル受信 ({signal.Signals(signum).name})、現在のタスク完了後に停止します")
+            self.scheduler.stop()
+
+        signal.signal(signal.SIGTERM, handle_signal)
+        signal.signal(signal.SIGINT, handle_signal)
+
+    def run(self) -> None:
+        """デーモン実行"""
+        now = time.time()
+        self.scheduler.schedule(next_slot_time(self.slots, self.tz), PRIORITY_POST, 'post', self.post_slot)
+        self.scheduler.schedule(now, PRIORITY_REFILL, 'refill', self.refill_pool)
+        if self.feed_interval:
+            self.setup_feeds()
+            self.scheduler.schedule(now, PRIORITY_FEEDS, 'feeds', self.refresh_feeds)
+
+        self.install_signal_handlers()
+        next_post = datetime.fromtimestamp(next_slot_time(self.slots, self.tz), self.tz)
+        logger.info(f"🌙 デーモン起動: 投稿枠 {', '.join(self.slots)} ({self.tz.key}) / 次回 {next_post:%Y-%m-%d %H:%M}")
+
+        try:
+            self.scheduler.run()
+        finally:
+            self.bot.close()
+            logger.info("🏁 デーモン停止")
+
+
+def main():
+    """メイン実行"""
+    parser = argparse.ArgumentParser(description='無料枠最適化Bot 常駐デーモン')
+    parser.add_argument('--slots', default='09:00,15:00,21:00', help='投稿時刻 (HH:MM をカンマ区切り)')
+    parser.add_argument('--timezone', default='Asia/Tokyo')
+    parser.add_argument('--refill-interval', type=float, default=6 * 3600, help='プール補充確認間隔（秒）')
+    parser.add_argument('--pool-low', type=int, default=7, help='補充を行うプール在庫の下限')
+    parser.add_argument('--feed-interval', type=float, default=1800, help='フィード更新間隔（秒、0で無効）')
+    args = parser.parse_args()
+
+    daemon = BotDaemon(
+        slots=[slot.strip() for slot in args.slots.split(',') if slot.strip()],
+        timezone=args.timezone,
+        refill_interval=args.refill_interval,
+        pool_low_watermark=args.pool_low,
+        feed_interval=args.feed_interval or None
+    )
+    daemon.run()
+
+
+if __name__ == "__main__":
+    main()
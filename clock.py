@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+時刻取得の差し替え
+- SystemClock: 実時刻（通常運用）
+- VirtualClock: 任意の時刻から開始し、sleep/advance で進める仮想時刻（日次・月次リセットや枠消化のシミュレーション用）
+- Bot には clock 引数で注入し、datetime.now() / time.time() / time.sleep() の代わりに使用
+"""
+
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+
+class SystemClock:
+    """実時刻"""
+
+    def now(self) -> datetime:
+        """現在時刻（ローカル時刻）"""
+        return datetime.now()
+
+    def time(self) -> float:
+        """現在時刻（UNIX秒）"""
+        return time.time()
+
+    def sleep(self, seconds: float) -> None:
+        """待機"""
+        time.sleep(seconds)
+
+
+class VirtualClock(SystemClock):
+    """仮想時刻（待機は即時に時刻を進めるだけ）"""
+
+    def __init__(self, start: Optional[datetime] = None):
+        self.current = start or datetime.now()
+        self.slept = 0.0
+
+    def now(self) -> datetime:
+        """現在時刻（ローカル時刻）"""
+        return self.current
+
+    def time(self) -> float:
+        """現在時刻（UNIX秒）"""
+        return self.current.timestamp()
+
+    def sleep(self, seconds: float) -> None:
+        """待機した分だけ時刻を進める"""
+        seconds = max(seconds, 0)
+        self.slept += seconds
+        self.advance(seconds)
+
+    def advance(self, seconds: float) -> None:
+        """時刻を進める"""
+        self.current += timedelta(seconds=seconds)
+
+    def set(self, moment: datetime) -> None:
+        """時刻を指定（過去への巻き戻しは不可）"""
+        if moment < self.current:
+            raise ValueError(f"仮想時刻は巻き戻せません: {moment.isoformat()} < {self.current.isoformat()}")
+        self.current = moment
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+OpenAI生成結果キャッシュ
+- モデル・メッセージ・サンプリング設定（n・stream を除く）のSHA-256をキーに生成テキストを保存
+- 未使用の生成結果は1回ずつ払い出し（重複投稿を防止）、不足分のみ新規リクエスト
+- 新規リクエスト時は prefetch 件を余分に生成して次回以降に備える（遅延時の予備在庫）
+- replay 有効時は使用済みの結果も再利用（開発・ベンチマーク・シミュレーション用、APIを呼ばない）
+- 有効期限（TTL）・キー単位のLRU・総件数上限で容量を制限し、JSONに保存して次回実行に引き継ぐ
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
+
+from clock import SystemClock
+
+# キーに含めない指定（候補数・応答形式は生成内容に影響しない）
+EXCLUDED_PARAMS = ('n', 'stream')
+
+
+def completion_key(request: Dict[str, Any]) -> str:
+    """生成リクエストのキャッシュキー"""
+    material = {name: value for name, value in request.items() if name not in EXCLUDED_PARAMS}
+    encoded = json.dumps(material, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class CompletionCache:
+    """生成結果キャッシュ（未使用分の払い出し＋使用済み分の再利用）"""
+
+    def __init__(self, cache_file: str = 'completion_cache.json', ttl: float = 3 * 24 * 3600,
+                 max_keys: int = 50, max_completions: int = 300, prefetch: int = 0,
+                 replay: bool = False, clock: Optional[SystemClock] = None):
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self.max_completions = max_completions
+        self.prefetch = prefetch
+        self.replay = replay
+        self.clock = clock or SystemClock()
+        self.lock = threading.Lock()
+        self.entries: 'OrderedDict[str, Dict[str, Any]]' = self.load()
+
+    def load(self) -> 'OrderedDict[str, Dict[str, Any]]':
+        """キャッシュ読み込み（保存順＝LRU順）"""
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return OrderedDict((entry['key'], entry) for entry in json.load(f))
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            return OrderedDict()
+
+    def save(self) -> None:
+        """キャッシュ保存（一時ファイル経由で置換）"""
+        if not self.cache_file:
+            return
+        tmp_file = f"{self.cache_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(list(self.entries.values()), f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_file, self.cache_file)
+
+    def take(self, key: str, count: int) -> List[str]:
+        """最大 count 件の生成結果を払い出し（未使用分優先、replay 時は使用済み分も再利用）"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return []
+
+            self.expire(entry)
+            taken = entry['unused'][:count]
+            entry['unused'] = entry['unused'][count:]
+            entry['used'].extend(taken)
+
+            if self.replay and len(taken) < count and entry['used']:
+                # 古い使用済み結果から順に再利用
+                replayed = [item for item in entry['used'] if item not in taken][:count - len(taken)]
+                entry['used'] = [item for item in entry['used'] if item not in replayed] + replayed
+                taken.extend(replayed)
+
+            self.entries.move_to_end(key)
+            self.enforce_limits()
+            self.save()
+            return [item['text'] for item in taken]
+
+    def put(self, key: str, unused: List[str], used: Optional[List[str]] = None) -> None:
+        """生成結果の登録（unused: 今後払い出す分、used: 払い出し済みの分）"""
+        if not unused and not used:
+            return
+        now = self.clock.time()
+        with self.lock:
+            entry = self.entries.setdefault(key, {'key': key, 'unused': [], 'used': []})
+            # 払い出し後に採用されなかった結果は未使用に戻す
+            returned = [item for item in entry['used'] if item['text'] in unused]
+            entry['used'] = [item for item in entry['used'] if item['text'] not in unused]
+            entry['unused'].extend(returned)
+
+            known = {item['text'] for item in entry['unused'] + entry['used']}
+            entry['unused'].extend({'text': text, 'created': now} for text in unused if text not in known)
+            known.update(unused)
+            entry['used'].extend({'text': text, 'created': now} for text in used or [] if text not in known)
+            self.entries.move_to_end(key)
+            self.enforce_limits()
+            self.save()
+
+    def expire(self, entry: Dict[str, Any]) -> None:
+        """有効期限切れの生成結果を削除"""
+        cutoff = self.clock.time() - self.ttl
+        entry['unused'] = [item for item in entry['unused'] if item['created'] >= cutoff]
+        entry['used'] = [item for item in entry['used'] if item['created'] >= cutoff]
+
+    def enforce_limits(self) -> None:
+        """キー数・総件数の上限を超えた分を古い順に削除（使用済み分を優先して削除）"""
+        for entry in self.entries.values():
+            self.expire(entry)
+        for key in [key for key, entry in self.entries.items() if not entry['unused'] and not entry['used']]:
+            del self.entries[key]
+
+        while len(self.entries) > self.max_keys:
+            self.entries.popitem(last=False)
+
+        total = sum(len(entry['unused']) + len(entry['used']) for entry in self.entries.values())
+        for field in ('used', 'unused'):
+            for key in list(self.entries):
+                if total <= self.max_completions:
+                    return
+                items = self.entries[key][field]
+                removed = min(len(items), total - self.max_completions)
+                del items[:removed]
+                total -= removed
+                if not self.entries[key]['unused'] and not self.entries[key]['used']:
+                    del self.entries[key]
+
+    def stats(self) -> Dict[str, int]:
+        """保持件数"""
+        with self.lock:
+            return {
+                'keys': len(self.entries),
+                'unused': sum(len(entry['unused']) for entry in self.entries.values()),
+                'used': sum(len(entry['used']) for entry in self.entries.values())
+            }
@@ -1,6 +1,7 @@
 """
 システム設定管理
 """
+import os
 from datetime import datetime
 
 # 無料枠制限設定
@@ -11,6 +12,30 @@ FREE_TIER_LIMITS = {
     'min_interval_seconds': 300
 }
 
+# 外部API月間予算（超過する呼び出しは実行前に拒否、未定義のエンドポイントは無制限）
+API_BUDGETS = {
+    'get_me': {'monthly_requests': 100},          # X API 無料枠の読み取り上限
+    'create_tweet': {'monthly_requests': 500},    # X API 無料枠の書き込み上限（失敗・再試行も消費）
+    'chat_completion': {'monthly_requests': 1000, 'monthly_tokens': 300000}
+}
+
+# OpenAI生成結果キャッシュ
+COMPLETION_CACHE_CONFIG = {
+    'file': 'completion_cache.json',
+    'ttl_seconds': 3 * 24 * 3600,   # 生成結果の有効期限
+    'max_keys': 50,                 # プロンプト×設定の組み合わせ数上限（LRU）
+    'max_completions': 300,         # 保持する生成結果の総数上限
+    'prefetch': 3,                  # 新規リクエスト時に余分に生成して保持する件数
+    'replay': os.getenv('COMPLETION_CACHE_REPLAY') == '1'  # 使用済み結果の再利用（開発・検証用）
+}
+
+# AI関連RSS（トレンド収集対象）
+RSS_FEEDS = [
+    "https://blog.openai.com/rss.xml",
+    "https://ai.googleblog.com/feeds/posts/default",
+    "https://blogs.nvidia.com/feed/",
+]
+
 # ツイート品質設定
 QUALITY_CONFIG = {
     'min_content_length': 50,
@@ -23,7 +48,11 @@ QUALITY_CONFIG = {
 LOGGING_CONFIG = {
     'level': 'INFO',
     'format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    'file': 'bot_execution.log'
+    'file': 'bot_execution.log',
+    'max_bytes': 1024 * 1024,   # セグメント上限（超えたらローテーション）
+    'rotate_daily': True,       # 日付が変わったらローテーション
+    'backup_count': 30,         # 保持する圧縮済みセグメント数
+    'compress': True            # 閉じたセグメントを gzip 圧縮
 }
 
 # システムメタデータ
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+事前生成コンテンツプール
+- 生成・採点済みの投稿候補をトピック別にディスク保存
+- 投稿実行時はトピックを重み付きで巡回し、トピック内で最高スコアの未使用候補を取り出すだけ
+- 取り出し時に投稿済みコンテンツとの重複を再確認し、重複候補は破棄
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Callable, Dict, Any, List, Optional
+
+
+class ContentPool:
+    """投稿候補プール"""
+
+    def __init__(self, pool_file: str = 'content_pool.json'):
+        self.pool_file = pool_file
+        self.lock = threading.Lock()
+
+    def load(self) -> Dict[str, Any]:
+        """プール読み込み"""
+        try:
+            with open(self.pool_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'topics': {}, 'last_fill': None}
+
+    def save(self, pool: Dict[str, Any]) -> None:
+        """プール保存（一時ファイル経由で置換）"""
+        tmp_file = f"{self.pool_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(pool, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, self.pool_file)
+
+    @staticmethod
+    def content_key(content_data: Dict[str, Any]) -> str:
+        """重複判定キー（本文の空白を除いて比較）"""
+        base_content = content_data.get('base_content') or content_data['content']
+        normalized = ''.join(base_content.split())
+        return hashlib.md5(normalized.encode('utf-8')).hexdigest()
+
+    def add_candidates(self, candidates: List[Dict[str, Any]]) -> int:
+        """候補を一括追加（重複は除外）し、追加件数を返す"""
+        with self.lock:
+            pool = self.load()
+            known_keys = {
+                entry['pool_key']
+                for entries in pool['topics'].values()
+                for entry in entries
+            }
+
+            added = 0
+            for candidate in candidates:
+                key = self.content_key(candidate)
+                if key in known_keys:
+                    continue
+                known_keys.add(key)
+                entry = dict(candidate, pool_key=key)
+                pool['topics'].setdefault(candidate['topic'], []).append(entry)
+                added += 1
+
+            if added:
+                pool['last_fill'] = datetime.now().isoformat()
+                self.save(pool)
+            return added
+
+    def pop_next(self, min_score: float = 0.0, weights: Optional[Dict[str, float]] = None,
+                 is_duplicate: Optional[Callable[[Dict[str, Any]], bool]] = None) -> Optional[Dict[str, Any]]:
+        """トピックを重み付きで巡回して候補を取り出す（トピック内は最高スコア順、該当なしはNone）"""
+        weights = weights or {}
+        with self.lock:
+            pool = self.load()
+            credits = pool.setdefault('rotation', {})
+            eligible = {
+                topic: sorted((entry for entry in entries if entry['quality_score'] >= min_score),
+                              key=lambda entry: entry['quality_score'], reverse=True)
+                for topic, entries in pool['topics'].items()
+            }
+            eligible = {topic: entries for topic, entries in eligible.items() if entries}
+            if not eligible:
+                return None
+
+            # 重み付きラウンドロビン: 各トピックに重みを加算し、最大のトピックから取り出して重みの合計を減算
+            total_weight = 0.0
+            for topic in eligible:
+                weight = weights.get(topic, 1.0)
+                credits[topic] = credits.get(topic, 0.0) + weight
+                total_weight += weight
+
+            selected, changed = None, False
+            order = sorted(eligible, key=lambda topic: (credits[topic], eligible[topic][0]['quality_score']), reverse=True)
+            for topic in order:
+                for entry in eligible[topic]:
+                    pool['topics'][topic].remove(entry)
+                    changed = True
+                    # 投稿済みと重複する候補は破棄
+                    if is_duplicate and is_duplicate(entry):
+                        continue
+                    selected = entry
+                    break
+                if not pool['topics'][topic]:
+                    del pool['topics'][topic]
+                if selected is not None:
+                    credits[topic] -= total_weight
+                    break
+
+            pool['rotation'] = {topic: credit for topic, credit in credits.items() if topic in pool['topics']}
+            if changed:
+                self.save(pool)
+
+        if selected is not None:
+            selected.pop('pool_key', None)
+        return selected
+
+    def topic_counts(self) -> Dict[str, int]:
+        """トピック別在庫数"""
+        with self.lock:
+            pool = self.load()
+        return {topic: len(entries) for topic, entries in pool['topics'].items()}
+
+    def size(self) -> int:
+        """総在庫数"""
+        return sum(self.topic_counts().values())
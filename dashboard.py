@@ -1,38 +1,254 @@
 #!/usr/bin/env python3
 """
 簡易Web監視ダッシュボード
+- 描画結果を usage_data.json の更新時刻・サイズ単位でキャッシュ（変更がなければ再読み込み・再描画しない）
+- ETag / If-None-Match による 304 応答
+- /api/usage で使用状況の要約JSONを提供
+- /api/trends で月別品質推移・今四半期のトピック構成を提供（日次/月次ロールアップから取得）
+- /metrics で Bot の段階別計測結果（bot_metrics.prom、Prometheus テキスト形式）を配信
+- /events (Server-Sent Events) で変更された指標のみを配信（監視スレッドは全クライアントで1本）
 """
 
+import hashlib
 import json
+import os
+import queue
+import threading
+import time
 from datetime import datetime
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, List, Optional, Tuple
+
+from metrics_store import MetricsStore
+
+DAILY_LIMIT = 3
+MONTHLY_LIMIT = 90
+WATCH_INTERVAL = 1.0      # 状態ファイル監視間隔（秒）
+KEEPALIVE_INTERVAL = 15   # SSE接続維持コメント送信間隔（秒）
+
+
+def summarize_usage(data: Dict[str, Any]) -> Dict[str, Any]:
+    """使用状況の要約（/api/usage 用）"""
+    daily_count = data.get('daily_count', 0)
+    monthly_count = data.get('monthly_count', 0)
+    quality_posts = data.get('quality_posts', 0)
+    total_posts = data.get('total_posts', 0)
+    history = data.get('post_history') or []
+
+    return {
+        'daily_count': daily_count,
+        'daily_limit': DAILY_LIMIT,
+        'monthly_count': monthly_count,
+        'monthly_limit': MONTHLY_LIMIT,
+        'usage_rate': round(monthly_count / MONTHLY_LIMIT * 100, 1),
+        'quality_posts': quality_posts,
+        'total_posts': total_posts,
+        'quality_rate': round(quality_posts / (total_posts or 1) * 100, 1),
+        'last_update': data.get('last_update'),
+        'latest_post': history[-1] if history else None
+    }
+
+
+class DashboardCache:
+    """描画キャッシュ（状態ファイルの更新時刻・サイズが変わった時のみ再描画）"""
+
+    def __init__(self, data_file: str = 'usage_data.json'):
+        self.data_file = data_file
+        self.lock = threading.Lock()
+        self.key: Optional[Tuple[int, int]] = None
+        self.entry: Optional[Dict[str, Any]] = None
+
+    def get(self) -> Dict[str, Any]:
+        """最新の描画結果 {etag, html, usage, data}（読み込み失敗時は例外）"""
+        stat = os.stat(self.data_file)
+        key = (stat.st_mtime_ns, stat.st_size)
+
+        with self.lock:
+            if key != self.key:
+                with open(self.data_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                summary = summarize_usage(data)
+                self.entry = {
+                    'etag': '"' + hashlib.md5(f"{key[0]}-{key[1]}".encode()).hexdigest() + '"',
+                    'html': DashboardHandler.generate_dashboard_html(data).encode('utf-8'),
+                    'usage': json.dumps(summary, ensure_ascii=False, separators=(',', ':')).encode('utf-8'),
+                    'summary': summary,
+                    'data': data
+                }
+                self.key = key
+            return self.entry
+
+
+class UsageEventHub:
+    """使用状況の変更通知（共有の監視スレッド1本から全購読者へ配信）"""
+
+    def __init__(self, cache: DashboardCache, interval: float = WATCH_INTERVAL):
+        self.cache = cache
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.subscribers: List[queue.Queue] = []
+        self.summary: Optional[Dict[str, Any]] = None
+        self.thread: Optional[threading.Thread] = None
+
+    def subscribe(self) -> queue.Queue:
+        """購読開始（初回購読時に監視スレッドを起動）"""
+        subscriber: queue.Queue = queue.Queue(maxsize=100)
+        with self.lock:
+            self.subscribers.append(subscriber)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.watch, name='usage-watcher', daemon=True)
+                self.thread.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue) -> None:
+        """購読終了"""
+        with self.lock:
+            if subscriber in self.subscribers:
+                self.subscribers.remove(subscriber)
+
+    def watch(self) -> None:
+        """状態ファイル監視（変更された指標のみ配信）"""
+        # 接続時の全指標は各接続で送信済みのため、起動時点の状態は配信しない
+        self.summary = self.current_summary()
+        while True:
+            time.sleep(self.interval)
+            summary = self.current_summary()
+            if summary is not None and summary != self.summary:
+                previous = self.summary or {}
+                changes = {key: value for key, value in summary.items() if previous.get(key) != value}
+                self.summary = summary
+                self.publish(changes)
+
+    def current_summary(self) -> Optional[Dict[str, Any]]:
+        """現在の使用状況要約（読み込み失敗時はNone）"""
+        try:
+            return self.cache.get()['summary']
+        except (OSError, ValueError):
+            return None
+
+    def publish(self, changes: Dict[str, Any]) -> None:
+        """全購読者へ配信（受信が滞っている購読者の分は破棄）"""
+        payload = json.dumps(changes, ensure_ascii=False, separators=(',', ':'))
+        with self.lock:
+            for subscriber in self.subscribers:
+                try:
+                    subscriber.put_nowait(payload)
+                except queue.Full:
+                    pass
+
 
 class DashboardHandler(BaseHTTPRequestHandler):
+    cache = DashboardCache()
+    events = UsageEventHub(cache)
+    metrics = MetricsStore()
+    prometheus_file = 'bot_metrics.prom'
+
     def do_GET(self):
-        if self.path == '/':
-            self.send_response(200)
-            self.send_header('Content-type', 'text/html; charset=utf-8')
+        path = self.path.split('?', 1)[0]
+        if path == '/':
+            self.send_cached('html', 'text/html; charset=utf-8')
+        elif path == '/api/usage':
+            self.send_cached('usage', 'application/json; charset=utf-8')
+        elif path == '/metrics':
+            self.send_prometheus()
+        elif path == '/api/trends':
+            self.send_trends()
+        elif path == '/events':
+            self.stream_events()
+        else:
+            self.send_error(404)
+    
+    def send_cached(self, field, content_type):
+        """キャッシュ済み描画結果の送信（ETag一致時は304）"""
+        try:
+            entry = self.cache.get()
+        except Exception as e:
+            error_html = f"<html><body><h1>エラー: {e}</h1></body></html>".encode('utf-8')
+            self.send_body(503, error_html, 'text/html; charset=utf-8')
+            return
+        
+        etag = entry['etag']
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
             self.end_headers()
+            return
+        
+        self.send_body(200, entry[field], content_type, etag)
+    
+    def send_body(self, status, body, content_type, etag=None):
+        """レスポンス送信"""
+        self.send_response(status)
+        self.send_header('Content-type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-cache')
+        if etag:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def send_prometheus(self):
+        """Bot が出力した Prometheus テキストを配信（未出力なら空）"""
+        try:
+            with open(self.prometheus_file, 'rb') as f:
+                body = f.read()
+        except FileNotFoundError:
+            body = b''
+        self.send_body(200, body, 'text/plain; version=0.0.4; charset=utf-8')
+    
+    def send_trends(self):
+        """長期トレンドJSON送信"""
+        self.metrics.refresh()
+        body = json.dumps({
+            'quality_trend': self.metrics.quality_trend(12),
+            'quarter_topic_mix': [{'topic': topic, 'count': count} for topic, count in self.metrics.quarter_topic_mix()]
+        }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.send_body(200, body, 'application/json; charset=utf-8')
+    
+    def stream_events(self):
+        """SSE配信（接続時に全指標、以降は変更分のみ）"""
+        self.send_response(200)
+        self.send_header('Content-type', 'text/event-stream; charset=utf-8')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        
+        subscriber = self.events.subscribe()
+        try:
+            summary = self.events.current_summary()
+            if summary is not None:
+                self.write_event(json.dumps(summary, ensure_ascii=False, separators=(',', ':')))
             
-            try:
-                with open('usage_data.json', 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                html = self.generate_dashboard_html(data)
-                self.wfile.write(html.encode('utf-8'))
-            except Exception as e:
-                error_html = f"<html><body><h1>エラー: {e}</h1></body></html>"
-                self.wfile.write(error_html.encode('utf-8'))
+            while True:
+                try:
+                    self.write_event(subscriber.get(timeout=KEEPALIVE_INTERVAL))
+                except queue.Empty:
+                    self.wfile.write(b": keepalive\n\n")
+                    self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.events.unsubscribe(subscriber)
+    
+    def write_event(self, payload):
+        """SSEイベント1件送信"""
+        self.wfile.write(f"data: {payload}\n\n".encode('utf-8'))
+        self.wfile.flush()
     
-    def generate_dashboard_html(self, data):
+    @staticmethod
+    def generate_dashboard_html(data):
         """ダッシュボードHTML生成"""
         daily_count = data.get('daily_count', 0)
         monthly_count = data.get('monthly_count', 0)
         quality_posts = data.get('quality_posts', 0)
-        total_posts = data.get('total_posts', 0) or 1
+        total_posts = data.get('total_posts', 0)
         
         usage_rate = (monthly_count / 90) * 100
-        quality_rate = (quality_posts / total_posts) * 100
+        quality_rate = (quality_posts / (total_posts or 1)) * 100
+        
+        history = data.get('post_history') or []
+        latest = history[-1] if history else None
+        latest_text = (f"{latest.get('timestamp', '')[:19]} / {latest.get('topic', '')} / 品質 {latest.get('quality_score', 0):.3f}"
+                       if latest else 'N/A')
         
         return f"""
 <!DOCTYPE html>
@@ -60,54 +276,103 @@ class DashboardHandler(BaseHTTPRequestHandler):
 <body>
     <div class="container">
         <h1>🤖 AI自動ツイートBot 監視ダッシュボード</h1>
-        <div class="update-time">最終更新: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</div>
+        <div class="update-time">最終更新: <span id="updated-at">{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</span></div>
         
-        <div class="metric {'good' if daily_count <= 3 else 'danger'}">
+        <div id="daily-metric" class="metric {'good' if daily_count <= 3 else 'danger'}">
             <h3>本日投稿数</h3>
-            <div style="font-size: 24px; font-weight: bold;">{daily_count}/3</div>
+            <div id="daily-count" style="font-size: 24px; font-weight: bold;">{daily_count}/3</div>
             <div class="progress-bar">
-                <div class="progress-fill {'good' if daily_count <= 3 else 'danger'}" style="width: {min((daily_count/3)*100, 100)}%"></div>
+                <div id="daily-bar" class="progress-fill {'good' if daily_count <= 3 else 'danger'}" style="width: {min((daily_count/3)*100, 100)}%"></div>
             </div>
         </div>
         
-        <div class="metric {'good' if usage_rate < 70 else 'warning' if usage_rate < 85 else 'danger'}">
+        <div id="usage-metric" class="metric {'good' if usage_rate < 70 else 'warning' if usage_rate < 85 else 'danger'}">
             <h3>月間使用率</h3>
-            <div style="font-size: 24px; font-weight: bold;">{usage_rate:.1f}%</div>
-            <div style="font-size: 14px;">{monthly_count}/90投稿</div>
+            <div id="usage-rate" style="font-size: 24px; font-weight: bold;">{usage_rate:.1f}%</div>
+            <div id="monthly-count" style="font-size: 14px;">{monthly_count}/90投稿</div>
             <div class="progress-bar">
-                <div class="progress-fill {'good' if usage_rate < 70 else 'warning' if usage_rate < 85 else 'danger'}" style="width: {usage_rate}%"></div>
+                <div id="usage-bar" class="progress-fill {'good' if usage_rate < 70 else 'warning' if usage_rate < 85 else 'danger'}" style="width: {usage_rate}%"></div>
             </div>
         </div>
         
-        <div class="metric {'good' if quality_rate >= 80 else 'warning'}">
+        <div id="quality-metric" class="metric {'good' if quality_rate >= 80 else 'warning'}">
             <h3>品質投稿率</h3>
-            <div style="font-size: 24px; font-weight: bold;">{quality_rate:.1f}%</div>
-            <div style="font-size: 14px;">{quality_posts}/{total_posts}投稿</div>
+            <div id="quality-rate" style="font-size: 24px; font-weight: bold;">{quality_rate:.1f}%</div>
+            <div id="quality-count" style="font-size: 14px;">{quality_posts}/{total_posts}投稿</div>
             <div class="progress-bar">
-                <div class="progress-fill {'good' if quality_rate >= 80 else 'warning'}" style="width: {quality_rate}%"></div>
+                <div id="quality-bar" class="progress-fill {'good' if quality_rate >= 80 else 'warning'}" style="width: {quality_rate}%"></div>
             </div>
         </div>
         
         <div style="margin-top: 30px;">
             <h3>📊 詳細統計</h3>
             <p><strong>システム稼働開始:</strong> {data.get('system_start', 'N/A')}</p>
-            <p><strong>最終更新:</strong> {data.get('last_update', 'N/A')}</p>
-            <p><strong>総投稿数:</strong> {total_posts}</p>
-            <p><strong>高品質投稿数:</strong> {quality_posts}</p>
+            <p><strong>最終更新:</strong> <span id="last-update">{data.get('last_update', 'N/A')}</span></p>
+            <p><strong>総投稿数:</strong> <span id="total-posts">{total_posts}</span></p>
+            <p><strong>高品質投稿数:</strong> <span id="quality-posts">{quality_posts}</span></p>
+            <p><strong>最新投稿:</strong> <span id="latest-post">{latest_text}</span></p>
         </div>
     </div>
     
     <script>
-        // 30秒毎に自動更新
-        setTimeout(() => location.reload(), 30000);
+        // /events の変更通知で表示を部分更新（SSE非対応ブラウザは30秒毎に再読み込み）
+        const state = {{}};
+        function setMetric(id, status) {{
+            document.getElementById(id + '-metric').className = 'metric ' + status;
+            document.getElementById(id + '-bar').className = 'progress-fill ' + status;
+        }}
+        function render() {{
+            const daily = state.daily_count, limit = state.daily_limit;
+            document.getElementById('daily-count').textContent = daily + '/' + limit;
+            document.getElementById('daily-bar').style.width = Math.min(daily / limit * 100, 100) + '%';
+            setMetric('daily', daily <= limit ? 'good' : 'danger');
+            
+            const usage = state.usage_rate;
+            document.getElementById('usage-rate').textContent = usage.toFixed(1) + '%';
+            document.getElementById('monthly-count').textContent = state.monthly_count + '/' + state.monthly_limit + '投稿';
+            document.getElementById('usage-bar').style.width = usage + '%';
+            setMetric('usage', usage < 70 ? 'good' : usage < 85 ? 'warning' : 'danger');
+            
+            const quality = state.quality_rate, total = state.total_posts;
+            document.getElementById('quality-rate').textContent = quality.toFixed(1) + '%';
+            document.getElementById('quality-count').textContent = state.quality_posts + '/' + total + '投稿';
+            document.getElementById('quality-bar').style.width = quality + '%';
+            setMetric('quality', quality >= 80 ? 'good' : 'warning');
+            
+            document.getElementById('last-update').textContent = state.last_update || 'N/A';
+            document.getElementById('total-posts').textContent = total;
+            document.getElementById('quality-posts').textContent = state.quality_posts;
+            const latest = state.latest_post;
+            document.getElementById('latest-post').textContent = latest
+                ? `${{(latest.timestamp || '').slice(0, 19)}} / ${{latest.topic}} / 品質 ${{Number(latest.quality_score).toFixed(3)}}`
+                : 'N/A';
+            document.getElementById('updated-at').textContent = new Date().toLocaleString('ja-JP');
+        }}
+        if (window.EventSource) {{
+            new EventSource('/events').onmessage = (event) => {{
+                Object.assign(state, JSON.parse(event.data));
+                render();
+            }};
+        }} else {{
+            setTimeout(() => location.reload(), 30000);
+        }}
     </script>
 </body>
 </html>
         """
 
-def run_dashboard(port=8000):
+def run_dashboard(port=8000, data_file='usage_data.json'):
     """ダッシュボード起動"""
-    server = HTTPServer(('localhost', port), DashboardHandler)
+    DashboardHandler.cache = DashboardCache(data_file)
+    DashboardHandler.events = UsageEventHub(DashboardHandler.cache)
+    state_dir = os.path.dirname(data_file)
+    DashboardHandler.prometheus_file = os.path.join(state_dir, 'bot_metrics.prom')
+    DashboardHandler.metrics = MetricsStore(
+        data_file=os.path.join(state_dir, 'post_metrics.bin'),
+        rollup_file=os.path.join(state_dir, 'post_metrics_rollups.json')
+    )
+    server = ThreadingHTTPServer(('localhost', port), DashboardHandler)
+    server.daemon_threads = True
     print(f"🌐 監視ダッシュボード起動: http://localhost:{port}")
     print("Ctrl+C で停止")
     try:
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+投稿済みコンテンツの完全一致重複ストア
+- 固定長リングバッファ: 直近N件を挿入順に保持
+- Bloomフィルター: 長期履歴を固定サイズで保持
+- いずれも一時ファイル経由で置換して保存し、破損・切り詰められたファイルは警告の上で空から作り直す
+- 旧形式 content_hashes.json（先頭100文字のMD5、最大100件）は読み取り専用で照合
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import struct
+import threading
+from typing import FrozenSet, List, Optional, Set
+
+RING_MAGIC = b'CHRB'
+BLOOM_MAGIC = b'CHBF'
+HEADER_FORMAT = '<4sIII'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+DIGEST_SIZE = 16
+# 旧形式のハッシュ対象（本文の先頭文字数）
+LEGACY_PREFIX_LENGTH = 100
+
+logger = logging.getLogger(__name__)
+
+
+class RingBufferStore:
+    """固定長リングバッファ（ダイジェスト16バイト×容量）"""
+
+    def __init__(self, path: str, capacity: int = 1000):
+        self.path = path
+        self.capacity = capacity
+        self.head = 0
+        self.count = 0
+        self.slots: List[Optional[bytes]] = [None] * capacity
+        self.members: Set[bytes] = set()
+        self.load()
+
+    def load(self) -> None:
+        """ファイル読み込み（容量が異なる場合は挿入順を保って詰め直す）"""
+        try:
+            with open(self.path, 'rb') as f:
+                header = f.read(HEADER_SIZE)
+                magic, capacity, head, count = struct.unpack(HEADER_FORMAT, header)
+                if magic != RING_MAGIC or capacity == 0 or head >= capacity or count > capacity:
+                    raise ValueError(f"不正なリングバッファファイル: {self.path}")
+                body = f.read(capacity * DIGEST_SIZE)
+                if len(body) != capacity * DIGEST_SIZE:
+                    raise ValueError(f"リングバッファファイルが途中で切れています: {self.path}")
+        except FileNotFoundError:
+            self.create()
+            return
+        except (struct.error, ValueError) as e:
+            logger.warning(f"⚠️ 重複ストア読み込みエラー、空で作り直します: {e}")
+            self.create()
+            return
+
+        # 古い順に並べ替え
+        start = (head - count) % capacity
+        ordered = [
+            body[((start + i) % capacity) * DIGEST_SIZE:((start + i) % capacity + 1) * DIGEST_SIZE]
+            for i in range(count)
+        ]
+
+        if capacity == self.capacity:
+            for i, digest in enumerate(ordered):
+                self.slots[(start + i) % capacity] = digest
+            self.head, self.count = head, count
+            self.members = set(ordered)
+        else:
+            kept = ordered[-self.capacity:]
+            self.slots = kept + [None] * (self.capacity - len(kept))
+            self.head, self.count = len(kept) % self.capacity, len(kept)
+            self.members = set(kept)
+            self.save()
+
+    def create(self) -> None:
+        """空ファイル作成"""
+        self.head = 0
+        self.count = 0
+        self.slots = [None] * self.capacity
+        self.members = set()
+        self.save()
+
+    def save(self) -> None:
+        """ファイル保存（一時ファイル経由で置換）"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(struct.pack(HEADER_FORMAT, RING_MAGIC, self.capacity, self.head, self.count))
+            f.write(b''.join(digest or b'\0' * DIGEST_SIZE for digest in self.slots))
+        os.replace(tmp_path, self.path)
+
+    def __contains__(self, digest: bytes) -> bool:
+        return digest in self.members
+
+    def append(self, digest: bytes) -> None:
+        """末尾追加（満杯時は最古を上書き）"""
+        evicted = self.slots[self.head]
+        if evicted is not None:
+            self.members.discard(evicted)
+        self.slots[self.head] = digest
+        self.members.add(digest)
+        self.head = (self.head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        self.save()
+
+    def recent(self) -> List[bytes]:
+        """古い順のダイジェスト一覧"""
+        start = (self.head - self.count) % self.capacity
+        return [self.slots[(start + i) % self.capacity] for i in range(self.count)]
+
+    def __len__(self) -> int:
+        return self.count
+
+
+class BloomFilter:
+    """ファイル永続Bloomフィルター"""
+
+    def __init__(self, path: str, capacity: int = 100000, error_rate: float = 0.001):
+        self.path = path
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.count = 0
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.load()
+
+    def load(self) -> None:
+        """ファイル読み込み（サイズ設定が異なる場合・破損時は作り直し）"""
+        try:
+            with open(self.path, 'rb') as f:
+                magic, num_bits, num_hashes, count = struct.unpack(HEADER_FORMAT, f.read(HEADER_SIZE))
+                if magic == BLOOM_MAGIC and num_bits == self.num_bits and num_hashes == self.num_hashes:
+                    bits = f.read(len(self.bits))
+                    if len(bits) != len(self.bits):
+                        raise ValueError(f"Bloomフィルターファイルが途中で切れています: {self.path}")
+                    self.bits = bytearray(bits)
+                    self.count = count
+                    return
+        except FileNotFoundError:
+            pass
+        except (struct.error, ValueError) as e:
+            logger.warning(f"⚠️ Bloomフィルター読み込みエラー、空で作り直します: {e}")
+        self.create()
+
+    def create(self) -> None:
+        """空ファイル作成"""
+        self.count = 0
+        self.bits = bytearray(len(self.bits))
+        self.save()
+
+    def save(self) -> None:
+        """ファイル保存（一時ファイル経由で置換）"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(struct.pack(HEADER_FORMAT, BLOOM_MAGIC, self.num_bits, self.num_hashes, self.count))
+            f.write(bytes(self.bits))
+        os.replace(tmp_path, self.path)
+
+    def positions(self, digest: bytes) -> List[int]:
+        """ダブルハッシングによるビット位置"""
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:16], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def __contains__(self, digest: bytes) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self.positions(digest))
+
+    def add(self, digest: bytes) -> None:
+        """登録（ビットが変化した場合のみ保存）"""
+        changed = False
+        for pos in self.positions(digest):
+            mask = 1 << (pos & 7)
+            if not self.bits[pos >> 3] & mask:
+                self.bits[pos >> 3] |= mask
+                changed = True
+        if not changed:
+            return
+
+        self.count += 1
+        self.save()
+
+
+class ContentHashStore:
+    """直近リングバッファ + 長期Bloomフィルターの重複ストア"""
+
+    def __init__(self, ring_file: str = 'content_hashes.ring', bloom_file: Optional[str] = 'content_hashes.bloom',
+                 capacity: int = 1000, bloom_capacity: int = 100000, bloom_error_rate: float = 0.001,
+                 legacy_file: Optional[str] = 'content_hashes.json'):
+        self.lock = threading.Lock()
+        self.ring = RingBufferStore(ring_file, capacity)
+        self.bloom = BloomFilter(bloom_file, bloom_capacity, bloom_error_rate) if bloom_file else None
+        self.legacy_digests = self.load_legacy(legacy_file) if legacy_file else frozenset()
+
+    @staticmethod
+    def load_legacy(legacy_file: str) -> FrozenSet[bytes]:
+        """旧形式 content_hashes.json の読み込み（ダイジェストの算出方法が異なるため別集合で保持）"""
+        try:
+            with open(legacy_file, 'r') as f:
+                return frozenset(bytes.fromhex(hex_digest) for hex_digest in json.load(f))
+        except (FileNotFoundError, ValueError, TypeError):
+            return frozenset()
+
+    @staticmethod
+    def legacy_digest(content: str) -> bytes:
+        """旧形式のダイジェスト（本文先頭100文字のMD5）"""
+        return hashlib.md5(content[:LEGACY_PREFIX_LENGTH].encode()).digest()
+
+    def contains_legacy(self, content: str) -> bool:
+        """旧形式の投稿履歴との一致"""
+        return bool(self.legacy_digests) and self.legacy_digest(content) in self.legacy_digests
+
+    def __contains__(self, digest: bytes) -> bool:
+        with self.lock:
+            if digest in self.ring:
+                return True
+            return self.bloom is not None and digest in self.bloom
+
+    def add(self, digest: bytes) -> None:
+        """ダイジェスト登録"""
+        with self.lock:
+            if digest in self.ring:
+                return
+            self.ring.append(digest)
+            if self.bloom is not None:
+                self.bloom.add(digest)
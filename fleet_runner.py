@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+複数アカウント一括実行ランナー
+- アカウントプロファイル（accounts.json）を読み込み、有界ワーカープールで並行実行
+- 使用量・重複判定はアカウント別ディレクトリで分離
+- コンテンツプール・品質スコアラーは全アカウントで共有
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List
+
+from content_pool import ContentPool
+from free_tier_bot import FreeTierOptimizedBot
+from quality_scorer import QualityScorer
+from rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+def load_profiles(path: str = 'accounts.json') -> List[Dict[str, Any]]:
+    """アカウントプロファイル読み込み
+
+    形式: [{"name": "main", "env_prefix": "MAIN_", "state_dir": "accounts/main"}, ...]
+    認証情報は {env_prefix}TWITTER_API_KEY などの環境変数から取得する
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        profiles = json.load(f)
+
+    for profile in profiles:
+        if 'name' not in profile:
+            raise ValueError(f"アカウント名が未設定のプロファイル: {profile}")
+        profile.setdefault('env_prefix', f"{profile['name'].upper()}_")
+        profile.setdefault('state_dir', os.path.join('accounts', profile['name']))
+    return profiles
+
+
+def resolve_credentials(profile: Dict[str, Any]) -> Dict[str, str]:
+    """プロファイルの環境変数接頭辞から認証情報を解決"""
+    prefix = profile['env_prefix']
+    credentials = {
+        key: os.getenv(f"{prefix}{env_var}")
+        for key, env_var in FreeTierOptimizedBot.CREDENTIAL_ENV_VARS.items()
+    }
+    missing = [f"{prefix}{FreeTierOptimizedBot.CREDENTIAL_ENV_VARS[key]}"
+               for key, value in credentials.items() if not value]
+    if missing:
+        raise ValueError(f"不足環境変数: {missing}")
+    return credentials
+
+
+class FleetRunner:
+    """複数アカウント並行実行"""
+
+    def __init__(self, profiles: List[Dict[str, Any]], max_workers: int = 4,
+                 pool_file: str = 'content_pool.json', rate_limit_file: str = 'rate_limits.json'):
+        self.profiles = profiles
+        self.max_workers = max_workers
+
+        # 全アカウント共有キャッシュ
+        self.content_pool = ContentPool(pool_file)
+        self.quality_scorer = QualityScorer()
+        self.rate_limiter = RateLimiter(rate_limit_file)
+
+    def run_account(self, profile: Dict[str, Any]) -> Dict[str, Any]:
+        """1アカウント分の実行"""
+        started = time.monotonic()
+        result = {'account': profile['name'], 'success': False, 'error': None, 'next_allowed_at': None}
+        bot = None
+
+        try:
+            bot = FreeTierOptimizedBot(
+                account_name=profile['name'],
+                credentials=resolve_credentials(profile),
+                state_dir=profile['state_dir'],
+                content_pool=self.content_pool,
+                quality_scorer=self.quality_scorer,
+                rate_limiter=self.rate_limiter
+            )
+            result['success'] = bot.run_optimized_system()
+            result['next_allowed_at'] = bot.next_allowed_at
+        except Exception as e:
+            logger.error(f"❌ アカウント実行エラー [{profile['name']}]: {e}")
+            result['error'] = str(e)
+        finally:
+            if bot is not None:
+                bot.close()
+
+        result['duration'] = round(time.monotonic() - started, 2)
+        return result
+
+    def run(self) -> List[Dict[str, Any]]:
+        """全アカウント並行実行（結果はプロファイル順）"""
+        workers = max(1, min(self.max_workers, len(self.profiles)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='fleet') as executor:
+            results = list(executor.map(self.run_account, self.profiles))
+        self.rate_limiter.save()
+        return results
+
+
+def format_results(results: List[Dict[str, Any]]) -> str:
+    """アカウント別結果レポート"""
+    lines = [
+        "=" * 60,
+        "🤖 複数アカウント実行結果",
+        "=" * 60
+    ]
+    for result in results:
+        status = "✅ 投稿" if result['success'] else ("❌ エラー" if result['error'] else "⏸️ スキップ")
+        line = f"  {result['account']}: {status} ({result['duration']}秒)"
+        if result['error']:
+            line += f" - {result['error']}"
+        elif result['next_allowed_at']:
+            resume_at = datetime.fromtimestamp(result['next_allowed_at']).strftime('%Y-%m-%d %H:%M:%S')
+            line += f" - 次回投稿可能: {resume_at}"
+        lines.append(line)
+
+    posted = sum(1 for result in results if result['success'])
+    lines.extend([
+        "-" * 60,
+        f"  投稿 {posted}/{len(results)} アカウント",
+        "=" * 60
+    ])
+    return "\n".join(lines)
+
+
+def main():
+    """メイン実行"""
+    parser = argparse.ArgumentParser(description='複数アカウント一括実行')
+    parser.add_argument('--accounts', default='accounts.json', help='アカウントプロファイルJSON')
+    parser.add_argument('--workers', type=int, default=4, help='同時実行アカウント数')
+    args = parser.parse_args()
+
+    runner = FleetRunner(load_profiles(args.accounts), max_workers=args.workers)
+    results = runner.run()
+    print(format_results(results))
+
+
+if __name__ == "__main__":
+    main()
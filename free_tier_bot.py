@@ -7,63 +7,208 @@
 - 使用量自動管理
 """
 
-import tweepy
-import openai
 import time
 import random
 import logging
 import json
 import os
 import hashlib
+import argparse
+import threading
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+
+from api_ledger import ApiLedger, BudgetExceeded
+from clock import SystemClock
+from completion_cache import CompletionCache, completion_key
+from config import COMPLETION_CACHE_CONFIG
+from content_pool import ContentPool
+from dedup_store import ContentHashStore
+from identity_cache import IdentityCache, credential_fingerprint
+from instrumentation import REGISTRY, inc, span, timed
+from logging_setup import configure_logging
+from metrics_store import MetricsStore
+from near_duplicate import NearDuplicateIndex
+from quality_scorer import QualityScorer
+from rate_limiter import RateLimiter
+from stream_generation import TWEET_WEIGHTED_LIMIT, collect_stream, truncate_to_budget, weighted_length
+from usage_store import create_usage_store
 
 class FreeTierOptimizedBot:
     """無料枠最適化AI自動ツイートBot"""
     
-    def __init__(self):
-        """初期化"""
+    # 高価値トピック定義
+    PREMIUM_TOPICS = [
+        {
+            "name": "効率化テクニック",
+            "prompt": "今すぐ実践できるビジネス効率化のテクニックを、具体的な手順2-3ステップで140文字以内で紹介してください。数値や時間短縮効果も含めてください。",
+            "hashtags": ["#効率化", "#生産性", "#時短術"],
+            "quality_multiplier": 1.0
+        },
+        {
+            "name": "成長マインド",
+            "prompt": "毎日の成長につながる具体的な行動や習慣を、実践方法と期待効果と共に140文字以内で紹介してください。",
+            "hashtags": ["#成長", "#習慣", "#自己投資"],
+            "quality_multiplier": 0.95
+        },
+        {
+            "name": "問題解決フレームワーク",
+            "prompt": "日常業務の問題を効率的に解決する思考法やフレームワークを、使い方の手順と共に140文字以内で紹介してください。",
+            "hashtags": ["#問題解決", "#思考法", "#フレームワーク"],
+            "quality_multiplier": 1.0
+        },
+        {
+            "name": "チーム効率化",
+            "prompt": "チームの生産性や協力を向上させる具体的な方法を、実施手順と効果と共に140文字以内で紹介してください。",
+            "hashtags": ["#チームワーク", "#リーダーシップ", "#組織運営"],
+            "quality_multiplier": 0.9
+        },
+        {
+            "name": "ツール活用術",
+            "prompt": "業務効率を劇的に上げる便利なツール・アプリ・機能を、設定方法や使いこなしのコツと共に140文字以内で紹介してください。",
+            "hashtags": ["#ツール", "#アプリ", "#デジタル化"],
+            "quality_multiplier": 0.95
+        }
+    ]
+    
+    # 認証情報と環境変数名の対応
+    CREDENTIAL_ENV_VARS = {
+        'bearer_token': 'TWITTER_BEARER_TOKEN',
+        'consumer_key': 'TWITTER_API_KEY',
+        'consumer_secret': 'TWITTER_API_SECRET',
+        'access_token': 'TWITTER_ACCESS_TOKEN',
+        'access_token_secret': 'TWITTER_ACCESS_TOKEN_SECRET'
+    }
+    
+    def __init__(self, account_name: Optional[str] = None, credentials: Optional[Dict[str, str]] = None,
+                 state_dir: str = '.', content_pool: Optional[ContentPool] = None,
+                 quality_scorer: Optional[QualityScorer] = None,
+                 rate_limiter: Optional[RateLimiter] = None, clock: Optional[SystemClock] = None):
+        """初期化（複数アカウント運用時はアカウント別の認証情報・状態ディレクトリを指定）"""
+        self.account_name = account_name
+        # 時刻取得（シミュレーション時は VirtualClock を注入）
+        self.clock = clock or SystemClock()
+        self.credentials = credentials or {
+            key: os.getenv(env_var) for key, env_var in self.CREDENTIAL_ENV_VARS.items()
+        }
+        self.state_dir = state_dir
+        os.makedirs(state_dir, exist_ok=True)
+        
+        # レート制限はアカウント×エンドポイント単位（複数アカウントで1つを共有可能）
+        self.rate_limiter = rate_limiter or RateLimiter(self.state_path('rate_limits.json'))
+        self.rate_limit_account = account_name or 'default'
+        self.metric_labels = {'account': self.rate_limit_account}
+        self.next_allowed_at: Optional[float] = None
+        
+        # APIクライアントは初回使用時に生成（tweepy/openaiの読み込みを必要な処理まで遅延）
+        self.twitter_client: Optional[Any] = None
+        self.openai_module: Optional[Any] = None
+        self.identity_cache = IdentityCache(self.state_path('identity_cache.json'))
+        self.credential_fingerprint = credential_fingerprint(self.credentials)
+        
+        # 外部API呼び出しの記録・月間予算管理（アカウント別）
+        self.api_ledger = ApiLedger(
+            ledger_file=self.state_path('api_ledger.jsonl'),
+            summary_file=self.state_path('api_ledger_summary.json'),
+            clock=self.clock
+        )
+        
         self.setup_logging()
         self.setup_apis()
         self.setup_limits()
+        
+        # 生成結果キャッシュ（アカウント別）
+        self.completion_cache = CompletionCache(
+            cache_file=self.state_path(COMPLETION_CACHE_CONFIG['file']),
+            ttl=COMPLETION_CACHE_CONFIG['ttl_seconds'],
+            max_keys=COMPLETION_CACHE_CONFIG['max_keys'],
+            max_completions=COMPLETION_CACHE_CONFIG['max_completions'],
+            prefetch=COMPLETION_CACHE_CONFIG['prefetch'],
+            replay=COMPLETION_CACHE_CONFIG['replay'],
+            clock=self.clock
+        )
+        
+        # プール・スコアラーは複数アカウントで共有可能
+        self.content_pool = content_pool or ContentPool()
+        self.quality_scorer = quality_scorer or QualityScorer()
+        
+        # 重複判定・使用量はアカウント別（判定と記録はパイプラインのワーカースレッドから並行して呼ばれるため直列化）
+        self.dedup_lock = threading.RLock()
+        self.near_duplicate_index: Optional[NearDuplicateIndex] = None
+        self.content_hash_store = ContentHashStore(
+            ring_file=self.state_path('content_hashes.ring'),
+            bloom_file=self.state_path('content_hashes.bloom'),
+            legacy_file=self.state_path('content_hashes.json')
+        )
+        self.usage_store = create_usage_store(state_dir=state_dir)
+        self.usage_data: Optional[Dict[str, Any]] = None
+        # 生成プロンプトに添えるRSS見出し（デーモンのフィード更新で設定）
+        self.feed_headlines: List[str] = []
+        self.metrics_store = MetricsStore(
+            data_file=self.state_path('post_metrics.bin'),
+            rollup_file=self.state_path('post_metrics_rollups.json')
+        )
         self.logger.info("🚀 FreeTierOptimizedBot v2.0 初期化完了")
     
+    def state_path(self, filename: str) -> str:
+        """アカウント別状態ファイルのパス"""
+        return os.path.join(self.state_dir, filename)
+    
     def setup_logging(self):
         """ログ設定"""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('bot_execution.log', encoding='utf-8'),
-                logging.StreamHandler()
-            ]
-        )
-        self.logger = logging.getLogger(__name__)
+        # 出力はキュー経由（ファイル書き込み・ローテーション・圧縮はリスナースレッドで実行）
+        configure_logging()
+        logger_name = f"{__name__}.{self.account_name}" if self.account_name else __name__
+        self.logger = logging.getLogger(logger_name)
     
+    @timed('api_setup')
     def setup_apis(self):
-        """API初期化"""
+        """API初期化（認証情報が変わっていなければキャッシュ済みのアカウント情報を使用）"""
         try:
-            # Twitter API v2 設定
-            self.twitter_client = tweepy.Client(
-                bearer_token=os.getenv('TWITTER_BEARER_TOKEN'),
-                consumer_key=os.getenv('TWITTER_API_KEY'),
-                consumer_secret=os.getenv('TWITTER_API_SECRET'),
-                access_token=os.getenv('TWITTER_ACCESS_TOKEN'),
-                access_token_secret=os.getenv('TWITTER_ACCESS_TOKEN_SECRET'),
-                wait_on_rate_limit=True
-            )
+            identity = self.identity_cache.get(self.credential_fingerprint)
+            if identity:
+                self.logger.info(f"✅ Twitter認証済み（キャッシュ）: @{identity['username']}")
+                return
             
-            # OpenAI設定
-            openai.api_key = os.getenv('OPENAI_API_KEY')
+            # 認証テスト（読み取り枠に余裕がある場合のみ）
+            allowed, _ = self.rate_limiter.acquire('get_me', self.rate_limit_account, now=self.clock.time())
+            if allowed:
+                me = self.api_ledger.call('get_me', self.get_twitter_client().get_me,
+                                          account=self.rate_limit_account)
+                self.identity_cache.store(self.credential_fingerprint, me.data.id, me.data.username)
+                self.logger.info(f"✅ Twitter認証成功: @{me.data.username}")
+            else:
+                self.logger.info("⏭️ 認証テストをスキップ（get_me 枠不足）")
             
-            # 認証テスト
-            me = self.twitter_client.get_me()
-            self.logger.info(f"✅ Twitter認証成功: @{me.data.username}")
+        except BudgetExceeded as e:
+            self.logger.warning(f"⏭️ 認証テストをスキップ（{e}）")
             
         except Exception as e:
             self.logger.error(f"❌ API初期化エラー: {e}")
             raise
     
+    def get_twitter_client(self):
+        """Twitter APIクライアント取得（初回のみtweepy読み込み・生成）"""
+        if self.twitter_client is None:
+            import tweepy
+            
+            # Twitter API v2 設定
+            # レート制限はRateLimiterで管理（tweepy内部の長時間スリープを無効化）
+            self.twitter_client = tweepy.Client(
+                **self.credentials,
+                wait_on_rate_limit=False
+            )
+        return self.twitter_client
+    
+    def get_openai(self):
+        """OpenAIモジュール取得（初回のみ読み込み・APIキー設定）"""
+        if self.openai_module is None:
+            import openai
+            
+            openai.api_key = os.getenv('OPENAI_API_KEY')
+            self.openai_module = openai
+        return self.openai_module
+    
     def setup_limits(self):
         """制限設定"""
         self.DAILY_LIMIT = 3          # 1日3投稿
@@ -71,26 +216,41 @@ class FreeTierOptimizedBot:
         self.QUALITY_THRESHOLD = 0.8  # 品質基準
         self.MIN_INTERVAL = 300       # 5分間隔
         self.MAX_RETRIES = 2          # 最大リトライ
+        self.RETRY_BACKOFF = 15       # 一時エラー時の再試行間隔（秒×試行回数）
+        self.MAX_INLINE_WAIT = 60     # 実行中に待機してよい最大秒数
+        self.CANDIDATES_PER_REQUEST = 3  # 1リクエストあたりの生成候補数
+        self.STREAM_GENERATION = True  # ストリーミング生成（投稿文字数の上限・品質見込みで打ち切り）
+        self.POOL_TARGET_SIZE = 21    # プール目標在庫（1週間分）
+        self.NEAR_DUPLICATE_THRESHOLD = 0.8  # 類似判定閾値（推定Jaccard係数）
+        self.FEED_CONTEXT_SIZE = 3    # 生成プロンプトに添える最新ニュース見出し数
     
     def load_usage_data(self) -> Dict[str, Any]:
-        """使用量データ読み込み"""
-        data_file = 'usage_data.json'
-        today = datetime.now().strftime('%Y-%m-%d')
-        current_month = datetime.now().strftime('%Y-%m')
-        
-        try:
-            with open(data_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except FileNotFoundError:
-            data = self.create_new_usage_data(today, current_month)
+        """使用量データ読み込み（ストアからの読み込みは実行中1回のみ）"""
+        today = self.clock.now().strftime('%Y-%m-%d')
+        current_month = self.clock.now().strftime('%Y-%m')
+        
+        data = self.usage_data
+        changed = False
+        if data is None:
+            data = self.usage_store.load()
+            if data is None:
+                data = self.create_new_usage_data(today, current_month)
+                changed = True
         
         # 日次/月次リセット
         if data.get('current_date') != today:
             data = self.reset_daily_counter(data, today)
+            changed = True
         
         if data.get('current_month') != current_month:
             data = self.reset_monthly_counter(data, current_month)
+            changed = True
         
+        # リセット結果はカウンター加算より先に永続化
+        if changed:
+            self.save_usage_data(data)
+        
+        self.usage_data = data
         return data
     
     def create_new_usage_data(self, today: str, current_month: str) -> Dict[str, Any]:
@@ -102,8 +262,8 @@ class FreeTierOptimizedBot:
             'monthly_count': 0,
             'total_posts': 0,
             'quality_posts': 0,
-            'system_start': datetime.now().isoformat(),
-            'last_reset': datetime.now().isoformat(),
+            'system_start': self.clock.now().isoformat(),
+            'last_reset': self.clock.now().isoformat(),
             'post_history': []
         }
     
@@ -112,7 +272,7 @@ class FreeTierOptimizedBot:
         self.logger.info(f"📅 日次リセット実行: {today}")
         data['current_date'] = today
         data['daily_count'] = 0
-        data['last_reset'] = datetime.now().isoformat()
+        data['last_reset'] = self.clock.now().isoformat()
         return data
     
     def reset_monthly_counter(self, data: Dict[str, Any], current_month: str) -> Dict[str, Any]:
@@ -120,17 +280,19 @@ class FreeTierOptimizedBot:
         self.logger.info(f"📅 月次リセット実行: {current_month}")
         data['current_month'] = current_month
         data['monthly_count'] = 0
-        data['last_reset'] = datetime.now().isoformat()
+        data['last_reset'] = self.clock.now().isoformat()
         return data
     
+    @timed('state_save')
     def save_usage_data(self, data: Dict[str, Any]) -> None:
         """使用量データ保存"""
+        self.usage_data = data
         try:
-            with open('usage_data.json', 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            self.usage_store.save(data)
         except Exception as e:
             self.logger.error(f"❌ データ保存エラー: {e}")
     
+    @timed('limit_check')
     def check_posting_limits(self) -> bool:
         """投稿制限チェック"""
         data = self.load_usage_data()
@@ -156,157 +318,238 @@ class FreeTierOptimizedBot:
     def generate_premium_content(self) -> Dict[str, Any]:
         """プレミアム品質コンテンツ生成"""
         
-        # 高価値トピック定義
-        premium_topics = [
-            {
-                "name": "効率化テクニック",
-                "prompt": "今すぐ実践できるビジネス効率化のテクニックを、具体的な手順2-3ステップで140文字以内で紹介してください。数値や時間短縮効果も含めてください。",
-                "hashtags": ["#効率化", "#生産性", "#時短術"],
-                "quality_multiplier": 1.0
-            },
-            {
-                "name": "成長マインド",
-                "prompt": "毎日の成長につながる具体的な行動や習慣を、実践方法と期待効果と共に140文字以内で紹介してください。",
-                "hashtags": ["#成長", "#習慣", "#自己投資"],
-                "quality_multiplier": 0.95
-            },
-            {
-                "name": "問題解決フレームワーク",
-                "prompt": "日常業務の問題を効率的に解決する思考法やフレームワークを、使い方の手順と共に140文字以内で紹介してください。",
-                "hashtags": ["#問題解決", "#思考法", "#フレームワーク"],
-                "quality_multiplier": 1.0
-            },
-            {
-                "name": "チーム効率化",
-                "prompt": "チームの生産性や協力を向上させる具体的な方法を、実施手順と効果と共に140文字以内で紹介してください。",
-                "hashtags": ["#チームワーク", "#リーダーシップ", "#組織運営"],
-                "quality_multiplier": 0.9
-            },
-            {
-                "name": "ツール活用術",
-                "prompt": "業務効率を劇的に上げる便利なツール・アプリ・機能を、設定方法や使いこなしのコツと共に140文字以内で紹介してください。",
-                "hashtags": ["#ツール", "#アプリ", "#デジタル化"],
-                "quality_multiplier": 0.95
-            }
-        ]
-        
         # 重み付きランダム選択
-        weights = [topic['quality_multiplier'] for topic in premium_topics]
-        selected_topic = random.choices(premium_topics, weights=weights)[0]
+        weights = [topic['quality_multiplier'] for topic in self.PREMIUM_TOPICS]
+        selected_topic = random.choices(self.PREMIUM_TOPICS, weights=weights)[0]
         
         try:
             self.logger.info(f"🎯 選択トピック: {selected_topic['name']}")
             
-            # GPT-3.5-turbo でコンテンツ生成
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """あなたは実用的なビジネス価値を提供する専門家です。以下を重視してください：
-                        - 今すぐ実践できる具体的な内容
-                        - 明確な手順やステップ
-                        - 読み手にとっての明確なメリット
-                        - 簡潔で分かりやすい表現
-                        - 数値や具体例を含める"""
-                    },
-                    {
-                        "role": "user",
-                        "content": selected_topic["prompt"]
-                    }
-                ],
-                max_tokens=120,
-                temperature=0.7,
-                top_p=0.9,
-                frequency_penalty=0.3
-            )
-            
-            base_content = response.choices[0].message.content.strip()
-            
-            # ハッシュタグ選択（2個）
-            selected_hashtags = random.sample(selected_topic["hashtags"], 2)
-            hashtag_text = " ".join(selected_hashtags)
-            
-            # 文字数調整
-            max_content_length = 280 - len(hashtag_text) - 2
-            if len(base_content) > max_content_length:
-                base_content = base_content[:max_content_length-3] + "..."
+            # 全候補を評価し最高スコアを採用
+            candidates = self.generate_candidates(selected_topic)
+            if not candidates:
+                self.logger.warning("⚠️ 全候補が生成途中で品質基準未達")
+                return self.get_premium_fallback()
+            ranked = sorted(candidates, key=lambda candidate: candidate['quality_score'], reverse=True)
+            passing = [candidate for candidate in ranked if candidate['quality_score'] >= self.QUALITY_THRESHOLD]
+            self.logger.info(f"🧪 生成候補: {len(candidates)}件 (基準達成 {len(passing)}件, 最高 {ranked[0]['quality_score']:.3f})")
+            if not passing:
+                # 基準未達は品質ゲートで不合格として記録
+                return ranked[0]
             
-            final_content = f"{base_content} {hashtag_text}"
+            # 基準達成候補をスコア順に重複ゲートで確認（記録は投稿前のゲートで行う）
+            fresh = []
+            for candidate in passing:
+                if self.check_content_duplicate(candidate['content'], record=False):
+                    inc('duplicate_rejection', **self.metric_labels)
+                else:
+                    fresh.append(candidate)
+            if not fresh:
+                self.logger.warning("⚠️ 基準達成候補がすべて類似コンテンツ")
+                return self.get_premium_fallback()
             
-            # 品質評価
-            quality_score = self.calculate_quality_score(base_content, selected_topic)
+            # 採用しなかった基準達成候補は次回以降に払い出し（切り詰め前の生成結果をキャッシュに戻す）
+            self.completion_cache.put(
+                completion_key(self.build_completion_request(selected_topic)),
+                [candidate['raw_content'] for candidate in fresh[1:]]
+            )
             
-            return {
-                "content": final_content,
-                "base_content": base_content,
-                "quality_score": quality_score,
-                "topic": selected_topic["name"],
-                "content_length": len(final_content),
-                "hashtags": selected_hashtags,
-                "generation_time": datetime.now().isoformat()
-            }
+            return fresh[0]
             
         except Exception as e:
             self.logger.error(f"❌ コンテンツ生成エラー: {e}")
             return self.get_premium_fallback()
     
-    def calculate_quality_score(self, content: str, topic_info: Dict[str, Any]) -> float:
-        """詳細品質スコア計算"""
-        score = 0.6  # ベーススコア
-        
-        # 具体性指標 (+0.15)
-        concrete_words = [
-            "方法", "手順", "ステップ", "やり方", "コツ", "テクニック", 
-            "ツール", "アプリ", "設定", "操作", "活用", "実践"
-        ]
-        concrete_count = sum(1 for word in concrete_words if word in content)
-        if concrete_count >= 3:
-            score += 0.15
-        elif concrete_count >= 2:
-            score += 0.1
-        elif concrete_count >= 1:
-            score += 0.05
-        
-        # 実用性指標 (+0.1)
-        action_words = [
-            "できる", "始める", "試す", "使う", "実行", "導入", 
-            "適用", "取り入れる", "実施", "活用"
-        ]
-        if sum(1 for word in action_words if word in content) >= 2:
-            score += 0.1
-        elif any(word in content for word in action_words):
-            score += 0.05
-        
-        # 価値・効果指標 (+0.1)
-        value_words = [
-            "効果", "向上", "改善", "解決", "短縮", "節約", 
-            "効率", "便利", "簡単", "成果", "メリット"
+    def generate_candidates(self, topic_info: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """指定トピックの投稿候補を一括生成・採点"""
+        return [
+            self.build_content_candidate(text.strip(), topic_info)
+            for text in self.request_completions(topic_info)
         ]
-        if any(word in content for word in value_words):
-            score += 0.1
+    
+    def build_completion_request(self, topic_info: Dict[str, Any], feed_context: bool = False) -> Dict[str, Any]:
+        """生成リクエストのパラメータ（候補数を除く、見出しなしの既定値はキャッシュキーに使用）"""
+        # GPT-3.5-turbo でコンテンツ生成
+        return dict(
+            model="gpt-3.5-turbo",
+            messages=[
+                {
+                    "role": "system",
+                    "content": """あなたは実用的なビジネス価値を提供する専門家です。以下を重視してください：
+                    - 今すぐ実践できる具体的な内容
+                    - 明確な手順やステップ
+                    - 読み手にとっての明確なメリット
+                    - 簡潔で分かりやすい表現
+                    - 数値や具体例を含める"""
+                },
+                {
+                    "role": "user",
+                    "content": self.build_user_prompt(topic_info, feed_context)
+                }
+            ],
+            max_tokens=120,
+            temperature=0.7,
+            top_p=0.9,
+            frequency_penalty=0.3
+        )
+    
+    def build_user_prompt(self, topic_info: Dict[str, Any], feed_context: bool = False) -> str:
+        """トピックのプロンプト（feed_context 指定時はフィード見出しを話題の参考として添える）"""
+        if not feed_context or not self.feed_headlines:
+            return topic_info["prompt"]
+        headlines = "\n".join(f"- {title}" for title in self.feed_headlines)
+        return f"{topic_info['prompt']}\n\n話題の参考（最新ニュース見出し、関連する場合のみ取り入れてください）:\n{headlines}"
+    
+    def update_feed_context(self, feeds: Dict[str, List[Dict[str, Any]]]) -> None:
+        """収集したフィードの見出しを生成プロンプト用に保持（各フィードの先頭から順に最大 FEED_CONTEXT_SIZE 件）"""
+        headlines: List[str] = []
+        for depth in range(max((len(entries) for entries in feeds.values()), default=0)):
+            for entries in feeds.values():
+                if depth < len(entries) and entries[depth].get('title') and entries[depth]['title'] not in headlines:
+                    headlines.append(entries[depth]['title'])
+        self.feed_headlines = headlines[:self.FEED_CONTEXT_SIZE]
+    
+    @timed('generation')
+    def request_completions(self, topic_info: Dict[str, Any]) -> List[str]:
+        """OpenAIへの生成リクエスト（キャッシュ済みの未使用結果を優先し、不足分のみ新規生成）"""
+        # 見出しは定期更新で入れ替わるためキーに含めず、先読み分をトピック単位で再利用できるようにする
+        key = completion_key(self.build_completion_request(topic_info))
+        needed = self.CANDIDATES_PER_REQUEST
+        
+        texts = self.completion_cache.take(key, needed)
+        if len(texts) >= needed:
+            inc('completion_cache_hit', **self.metric_labels)
+            return texts
+        
+        # 1リクエストで不足分＋先読み分を生成
+        request = self.build_completion_request(topic_info, feed_context=True)
+        count = needed - len(texts) + self.completion_cache.prefetch
+        # 予算確認用の見積もりトークン数: プロンプト約200 + 最大生成数×候補数
+        estimated_tokens = 200 + request['max_tokens'] * count
+        inc('completion_cache_miss', **self.metric_labels)
+        
+        if self.STREAM_GENERATION:
+            result = self.api_ledger.call(
+                'chat_completion', self.stream_completions,
+                account=self.rate_limit_account, estimated_tokens=estimated_tokens,
+                topic_info=topic_info, count=count, request=request
+            )
+            generated = result.texts
+            if result.aborted:
+                inc('stream_abort', **self.metric_labels)
+            if result.rejected:
+                inc('stream_rejection', result.rejected, **self.metric_labels)
+        else:
+            response = self.api_ledger.call(
+                'chat_completion',
+                self.get_openai().ChatCompletion.create,
+                account=self.rate_limit_account,
+                estimated_tokens=estimated_tokens,
+                n=count,
+                **request
+            )
+            generated = [choice.message.content.strip() for choice in response.choices]
+        
+        missing = needed - len(texts)
+        self.completion_cache.put(key, generated[missing:], used=generated[:missing])
+        return texts + generated[:missing]
+    
+    def stream_completions(self, topic_info: Dict[str, Any], count: int, request: Dict[str, Any]):
+        """ストリーミング生成（投稿文字数の上限に達した候補は文末で確定、見込みのない候補は途中で破棄）"""
+        chunks = self.get_openai().ChatCompletion.create(stream=True, n=count, **request)
+        # ストリーミング応答には usage がないため、プロンプトは文字数から推定
+        prompt_tokens = sum(len(message['content']) for message in request['messages'])
+        return collect_stream(chunks, count, self.content_budget(topic_info), self.QUALITY_THRESHOLD,
+                              self.quality_scorer, topic_info, prompt_tokens)
+    
+    def content_budget(self, topic_info: Dict[str, Any]) -> int:
+        """本文に使える加重文字数（最長のハッシュタグ2個を付けても上限内に収まる長さ）"""
+        longest = sorted(topic_info["hashtags"], key=weighted_length, reverse=True)[:2]
+        return TWEET_WEIGHTED_LIMIT - weighted_length(" ".join(longest)) - 2
+    
+    def fill_content_pool(self, target_size: Optional[int] = None) -> int:
+        """コンテンツプール補充（生成・採点・重複除外してディスク保存）"""
+        target_size = target_size or self.POOL_TARGET_SIZE
+        current_size = self.content_pool.size()
+        self.logger.info(f"📦 プール補充開始: 在庫{current_size}件 → 目標{target_size}件")
+        
+        added_total = 0
+        # 基準未達・重複を見込んで必要回数の2倍までリクエスト
+        needed = max(target_size - current_size, 0)
+        max_requests = 2 * ((needed + self.CANDIDATES_PER_REQUEST - 1) // self.CANDIDATES_PER_REQUEST)
+        for request_index in range(max_requests):
+            if current_size >= target_size:
+                break
+            
+            # トピックを順番に巡回して偏りを防ぐ
+            topic_info = self.PREMIUM_TOPICS[request_index % len(self.PREMIUM_TOPICS)]
+            try:
+                candidates = self.generate_candidates(topic_info)
+            except BudgetExceeded as e:
+                self.logger.warning(f"🛑 プール補充を中断: {e}")
+                break
+            except Exception as e:
+                self.logger.error(f"❌ プール補充生成エラー: {e}")
+                continue
+            
+            passing = [c for c in candidates if c['quality_score'] >= self.QUALITY_THRESHOLD]
+            added = self.content_pool.add_candidates(passing)
+            added_total += added
+            current_size += added
+            self.logger.info(f"   {topic_info['name']}: {len(candidates)}件生成 / {added}件追加")
+        
+        self.logger.info(f"📦 プール補充完了: {added_total}件追加 (在庫{current_size}件)")
+        return added_total
+    
+    def acquire_content(self) -> Dict[str, Any]:
+        """投稿コンテンツ取得（プール優先、空なら即時生成）"""
+        pooled = self.content_pool.pop_next(
+            self.QUALITY_THRESHOLD,
+            weights={topic['name']: topic['quality_multiplier'] for topic in self.PREMIUM_TOPICS},
+            is_duplicate=lambda entry: self.check_content_duplicate(entry['content'], record=False)
+        )
+        if pooled:
+            self.logger.info(f"📦 プールから取得: {pooled['topic']} (残り{self.content_pool.size()}件)")
+            return pooled
         
-        # 数値・具体例 (+0.05)
-        import re
-        if re.search(r'\d+', content):
-            score += 0.03
-        if any(char in content for char in ['：', ':', '→', '・', '①', '②', '③']):
-            score += 0.02
+        self.logger.info("📭 プール在庫なし、即時生成に切替")
+        return self.generate_premium_content()
+    
+    def build_content_candidate(self, base_content: str, topic_info: Dict[str, Any]) -> Dict[str, Any]:
+        """生成テキストから投稿候補を構築"""
+        # ハッシュタグ選択（2個）
+        selected_hashtags = random.sample(topic_info["hashtags"], 2)
+        hashtag_text = " ".join(selected_hashtags)
+        
+        # 文字数調整（加重文字数、文末があれば文末で切り詰め）
+        raw_content = base_content
+        max_content_length = TWEET_WEIGHTED_LIMIT - weighted_length(hashtag_text) - 2
+        base_content = truncate_to_budget(base_content, max_content_length)
         
-        # 文字数最適化 (+0.05)
-        content_length = len(content)
-        if 90 <= content_length <= 180:
-            score += 0.05
-        elif 70 <= content_length <= 220:
-            score += 0.03
+        final_content = f"{base_content} {hashtag_text}"
         
-        # トピック品質倍率適用
-        final_score = score * topic_info.get('quality_multiplier', 1.0)
+        # 品質評価
+        quality_score = self.calculate_quality_score(base_content, topic_info)
         
-        return round(min(final_score, 1.0), 3)
+        return {
+            "content": final_content,
+            "base_content": base_content,
+            "raw_content": raw_content,
+            "quality_score": quality_score,
+            "topic": topic_info["name"],
+            "content_length": len(final_content),
+            "hashtags": selected_hashtags,
+            "generation_time": self.clock.now().isoformat()
+        }
+    
+    @timed('scoring')
+    def calculate_quality_score(self, content: str, topic_info: Dict[str, Any]) -> float:
+        """詳細品質スコア計算"""
+        return self.quality_scorer.score(content, topic_info)
     
     def get_premium_fallback(self) -> Dict[str, Any]:
         """プレミアム品質フォールバック"""
+        inc('fallback', **self.metric_labels)
         premium_fallbacks = [
             {
                 "content": "会議開始前に「今日決める3つのこと」をホワイトボードに書く。議論が脱線した時の軌道修正が劇的に早くなる。30分→15分短縮も可能。 #効率化 #会議術",
@@ -335,56 +578,124 @@ class FreeTierOptimizedBot:
         ]
         
         selected = random.choice(premium_fallbacks)
-        selected['generation_time'] = datetime.now().isoformat()
+        selected['generation_time'] = self.clock.now().isoformat()
         self.logger.info(f"🔄 プレミアムフォールバック使用: {selected['topic']}")
         return selected
     
-    def check_content_duplicate(self, content: str) -> bool:
-        """コンテンツ重複チェック"""
-        content_hash = hashlib.md5(content[:100].encode()).hexdigest()
-        
+    def get_near_duplicate_index(self) -> NearDuplicateIndex:
+        """類似検出インデックス取得（初回のみ読み込み）"""
+        with self.dedup_lock:
+            if self.near_duplicate_index is None:
+                self.near_duplicate_index = NearDuplicateIndex(
+                    index_file=self.state_path('near_duplicate_index.jsonl'),
+                    threshold=self.NEAR_DUPLICATE_THRESHOLD
+                )
+            return self.near_duplicate_index
+    
+    @timed('dedup')
+    def check_content_duplicate(self, content: str, record: bool = True) -> bool:
+        """コンテンツ重複チェック（完全一致 + 類似検出、record=True なら未重複のコンテンツを記録）"""
+        content_digest = hashlib.md5(content.encode()).digest()
+        near_duplicate_index = self.get_near_duplicate_index()
+        signature = near_duplicate_index.signature(content)
+        
+        # 判定から記録までを直列化（並行する判定が同じ内容を両方とも未重複と判定しないように）
+        with self.dedup_lock:
+            if content_digest in self.content_hash_store or self.content_hash_store.contains_legacy(content):
+                return True
+            
+            # 類似コンテンツ検出（ハッシュタグ違い・数文字違いも重複扱い）
+            match = near_duplicate_index.query_signature(signature)
+            if match:
+                self.logger.info(f"🔁 類似投稿あり: 推定類似度 {match[1]:.2f}")
+                return True
+            if not record:
+                return False
+            near_duplicate_index.add_signature(signature)
+            
+            # 新しいハッシュを追加（直近はリングバッファ、長期はBloomフィルター）
+            self.content_hash_store.add(content_digest)
+            
+            return False
+    
+    def record_posted(self, content: str) -> None:
+        """投稿成功したコンテンツを重複ストアに記録"""
+        # 投稿済みのため記録失敗で再試行しない（例外はログのみ）
         try:
-            with open('content_hashes.json', 'r') as f:
-                posted_hashes = set(json.load(f))
-        except FileNotFoundError:
-            posted_hashes = set()
-        
-        if content_hash in posted_hashes:
-            return True
-        
-        # 新しいハッシュを追加
-        posted_hashes.add(content_hash)
-        
-        # 最新100件のみ保持
-        if len(posted_hashes) > 100:
-            posted_hashes = set(list(posted_hashes)[-100:])
-        
-        with open('content_hashes.json', 'w') as f:
-            json.dump(list(posted_hashes), f)
-        
-        return False
+            near_duplicate_index = self.get_near_duplicate_index()
+            signature = near_duplicate_index.signature(content)
+            with self.dedup_lock:
+                near_duplicate_index.add_signature(signature)
+                self.content_hash_store.add(hashlib.md5(content.encode()).digest())
+        except Exception as e:
+            self.logger.error(f"❌ 重複ストア記録エラー: {e}")
     
     def execute_safe_posting(self, content_data: Dict[str, Any]) -> bool:
-        """安全投稿実行"""
+        """安全投稿実行（品質・重複ゲート通過後に投稿、見送り・失敗時はプールに戻す）"""
+        if not self.gate_content(content_data):
+            return False
+        
+        posted = False
+        try:
+            posted = self.post_content(content_data)
+        finally:
+            if not posted:
+                self.return_to_pool(content_data)
+        return posted
+    
+    def return_to_pool(self, content_data: Dict[str, Any]) -> None:
+        """未投稿の基準達成コンテンツをプールに戻す"""
+        if content_data['quality_score'] >= self.QUALITY_THRESHOLD:
+            self.content_pool.add_candidates([content_data])
+    
+    def gate_content(self, content_data: Dict[str, Any]) -> bool:
+        """品質・重複ゲート（重複ストアへの記録は投稿成功時のみ、見送り・失敗したコンテンツは再利用可能）"""
         
         # 品質チェック
         if content_data["quality_score"] < self.QUALITY_THRESHOLD:
             self.logger.warning(f"⚠️ 品質基準未達: {content_data['quality_score']:.3f} < {self.QUALITY_THRESHOLD}")
+            inc('quality_rejection', **self.metric_labels)
             return False
         
         # 重複チェック
-        if self.check_content_duplicate(content_data["content"]):
+        if self.check_content_duplicate(content_data["content"], record=False):
             self.logger.warning("⚠️ 類似コンテンツ検出、投稿スキップ")
+            inc('duplicate_rejection', **self.metric_labels)
             return False
         
-        # 投稿実行
+        return True
+    
+    def post_content(self, content_data: Dict[str, Any]) -> bool:
+        """投稿実行（レート制限・再試行処理込み）"""
+        import tweepy
+        
+        # 投稿実行（待機はMAX_INLINE_WAIT以内のみ、それ以上は次回実行に回す）
         for attempt in range(self.MAX_RETRIES):
+            allowed, earliest = self.rate_limiter.acquire('create_tweet', self.rate_limit_account, now=self.clock.time())
+            if not allowed:
+                wait_time = earliest - self.clock.time()
+                if wait_time > self.MAX_INLINE_WAIT:
+                    self.defer_posting(earliest)
+                    return False
+                self.logger.info(f"⏳ 投稿枠待機: {wait_time:.0f}秒")
+                self.clock.sleep(max(wait_time, 0))
+                allowed, earliest = self.rate_limiter.acquire('create_tweet', self.rate_limit_account, now=self.clock.time())
+                if not allowed:
+                    self.defer_posting(earliest)
+                    return False
+            
             try:
-                response = self.twitter_client.create_tweet(text=content_data["content"])
+                with span('create_tweet', **self.metric_labels):
+                    response = self.api_ledger.call(
+                        'create_tweet', self.get_twitter_client().create_tweet,
+                        account=self.rate_limit_account, text=content_data["content"]
+                    )
                 
                 # 成功時データ更新
+                self.record_posted(content_data["content"])
                 self.update_usage_after_success(content_data, response.data['id'])
                 
+                inc('post_success', **self.metric_labels)
                 self.logger.info("✅ 高品質ツイート投稿成功!")
                 self.logger.info(f"   🔗 ID: {response.data['id']}")
                 self.logger.info(f"   ⭐ 品質: {content_data['quality_score']:.3f}")
@@ -393,9 +704,26 @@ class FreeTierOptimizedBot:
                 
                 return True
                 
-            except tweepy.TooManyRequests:
-                self.logger.warning("⏳ レート制限: 15分待機中...")
-                time.sleep(900)
+            except BudgetExceeded as e:
+                self.logger.warning(f"🛑 投稿見送り: {e}")
+                return False
+                
+            except tweepy.TooManyRequests as e:
+                headers = e.response.headers if getattr(e, 'response', None) is not None else {}
+                now = self.clock.time()
+                earliest = self.rate_limiter.update_from_headers('create_tweet', self.rate_limit_account, headers, now=now)
+                if earliest <= now:
+                    # ヘッダーなしの場合は15分窓の終了まで見送り
+                    earliest = self.rate_limiter.defer('create_tweet', self.rate_limit_account, 900, now=now)
+                self.logger.warning("⏳ レート制限応答を受信")
+                self.defer_posting(earliest)
+                return False
+                
+            except tweepy.Unauthorized as e:
+                # 認証情報が失効した場合は次回起動時に再確認
+                self.identity_cache.invalidate(self.credential_fingerprint)
+                self.logger.error(f"❌ 認証エラー: {e}")
+                return False
                 
             except tweepy.Forbidden as e:
                 self.logger.error(f"❌ 投稿権限エラー: {e}")
@@ -403,14 +731,26 @@ class FreeTierOptimizedBot:
                 
             except Exception as e:
                 if attempt < self.MAX_RETRIES - 1:
-                    wait_time = 60 * (attempt + 1)
                     self.logger.error(f"❌ 投稿エラー (試行{attempt+1}): {e}")
-                    time.sleep(wait_time)
+                    inc('retry', **self.metric_labels)
+                    self.rate_limiter.defer(
+                        'create_tweet', self.rate_limit_account, self.RETRY_BACKOFF * (attempt + 1),
+                        now=self.clock.time()
+                    )
                 else:
                     self.logger.error(f"❌ 最終投稿失敗: {e}")
+                    inc('post_failure', **self.metric_labels)
         
         return False
     
+    def defer_posting(self, earliest: float) -> None:
+        """投稿を見送り、次に投稿可能な時刻を記録"""
+        self.next_allowed_at = earliest
+        inc('rate_limited', **self.metric_labels)
+        self.rate_limiter.save()
+        resume_at = datetime.fromtimestamp(earliest).strftime('%Y-%m-%d %H:%M:%S')
+        self.logger.warning(f"⏳ レート制限: {resume_at} まで投稿不可、今回はスキップ")
+    
     def update_usage_after_success(self, content_data: Dict[str, Any], tweet_id: str) -> None:
         """投稿成功後のデータ更新"""
         data = self.load_usage_data()
@@ -423,7 +763,7 @@ class FreeTierOptimizedBot:
         
         # 投稿履歴追加
         post_record = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': self.clock.now().isoformat(),
             'tweet_id': tweet_id,
             'quality_score': content_data['quality_score'],
             'topic': content_data['topic'],
@@ -436,17 +776,39 @@ class FreeTierOptimizedBot:
         
         data['post_history'].append(post_record)
         
-        # 履歴は最新50件のみ保持
+        # メモリ上の履歴は最新50件のみ保持（SQLiteストアは全件保存）
         if len(data['post_history']) > 50:
             data['post_history'] = data['post_history'][-50:]
         
-        data['last_update'] = datetime.now().isoformat()
+        data['last_update'] = self.clock.now().isoformat()
+        self.usage_data = data
+        
+        # カウンター加算と履歴追加のみ書き込み
+        try:
+            with span('state_save', **self.metric_labels):
+                self.usage_store.record_post(data, post_record)
+        except Exception as e:
+            self.logger.error(f"❌ データ保存エラー: {e}")
         
-        self.save_usage_data(data)
+        # 長期メトリクス記録（初回は既存履歴を取り込み）
+        try:
+            self.metrics_store.backfill(data['post_history'][:-1])
+            self.metrics_store.record(
+                datetime.fromisoformat(post_record['timestamp']), post_record['quality_score'],
+                post_record['topic'], post_record['content_length'], tweet_id
+            )
+        except Exception as e:
+            self.logger.error(f"❌ メトリクス記録エラー: {e}")
+    
+    def close(self) -> None:
+        """使用量ストア等のリソース解放"""
+        self.usage_store.close()
+        self.rate_limiter.save()
     
-    def run_optimized_system(self) -> None:
-        """最適化システムメイン実行"""
-        execution_start = datetime.now()
+    def run_optimized_system(self) -> bool:
+        """最適化システムメイン実行（投稿成功時True）"""
+        execution_start = self.clock.now()
+        success = False
         
         self.logger.info("="*60)
         self.logger.info("🚀 無料枠最適化AI自動ツイートBot v2.0 実行開始")
@@ -460,11 +822,11 @@ class FreeTierOptimizedBot:
             # 投稿制限チェック
             if not self.check_posting_limits():
                 self.logger.info("🛑 投稿制限により実行終了")
-                return
+                return success
             
-            # 高品質コンテンツ生成
-            self.logger.info("🎨 プレミアムコンテンツ生成中...")
-            content_data = self.generate_premium_content()
+            # 高品質コンテンツ取得（プール優先）
+            self.logger.info("🎨 プレミアムコンテンツ準備中...")
+            content_data = self.acquire_content()
             
             # 生成結果表示
             self.logger.info("📝 生成結果:")
@@ -487,23 +849,70 @@ class FreeTierOptimizedBot:
             self.logger.error(f"詳細エラー:\n{traceback.format_exc()}")
             
         finally:
-            execution_time = datetime.now() - execution_start
+            self.export_usage_json()
+            self.export_metrics()
+            
+            execution_time = self.clock.now() - execution_start
             self.logger.info(f"⏱️ 実行時間: {execution_time.total_seconds():.1f}秒")
             self.logger.info("="*60)
             self.logger.info("🏁 システム実行終了")
             self.logger.info("="*60)
+        
+        return success
+    
+    def run_pipeline_system(self, slots: int) -> int:
+        """非同期パイプラインで複数枠を連続実行（投稿成功数を返す）"""
+        # asyncio の読み込みはパイプライン実行時のみ（通常の同期実行の起動時間に含めない）
+        from async_pipeline import run_pipeline
+        
+        self.logger.info(f"🚀 パイプライン実行開始: {slots}枠")
+        try:
+            results = run_pipeline(self, slots=slots)
+        finally:
+            self.export_usage_json()
+            self.export_metrics()
+        return sum(results)
+    
+    def export_usage_json(self) -> None:
+        """監視ツール・レポート用に usage_data.json 互換データを出力"""
+        try:
+            self.usage_store.export_json(self.state_path('usage_data.json'))
+        except Exception as e:
+            self.logger.error(f"❌ 使用量エクスポートエラー: {e}")
+
+    def export_metrics(self) -> None:
+        """段階別計測結果を Prometheus テキスト形式で出力（dashboard.py の /metrics で配信）"""
+        try:
+            REGISTRY.write(self.state_path('bot_metrics.prom'))
+        except Exception as e:
+            self.logger.error(f"❌ メトリクス出力エラー: {e}")
 
 def main():
     """メインエントリーポイント"""
+    parser = argparse.ArgumentParser(description='無料枠最適化AI自動ツイートBot')
+    parser.add_argument('--fill', action='store_true', help='コンテンツプール補充のみ実行')
+    parser.add_argument('--pool-size', type=int, default=None, help='プール目標在庫数')
+    parser.add_argument('--slots', type=int, default=None, help='非同期パイプラインで連続実行する投稿枠数')
+    args = parser.parse_args()
+    
+    bot = None
     try:
         bot = FreeTierOptimizedBot()
-        bot.run_optimized_system()
+        if args.fill:
+            bot.fill_content_pool(args.pool_size)
+        elif args.slots:
+            bot.run_pipeline_system(args.slots)
+        else:
+            bot.run_optimized_system()
     except KeyboardInterrupt:
         print("🛑 ユーザーによる中断")
     except Exception as e:
         print(f"💥 システム起動エラー: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        if bot is not None:
+            bot.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+認証済みアカウント情報のキャッシュ
+- 認証情報のフィンガープリント（SHA-256）単位でユーザー名・IDを保持
+- 認証情報が変わっていない・有効期限内なら get_me() による確認を省略
+- 認証情報そのものは保存しない
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Any, Optional
+
+DEFAULT_TTL = 7 * 24 * 3600
+
+
+def credential_fingerprint(credentials: Dict[str, Optional[str]]) -> str:
+    """認証情報のフィンガープリント"""
+    material = json.dumps(credentials, sort_keys=True)
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+class IdentityCache:
+    """認証済みアカウント情報キャッシュ"""
+
+    def __init__(self, cache_file: str = 'identity_cache.json', ttl: float = DEFAULT_TTL):
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.records: Dict[str, Dict[str, Any]] = self.load()
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """キャッシュ読み込み"""
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def save(self) -> None:
+        """キャッシュ保存（一時ファイル経由で置換）"""
+        tmp_file = f"{self.cache_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.records, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, self.cache_file)
+
+    def get(self, fingerprint: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """有効期限内のアカウント情報取得"""
+        now = time.time() if now is None else now
+        record = self.records.get(fingerprint)
+        if record and now - record.get('verified_at', 0) < self.ttl:
+            return record
+        return None
+
+    def store(self, fingerprint: str, user_id: str, username: str, now: Optional[float] = None) -> Dict[str, Any]:
+        """確認済みアカウント情報の記録"""
+        record = {
+            'user_id': str(user_id),
+            'username': username,
+            'verified_at': time.time() if now is None else now
+        }
+        self.records[fingerprint] = record
+        self.save()
+        return record
+
+    def invalidate(self, fingerprint: str) -> None:
+        """認証エラー時などにキャッシュを破棄"""
+        if self.records.pop(fingerprint, None) is not None:
+            self.save()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+処理段階別の計測
+- span() で各段階（API初期化・制限確認・生成・採点・重複判定・投稿・状態保存）の所要時間をヒストグラムに記録
+- inc() で再試行・フォールバック・品質不合格などの件数を記録
+- Prometheus テキスト形式で出力（dashboard.py の /metrics、またはバッチ実行時のファイル出力）
+"""
+
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+STAGE_METRIC = 'bot_stage_duration_seconds'
+EVENT_METRIC = 'bot_events_total'
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """累積バケット方式のヒストグラム"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """観測値の記録"""
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+
+
+class MetricsRegistry:
+    """プロセス内メトリクス"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self.counters: Dict[str, Dict[LabelKey, float]] = {}
+        self.help: Dict[str, Tuple[str, str]] = {
+            STAGE_METRIC: ('histogram', '処理段階別の所要時間（秒）'),
+            EVENT_METRIC: ('counter', '再試行・フォールバック・品質不合格などの発生件数'),
+        }
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """ヒストグラムに記録"""
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram()
+            series[key].observe(value)
+
+    def inc(self, name: str, amount: float = 1, **labels: str) -> None:
+        """カウンター加算"""
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def render(self) -> str:
+        """Prometheus テキスト形式で出力"""
+        lines: List[str] = []
+        with self.lock:
+            for name, series in sorted(self.histograms.items()):
+                self.render_header(lines, name, 'histogram')
+                for key, histogram in sorted(series.items()):
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        lines.append(f"{name}_bucket{format_labels(key, le=format_value(bound))} {count}")
+                    lines.append(f"{name}_bucket{format_labels(key, le='+Inf')} {histogram.count}")
+                    lines.append(f"{name}_sum{format_labels(key)} {format_value(histogram.sum)}")
+                    lines.append(f"{name}_count{format_labels(key)} {histogram.count}")
+
+            for name, series in sorted(self.counters.items()):
+                self.render_header(lines, name, 'counter')
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{format_labels(key)} {format_value(value)}")
+
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def render_header(self, lines: List[str], name: str, metric_type: str) -> None:
+        """HELP / TYPE 行"""
+        _, description = self.help.get(name, (metric_type, name))
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {metric_type}")
+
+    def write(self, path: str) -> None:
+        """ファイル出力（node_exporter textfile collector 形式、一時ファイル経由で置換）"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+    def reset(self) -> None:
+        """全メトリクス消去"""
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+
+def format_labels(key: LabelKey, **extra: str) -> str:
+    """ラベル表記"""
+    pairs = list(key) + list(extra.items())
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{escape_label(value)}"' for name, value in pairs) + '}'
+
+
+def escape_label(value: str) -> str:
+    """ラベル値のエスケープ（バックスラッシュ・二重引用符・改行）"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_value(value: float) -> str:
+    """数値表記"""
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# プロセス共通のレジストリ
+REGISTRY = MetricsRegistry()
+
+
+@contextmanager
+def span(stage: str, **labels: str) -> Iterator[None]:
+    """処理段階の所要時間を計測（例外時も記録）"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        REGISTRY.observe(STAGE_METRIC, time.perf_counter() - started, stage=stage, **labels)
+
+
+def inc(event: str, amount: float = 1, **labels: str) -> None:
+    """イベント件数の加算"""
+    REGISTRY.inc(EVENT_METRIC, amount, event=event, **labels)
+
+
+def timed(stage: str):
+    """メソッドの所要時間を計測するデコレーター（インスタンスの metric_labels をラベルに付与）"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with span(stage, **getattr(self, 'metric_labels', {})):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
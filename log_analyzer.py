@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+実行ログの増分解析
+- 前回の読み取り位置（バイトオフセット）から追記分のみをチャンク単位で読み込み
+- エラー・再試行・フォールバック・レート制限・投稿成功・実行時間を集計し状態ファイルに累積
+- ログのローテーション（inode変化・サイズ縮小・先頭バイト変化）を検出し、前回読んでいたファイルを退避済みセグメント
+  （.N / .N.gz）から先頭バイトで特定して未解析分を読み、以降のセグメント全体を古い順に読んでから新しいファイルを先頭から読む
+"""
+
+import gzip
+import json
+import os
+import re
+from datetime import datetime
+from typing import Dict, Any, BinaryIO, List
+
+CHUNK_SIZE = 1024 * 1024
+RECENT_DURATIONS = 100
+# 先頭バイトの照合長（削除後の inode 再利用でもローテーションを検出し、退避後のセグメントを特定、
+# タイムスタンプに加えて先頭行の本文まで含める）
+HEAD_BYTES = 256
+
+# (集計キー, ログ中の目印) ― バイト列のまま判定してデコードを省略
+COUNTER_MARKERS = [
+    ('errors', ' - ERROR - '.encode('utf-8')),
+    ('warnings', ' - WARNING - '.encode('utf-8')),
+    ('retries', '投稿エラー (試行'.encode('utf-8')),
+    ('fallbacks', 'フォールバック使用'.encode('utf-8')),
+    ('rate_limited', 'レート制限: '.encode('utf-8')),
+    ('posts', 'ツイート投稿成功'.encode('utf-8')),
+]
+DURATION_MARKER = '実行時間: '.encode('utf-8')
+DURATION_PATTERN = re.compile(r'実行時間: ([\d.]+)秒'.encode('utf-8'))
+
+
+class LogAnalyzer:
+    """実行ログの増分解析"""
+
+    def __init__(self, log_file: str = 'bot_execution.log', state_file: str = 'log_analytics.json',
+                 chunk_size: int = CHUNK_SIZE):
+        self.log_file = log_file
+        self.state_file = state_file
+        self.chunk_size = chunk_size
+        self.state = self.load()
+
+    def load(self) -> Dict[str, Any]:
+        """解析状態読み込み"""
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return self.create_state()
+
+    @staticmethod
+    def create_state() -> Dict[str, Any]:
+        """初期状態"""
+        return {
+            'offset': 0,
+            'inode': None,
+            'head': '',
+            'bytes_processed': 0,
+            'lines': 0,
+            'rotations': 0,
+            'counters': {key: 0 for key, _ in COUNTER_MARKERS},
+            'runs': 0,
+            'duration_total': 0.0,
+            'duration_max': 0.0,
+            'recent_durations': [],
+            'last_analyzed': None
+        }
+
+    def save(self) -> None:
+        """解析状態保存（一時ファイル経由で置換）"""
+        tmp_file = f"{self.state_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, self.state_file)
+
+    def update(self) -> Dict[str, Any]:
+        """前回位置以降の追記分を解析して集計を更新"""
+        try:
+            stat = os.stat(self.log_file)
+        except FileNotFoundError:
+            return self.summary()
+
+        state = self.state
+        head = self.read_head(self.log_file)
+        saved_head = state.get('head', '')
+        if state['inode'] != stat.st_ino or stat.st_size < state['offset'] or not head.startswith(saved_head):
+            # ローテーション・切り詰め: 退避済みセグメントの残りを解析後、新しいファイルを先頭から解析（累積値は維持）
+            if state['inode'] is not None:
+                state['rotations'] += 1
+                self.analyze_rotated_segments()
+            state['offset'] = 0
+            state['inode'] = stat.st_ino
+
+        state['head'] = head
+        start_offset = state['offset']
+        with open(self.log_file, 'rb') as f:
+            f.seek(start_offset)
+            state['offset'] = self.scan(f, start_offset)
+
+        state['bytes_processed'] += state['offset'] - start_offset
+        state['last_analyzed'] = datetime.now().isoformat()
+        self.save()
+        return self.summary()
+
+    def scan(self, f: BinaryIO, offset: int) -> int:
+        """現在位置から末尾までチャンク単位で解析し、解析済み位置を返す"""
+        remainder = b''
+        while True:
+            chunk = f.read(self.chunk_size)
+            if not chunk:
+                break
+            offset += len(chunk)
+            lines = (remainder + chunk).split(b'\n')
+            # 書き込み途中の最終行は次回に持ち越し
+            remainder = lines.pop()
+            for line in lines:
+                self.analyze_line(line)
+        return offset - len(remainder)
+
+    def segment_paths(self) -> List[str]:
+        """退避済みセグメント一覧（新しい順: .1, .2, ...）"""
+        paths = []
+        while True:
+            number = len(paths) + 1
+            for path in (f"{self.log_file}.{number}.gz", f"{self.log_file}.{number}"):
+                if os.path.exists(path):
+                    paths.append(path)
+                    break
+            else:
+                return paths
+
+    @staticmethod
+    def open_segment(path: str) -> BinaryIO:
+        """セグメントをバイナリで開く（.gz は展開しながら読む）"""
+        if path.endswith('.gz'):
+            return gzip.open(path, 'rb')
+        return open(path, 'rb')
+
+    def read_head(self, path: str) -> str:
+        """ファイル先頭バイト（16進）"""
+        with self.open_segment(path) as f:
+            return f.read(HEAD_BYTES).hex()
+
+    def analyze_rotated_segments(self) -> None:
+        """前回読んでいたセグメントの未解析分と、それ以降に退避されたセグメント全体を古い順に解析"""
+        saved_head = self.state.get('head')
+        if not saved_head:
+            return
+
+        segments = self.segment_paths()
+        for index, path in enumerate(segments):
+            if self.read_head(path).startswith(saved_head):
+                break
+        else:
+            # 保持数を超えて削除済み: 残っているセグメントとの前後関係が不明なため読まない
+            return
+
+        for position in range(index, -1, -1):
+            offset = self.state['offset'] if position == index else 0
+            with self.open_segment(segments[position]) as f:
+                f.seek(offset)
+                self.state['bytes_processed'] += self.scan(f, offset) - offset
+
+    def analyze_line(self, line: bytes) -> None:
+        """1行分の集計"""
+        state = self.state
+        state['lines'] += 1
+        counters = state['counters']
+        for key, marker in COUNTER_MARKERS:
+            if marker in line:
+                counters[key] += 1
+
+        if DURATION_MARKER in line:
+            match = DURATION_PATTERN.search(line)
+            if match:
+                duration = float(match.group(1))
+                state['runs'] += 1
+                state['duration_total'] += duration
+                state['duration_max'] = max(state['duration_max'], duration)
+                state['recent_durations'] = (state['recent_durations'] + [duration])[-RECENT_DURATIONS:]
+
+    def summary(self) -> Dict[str, Any]:
+        """集計結果（率・平均を含む）"""
+        state = self.state
+        counters = state['counters']
+        runs = state['runs']
+        recent = sorted(state['recent_durations'])
+
+        return {
+            'runs': runs,
+            'lines': state['lines'],
+            'errors': counters['errors'],
+            'warnings': counters['warnings'],
+            'retries': counters['retries'],
+            'fallbacks': counters['fallbacks'],
+            'rate_limited': counters['rate_limited'],
+            'posts': counters['posts'],
+            'errors_per_run': round(counters['errors'] / runs, 3) if runs else 0.0,
+            'fallback_rate': round(counters['fallbacks'] / runs, 3) if runs else 0.0,
+            'avg_duration': round(state['duration_total'] / runs, 2) if runs else 0.0,
+            'max_duration': state['duration_max'],
+            'p95_recent_duration': recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else 0.0,
+            'bytes_processed': state['bytes_processed'],
+            'rotations': state['rotations'],
+            'last_analyzed': state['last_analyzed']
+        }
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+ログ出力設定
+- QueueHandler で記録をキューに積むだけにし、ファイル・コンソール出力は QueueListener のスレッドで実行
+- 実行ログはサイズ上限・日付変更でローテーションし、閉じたセグメントは gzip 圧縮（bot_execution.log.1.gz, .2.gz, ...）
+- 設定は config.LOGGING_CONFIG
+"""
+
+import atexit
+import gzip
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+
+from config import LOGGING_CONFIG
+
+LISTENER: Optional[logging.handlers.QueueListener] = None
+
+
+def next_midnight(timestamp: float) -> float:
+    """timestamp の翌日0時（ローカル時刻、UNIX秒）"""
+    moment = datetime.fromtimestamp(timestamp)
+    return datetime.combine(moment.date() + timedelta(days=1), datetime.min.time()).timestamp()
+
+
+def gzip_rotator(source: str, dest: str) -> None:
+    """閉じたセグメントを圧縮して置換"""
+    with open(source, 'rb') as src, gzip.open(dest, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+def gzip_namer(name: str) -> str:
+    """圧縮セグメントのファイル名"""
+    return f"{name}.gz"
+
+
+class SegmentedFileHandler(logging.handlers.RotatingFileHandler):
+    """サイズ上限・日付変更でローテーションするファイルハンドラー"""
+
+    def __init__(self, filename: str, max_bytes: int = 0, backup_count: int = 0,
+                 rotate_daily: bool = True, compress: bool = True, encoding: str = 'utf-8'):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding=encoding, delay=True)
+        self.rotate_daily = rotate_daily
+        if compress:
+            self.namer = gzip_namer
+            self.rotator = gzip_rotator
+
+        # 既存ファイルは最終更新日の翌日0時に切り替え（前日以前のログは次の書き込み時にローテーション）
+        try:
+            started = os.stat(self.baseFilename).st_mtime
+        except FileNotFoundError:
+            started = time.time()
+        self.rollover_at = next_midnight(started)
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        """サイズ上限または日付変更でローテーション"""
+        if self.rotate_daily and record.created >= self.rollover_at and os.path.exists(self.baseFilename):
+            return True
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self) -> None:
+        """ローテーション（空ファイルは退避しない）"""
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+        if os.path.exists(self.baseFilename) and os.path.getsize(self.baseFilename) > 0:
+            super().doRollover()
+        self.rollover_at = next_midnight(time.time())
+
+
+def configure_logging(config: Optional[Dict[str, Any]] = None) -> Optional[logging.handlers.QueueListener]:
+    """ルートロガーにキュー経由の出力を設定（設定済みの場合は何もしない、basicConfig と同様）"""
+    global LISTENER
+    root = logging.getLogger()
+    if root.handlers:
+        return LISTENER
+
+    config = dict(LOGGING_CONFIG, **(config or {}))
+    formatter = logging.Formatter(config['format'])
+
+    file_handler = SegmentedFileHandler(
+        config['file'],
+        max_bytes=config.get('max_bytes', 0),
+        backup_count=config.get('backup_count', 0),
+        rotate_daily=config.get('rotate_daily', True),
+        compress=config.get('compress', True)
+    )
+    stream_handler = logging.StreamHandler()
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+
+    # 呼び出し側はキューへの追加のみ（ディスク書き込み・圧縮はリスナースレッド）
+    log_queue: 'queue.Queue[logging.LogRecord]' = queue.Queue(-1)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(config['level'])
+
+    LISTENER = logging.handlers.QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    LISTENER.start()
+    atexit.register(shutdown_logging)
+    return LISTENER
+
+
+def shutdown_logging() -> None:
+    """キューに残った記録を出力してリスナーを停止"""
+    global LISTENER
+    if LISTENER is None:
+        return
+    listener, LISTENER = LISTENER, None
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+長期投稿メトリクスストア
+- 投稿毎に固定長レコード（時刻・品質スコア・トピックID・文字数・ツイートID）を追記のみで保存
+- 読み込み時は列単位の array に展開（全件走査が必要な再集計用）
+- 日次・月次ロールアップを投稿時に更新し、トレンド・トピック構成は集計済みデータから取得
+"""
+
+import json
+import os
+import struct
+import threading
+from array import array
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+MAGIC = b'PMT1'
+RECORD_FORMAT = '<dfHHQ'
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+
+# 列名と array の型コード（RECORD_FORMAT と同順）
+COLUMNS = [
+    ('timestamp', 'd'),
+    ('quality_score', 'f'),
+    ('topic_id', 'H'),
+    ('content_length', 'H'),
+    ('tweet_id', 'Q'),
+]
+
+
+def empty_rollup() -> Dict[str, Any]:
+    """集計単位1件分の初期値"""
+    return {'count': 0, 'quality_sum': 0.0, 'quality_min': None, 'quality_max': None,
+            'length_sum': 0, 'topics': {}}
+
+
+class MetricsStore:
+    """追記専用メトリクスストア＋日次/月次ロールアップ"""
+
+    def __init__(self, data_file: str = 'post_metrics.bin', rollup_file: str = 'post_metrics_rollups.json'):
+        self.data_file = data_file
+        self.rollup_file = rollup_file
+        self.lock = threading.Lock()
+        self.rollup_mtime: Optional[int] = None
+        self.rollups = self.load_rollups()
+
+    def load_rollups(self) -> Dict[str, Any]:
+        """ロールアップ読み込み"""
+        try:
+            with open(self.rollup_file, 'r', encoding='utf-8') as f:
+                rollups = json.load(f)
+            self.rollup_mtime = os.stat(self.rollup_file).st_mtime_ns
+            return rollups
+        except (FileNotFoundError, ValueError):
+            return {'topics': [], 'daily': {}, 'monthly': {}}
+
+    def refresh(self) -> None:
+        """他プロセスがロールアップを更新していれば再読み込み（監視・ダッシュボード用）"""
+        try:
+            mtime = os.stat(self.rollup_file).st_mtime_ns
+        except FileNotFoundError:
+            return
+        with self.lock:
+            if mtime != self.rollup_mtime:
+                self.rollups = self.load_rollups()
+
+    def save_rollups(self) -> None:
+        """ロールアップ保存（一時ファイル経由で置換）"""
+        tmp_file = f"{self.rollup_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.rollups, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_file, self.rollup_file)
+        self.rollup_mtime = os.stat(self.rollup_file).st_mtime_ns
+
+    def topic_id(self, topic: str) -> int:
+        """トピック名をIDに変換（未登録なら追加）"""
+        topics = self.rollups['topics']
+        if topic not in topics:
+            topics.append(topic)
+        return topics.index(topic)
+
+    def record(self, timestamp: datetime, quality_score: float, topic: str,
+               content_length: int, tweet_id: Any) -> None:
+        """投稿1件の記録（レコード追記とロールアップ更新）"""
+        with self.lock:
+            self.append_record(timestamp.timestamp(), quality_score, self.topic_id(topic),
+                               content_length, tweet_id)
+            self.add_to_rollups(timestamp, quality_score, topic, content_length)
+            self.save_rollups()
+
+    def append_record(self, timestamp: float, quality_score: float, topic_id: int,
+                      content_length: int, tweet_id: Any) -> None:
+        """固定長レコード1件を追記"""
+        try:
+            numeric_id = int(tweet_id)
+        except (TypeError, ValueError):
+            numeric_id = 0
+
+        is_new = not os.path.exists(self.data_file)
+        with open(self.data_file, 'ab') as f:
+            if is_new:
+                f.write(MAGIC)
+            f.write(struct.pack(RECORD_FORMAT, timestamp, quality_score, topic_id,
+                                min(content_length, 0xFFFF), numeric_id))
+
+    def add_to_rollups(self, timestamp: datetime, quality_score: float, topic: str, content_length: int) -> None:
+        """日次・月次ロールアップに1件加算"""
+        for granularity, key in (('daily', timestamp.strftime('%Y-%m-%d')), ('monthly', timestamp.strftime('%Y-%m'))):
+            bucket = self.rollups[granularity].setdefault(key, empty_rollup())
+            bucket['count'] += 1
+            bucket['quality_sum'] = round(bucket['quality_sum'] + quality_score, 6)
+            bucket['quality_min'] = quality_score if bucket['quality_min'] is None else min(bucket['quality_min'], quality_score)
+            bucket['quality_max'] = quality_score if bucket['quality_max'] is None else max(bucket['quality_max'], quality_score)
+            bucket['length_sum'] += content_length
+            bucket['topics'][topic] = bucket['topics'].get(topic, 0) + 1
+
+    def columns(self) -> Dict[str, array]:
+        """全レコードを列単位で読み込み"""
+        result = {name: array(code) for name, code in COLUMNS}
+        try:
+            with open(self.data_file, 'rb') as f:
+                if f.read(len(MAGIC)) != MAGIC:
+                    return result
+                payload = f.read()
+        except FileNotFoundError:
+            return result
+
+        usable = len(payload) - len(payload) % RECORD_SIZE
+        for record in struct.iter_unpack(RECORD_FORMAT, payload[:usable]):
+            for (name, _), value in zip(COLUMNS, record):
+                result[name].append(value)
+        return result
+
+    def rebuild_rollups(self) -> int:
+        """生データからロールアップを再構築（件数を返す）"""
+        columns = self.columns()
+        with self.lock:
+            topics = self.rollups['topics']
+            self.rollups = {'topics': topics, 'daily': {}, 'monthly': {}}
+            for timestamp, quality_score, topic_id, content_length in zip(
+                columns['timestamp'], columns['quality_score'], columns['topic_id'], columns['content_length']
+            ):
+                topic = topics[topic_id] if topic_id < len(topics) else 'Unknown'
+                self.add_to_rollups(datetime.fromtimestamp(timestamp), round(quality_score, 3), topic, content_length)
+            self.save_rollups()
+        return len(columns['timestamp'])
+
+    def backfill(self, post_history: List[Dict[str, Any]]) -> int:
+        """既存の投稿履歴を取り込み（ストア未作成時のみ、件数を返す）"""
+        if os.path.exists(self.data_file) or not post_history:
+            return 0
+        with self.lock:
+            for post in post_history:
+                timestamp = datetime.fromisoformat(post['timestamp'])
+                self.append_record(timestamp.timestamp(), post.get('quality_score', 0.0),
+                                   self.topic_id(post.get('topic', 'Unknown')),
+                                   post.get('content_length', 0), post.get('tweet_id'))
+                self.add_to_rollups(timestamp, post.get('quality_score', 0.0),
+                                    post.get('topic', 'Unknown'), post.get('content_length', 0))
+            self.save_rollups()
+        return len(post_history)
+
+    def quality_trend(self, months: int = 12, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """月別品質推移（直近 months ヶ月、投稿のない月は件数0）"""
+        now = now or datetime.now()
+        trend = []
+        for month in month_keys(now, months):
+            bucket = self.rollups['monthly'].get(month, empty_rollup())
+            count = bucket['count']
+            trend.append({
+                'month': month,
+                'count': count,
+                'avg_quality': round(bucket['quality_sum'] / count, 3) if count else None,
+                'min_quality': bucket['quality_min'],
+                'max_quality': bucket['quality_max'],
+                'avg_length': round(bucket['length_sum'] / count, 1) if count else None
+            })
+        return trend
+
+    def topic_mix(self, months: int = 3, now: Optional[datetime] = None) -> List[Tuple[str, int]]:
+        """直近 months ヶ月のトピック構成（件数降順）"""
+        now = now or datetime.now()
+        mix: Dict[str, int] = {}
+        for month in month_keys(now, months):
+            for topic, count in self.rollups['monthly'].get(month, empty_rollup())['topics'].items():
+                mix[topic] = mix.get(topic, 0) + count
+        return sorted(mix.items(), key=lambda item: item[1], reverse=True)
+
+    def quarter_topic_mix(self, now: Optional[datetime] = None) -> List[Tuple[str, int]]:
+        """今四半期のトピック構成"""
+        now = now or datetime.now()
+        return self.topic_mix(months=(now.month - 1) % 3 + 1, now=now)
+
+
+def month_keys(now: datetime, months: int) -> List[str]:
+    """now を含む直近 months ヶ月のキー（古い順）"""
+    keys = []
+    year, month = now.year, now.month
+    for _ in range(months):
+        keys.append(f"{year:04d}-{month:02d}")
+        year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+    return list(reversed(keys))
@@ -3,10 +3,15 @@
 無料枠最適化Botシステム監視ツール
 """
 
+import argparse
 import json
 import os
 from datetime import datetime, timedelta
-from typing import Dict, Any
+from typing import Dict, Any, List
+
+from api_ledger import ApiLedger
+from log_analyzer import LogAnalyzer
+from metrics_store import MetricsStore
 
 class SystemMonitor:
     """システム監視クラス"""
@@ -14,6 +19,9 @@ class SystemMonitor:
     def __init__(self):
         self.data_file = 'usage_data.json'
         self.log_file = 'bot_execution.log'
+        self.log_analyzer = LogAnalyzer(self.log_file)
+        self.metrics_store = MetricsStore()
+        self.api_ledger = ApiLedger()
     
     def load_system_data(self) -> Dict[str, Any]:
         """システムデータ読み込み"""
@@ -88,6 +96,9 @@ class SystemMonitor:
             
             report_lines.append("")
         
+        # 長期トレンド（日次/月次ロールアップから取得）
+        report_lines.extend(self.generate_trend_section())
+        
         # 最新投稿情報
         if 'last_update' in data:
             last_update = datetime.fromisoformat(data['last_update'].replace('Z', '+00:00'))
@@ -109,6 +120,12 @@ class SystemMonitor:
             
             report_lines.append("")
         
+        # 外部API使用量（月間予算比）
+        report_lines.extend(self.generate_api_section())
+        
+        # ログ分析（前回解析位置以降の追記分のみ）
+        report_lines.extend(self.generate_log_section())
+        
         # システム健全性評価
         health_score = self.calculate_system_health(data)
         health_status = "優良" if health_score >= 0.8 else "良好" if health_score >= 0.6 else "要注意"
@@ -129,6 +146,72 @@ class SystemMonitor:
         
         return "\n".join(report_lines)
     
+    def generate_trend_section(self) -> List[str]:
+        """長期トレンドセクション（月別品質推移・今四半期のトピック構成）"""
+        trend = [month for month in self.metrics_store.quality_trend(12) if month['count']]
+        if not trend:
+            return []
+        
+        lines = ["📅 品質推移 (直近12ヶ月):"]
+        for month in trend:
+            lines.append(f"  {month['month']}: 平均 {month['avg_quality']:.3f} "
+                         f"(最低 {month['min_quality']:.3f} / {month['count']}件)")
+        
+        mix = self.metrics_store.quarter_topic_mix()
+        total = sum(count for _, count in mix) or 1
+        lines.append("  今四半期のトピック構成:")
+        for topic, count in mix:
+            lines.append(f"    {topic}: {count}回 ({count / total * 100:.0f}%)")
+        
+        lines.append("")
+        return lines
+    
+    def generate_api_section(self) -> List[str]:
+        """外部API使用量セクション（今月の呼び出し数・トークン数の予算比）"""
+        usage = self.api_ledger.report()
+        if not any(stats['requests'] or stats['refused'] for stats in usage.values()):
+            return ["🔌 外部API使用量 (今月):", "  呼び出し記録なし", ""]
+        
+        lines = ["🔌 外部API使用量 (今月):"]
+        for endpoint, stats in usage.items():
+            budget = stats['request_budget']
+            budget_text = f"/{budget} ({stats['requests'] / budget * 100:.1f}%)" if budget else ""
+            lines.append(f"  {endpoint}: {stats['requests']}{budget_text} "
+                         f"失敗 {stats['errors']} / 予算超過拒否 {stats['refused']} / 平均 {stats['avg_latency_ms']:.0f}ms")
+            if stats['total_tokens'] or stats['token_budget']:
+                token_budget = stats['token_budget']
+                token_text = f"/{token_budget:,} ({stats['total_tokens'] / token_budget * 100:.1f}%)" if token_budget else ""
+                lines.append(f"    トークン: {stats['total_tokens']:,}{token_text}")
+        
+        # 投稿に結びつかなかった呼び出しの把握
+        tweet_stats = usage.get('create_tweet')
+        posts = tweet_stats['requests'] - tweet_stats['errors'] if tweet_stats else 0
+        generations = usage['chat_completion']['requests'] if 'chat_completion' in usage else 0
+        if posts:
+            lines.append(f"  投稿1件あたり生成リクエスト: {generations / posts:.2f}")
+        
+        lines.append("")
+        return lines
+    
+    def generate_log_section(self) -> List[str]:
+        """実行ログ分析セクション"""
+        stats = self.log_analyzer.update()
+        if not stats['runs'] and not stats['lines']:
+            return ["📜 ログ分析:", "  ログデータなし", ""]
+        
+        return [
+            "📜 ログ分析 (累積):",
+            f"  実行回数: {stats['runs']}",
+            f"  投稿成功: {stats['posts']}",
+            f"  エラー: {stats['errors']} (1実行あたり {stats['errors_per_run']:.2f})",
+            f"  再試行: {stats['retries']}",
+            f"  フォールバック使用: {stats['fallbacks']} ({stats['fallback_rate']*100:.1f}%)",
+            f"  レート制限による見送り: {stats['rate_limited']}",
+            f"  実行時間: 平均 {stats['avg_duration']:.1f}秒 / 直近p95 {stats['p95_recent_duration']:.1f}秒 / 最大 {stats['max_duration']:.1f}秒",
+            f"  解析済み: {stats['bytes_processed']:,}バイト (ローテーション {stats['rotations']}回)",
+            ""
+        ]
+    
     def calculate_system_health(self, data: Dict[str, Any]) -> float:
         """システム健全性スコア計算"""
         score = 0.0
@@ -167,7 +250,19 @@ class SystemMonitor:
 
 def main():
     """メイン実行"""
+    parser = argparse.ArgumentParser(description='無料枠最適化Botシステム監視')
+    parser.add_argument('--logs', action='store_true', help='ログ増分解析のみ実行')
+    parser.add_argument('--api', action='store_true', help='外部API使用量のみ表示')
+    args = parser.parse_args()
+    
     monitor = SystemMonitor()
+    if args.logs:
+        print("\n".join(monitor.generate_log_section()))
+        return
+    if args.api:
+        print("\n".join(monitor.generate_api_section()))
+        return
+    
     report = monitor.generate_comprehensive_report()
     print(report)
     
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+類似コンテンツ検出インデックス
+- 文字n-gramのMinHash署名 + LSHバンディング
+- ハッシュタグ・URL・空白を除いた本文で比較
+- 署名はJSONLに追記保存（件数上限を超えたら圧縮）
+- 検索・追加はロックで直列化（非同期パイプラインのワーカースレッドから並行して呼ばれる）
+"""
+
+import base64
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+HASHTAG_PATTERN = re.compile(r'[#＃]\S+')
+URL_PATTERN = re.compile(r'https?://\S+')
+
+
+def optimal_bands(threshold: float, num_perm: int,
+                  false_positive_weight: float = 0.2) -> Tuple[int, int]:
+    """閾値に対する偽陽性・偽陰性の重み付き誤差が最小となる (バンド数, 行数) を選択
+
+    候補は署名の一致率で再検証するため、偽陽性より偽陰性（見逃し）を重く扱う
+    """
+
+    def integrate(func, lower: float, upper: float, steps: int = 200) -> float:
+        width = (upper - lower) / steps
+        return sum(func(lower + (i + 0.5) * width) for i in range(steps)) * width
+
+    best, best_error = (num_perm, 1), float('inf')
+    for bands in range(1, num_perm + 1):
+        if num_perm % bands:
+            continue
+        rows = num_perm // bands
+        false_positive = integrate(lambda s: 1 - (1 - s ** rows) ** bands, 0.0, threshold)
+        false_negative = integrate(lambda s: (1 - s ** rows) ** bands, threshold, 1.0)
+        error = false_positive_weight * false_positive + (1 - false_positive_weight) * false_negative
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class NearDuplicateIndex:
+    """MinHash LSH 類似検出インデックス"""
+
+    def __init__(self, index_file: str = 'near_duplicate_index.jsonl', threshold: float = 0.8,
+                 num_perm: int = 64, shingle_size: int = 3, max_entries: int = 20000, seed: bytes = b'ntb'):
+        self.index_file = index_file
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.max_entries = max_entries
+
+        self.seed = seed
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+
+        self.entries: 'OrderedDict[int, Tuple[int, ...]]' = OrderedDict()
+        self.buckets: List[Dict[Tuple[int, ...], Set[int]]] = [{} for _ in range(self.bands)]
+        self.next_id = 0
+        self.file_lines = 0
+        self.lock = threading.Lock()
+        self.load()
+
+    def normalize(self, text: str) -> str:
+        """比較用正規化（ハッシュタグ・URL・空白除去、全半角統一）"""
+        text = unicodedata.normalize('NFKC', text)
+        text = HASHTAG_PATTERN.sub('', text)
+        text = URL_PATTERN.sub('', text)
+        return ''.join(text.split()).lower()
+
+    def shingles(self, text: str) -> Set[str]:
+        """文字n-gram集合"""
+        normalized = self.normalize(text)
+        size = self.shingle_size
+        if len(normalized) <= size:
+            return {normalized}
+        return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        """MinHash署名計算
+
+        各n-gramをSHAKE128でnum_perm個の32bit値に展開し、位置ごとの最小値を署名とする
+        """
+        digest_size = 4 * self.num_perm
+        hashed = [
+            array('I', hashlib.shake_128(self.seed + shingle.encode('utf-8')).digest(digest_size))
+            for shingle in self.shingles(text)
+        ]
+        return tuple(map(min, zip(*hashed)))
+
+    def band_keys(self, signature: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+        """LSHバンド分割"""
+        rows = self.rows
+        return [signature[i * rows:(i + 1) * rows] for i in range(self.bands)]
+
+    def query(self, text: str) -> Optional[Tuple[int, float]]:
+        """類似エントリ検索（閾値以上で最も類似した (ID, 推定類似度) を返す）"""
+        return self.query_signature(self.signature(text))
+
+    def query_signature(self, signature: Tuple[int, ...]) -> Optional[Tuple[int, float]]:
+        """署名による類似エントリ検索"""
+        with self.lock:
+            candidates: Set[int] = set()
+            for band, key in zip(self.buckets, self.band_keys(signature)):
+                candidates.update(band.get(key, ()))
+            stored = [(entry_id, self.entries[entry_id]) for entry_id in candidates]
+
+        best: Optional[Tuple[int, float]] = None
+        for entry_id, entry_signature in stored:
+            similarity = sum(1 for x, y in zip(signature, entry_signature) if x == y) / self.num_perm
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (entry_id, similarity)
+        return best
+
+    def add(self, text: str) -> int:
+        """エントリ追加"""
+        return self.add_signature(self.signature(text))
+
+    def add_signature(self, signature: Tuple[int, ...]) -> int:
+        """署名によるエントリ追加（ファイルへ1行追記）"""
+        with self.lock:
+            entry_id = self.insert(signature)
+
+            with open(self.index_file, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'id': entry_id, 'sig': self.encode(signature)}) + '\n')
+            self.file_lines += 1
+
+            if self.file_lines > 2 * self.max_entries:
+                self.compact()
+            return entry_id
+
+    def insert(self, signature: Tuple[int, ...], entry_id: Optional[int] = None) -> int:
+        """メモリ上のインデックスへ登録（上限超過時は最古を削除、ロックは呼び出し側で取得）"""
+        if entry_id is None:
+            entry_id = self.next_id
+        self.next_id = max(self.next_id, entry_id + 1)
+
+        self.entries[entry_id] = signature
+        for band, key in zip(self.buckets, self.band_keys(signature)):
+            band.setdefault(key, set()).add(entry_id)
+
+        while len(self.entries) > self.max_entries:
+            self.evict_oldest()
+        return entry_id
+
+    def evict_oldest(self) -> None:
+        """最古エントリ削除"""
+        old_id, old_signature = self.entries.popitem(last=False)
+        for band, key in zip(self.buckets, self.band_keys(old_signature)):
+            members = band.get(key)
+            if members is not None:
+                members.discard(old_id)
+                if not members:
+                    del band[key]
+
+    def encode(self, signature: Tuple[int, ...]) -> str:
+        """署名の圧縮表現"""
+        return base64.b64encode(array('I', signature).tobytes()).decode('ascii')
+
+    def decode(self, encoded: str) -> Tuple[int, ...]:
+        """署名の復元"""
+        values = array('I')
+        values.frombytes(base64.b64decode(encoded))
+        return tuple(values)
+
+    def load(self) -> None:
+        """インデックスファイル読み込み"""
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        entry_id = record['id']
+                        signature = self.decode(record['sig'])
+                    except (ValueError, KeyError, TypeError):
+                        continue
+                    if len(signature) == self.num_perm:
+                        self.insert(signature, entry_id)
+                    self.file_lines += 1
+        except FileNotFoundError:
+            pass
+
+    def compact(self) -> None:
+        """保持中のエントリのみでファイルを再構築（ロックは呼び出し側で取得）"""
+        tmp_file = f"{self.index_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            for entry_id, signature in self.entries.items():
+                f.write(json.dumps({'id': entry_id, 'sig': self.encode(signature)}) + '\n')
+        os.replace(tmp_file, self.index_file)
+        self.file_lines = len(self.entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+品質スコア計算モジュール
+- 語彙表を1回だけ構築し、全カテゴリの語を1つの正規表現（選択）で1回走査して集計
+- 大量候補の一括採点 (score_batch)
+"""
+
+import re
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+# 具体性指標
+CONCRETE_WORDS = [
+    "方法", "手順", "ステップ", "やり方", "コツ", "テクニック",
+    "ツール", "アプリ", "設定", "操作", "活用", "実践"
+]
+
+# 実用性指標
+ACTION_WORDS = [
+    "できる", "始める", "試す", "使う", "実行", "導入",
+    "適用", "取り入れる", "実施", "活用"
+]
+
+# 価値・効果指標
+VALUE_WORDS = [
+    "効果", "向上", "改善", "解決", "短縮", "節約",
+    "効率", "便利", "簡単", "成果", "メリット"
+]
+
+# 構造化記号
+STRUCTURE_CHARS = ['：', ':', '→', '・', '①', '②', '③']
+
+# 生成途中の見込みスコアで想定するキーワード出現間隔（文字数）
+KEYWORD_SPACING = 8
+
+
+class KeywordMatcher:
+    """カテゴリ別キーワード一括マッチャー（構築は1回のみ）"""
+
+    def __init__(self):
+        # 重複語（例: 活用）は1回だけ検索し、集合演算で各カテゴリに振り分ける
+        self.vocabulary = tuple(dict.fromkeys(CONCRETE_WORDS + ACTION_WORDS + VALUE_WORDS))
+        self.concrete_words = frozenset(CONCRETE_WORDS)
+        self.action_words = frozenset(ACTION_WORDS)
+        self.value_words = frozenset(VALUE_WORDS)
+        self.structure_chars = tuple(STRUCTURE_CHARS)
+        self.digit_search = re.compile(r'\d').search
+
+        # 全語の選択パターン（長い語を優先）で本文を1回だけ走査
+        # （文字クラスを加えるとリテラル接頭辞の最適化が効かず遅くなるため、記号・数字は別判定）
+        ordered = sorted(self.vocabulary, key=len, reverse=True)
+        self.keyword_findall = re.compile('|'.join(map(re.escape, ordered))).findall
+        # 一致箇所と重なって読み飛ばされる語（例: やり方法 の 方法、コツール の ツール）
+        self.shadowed = {
+            word: tuple(other for other in self.vocabulary if other != word and self.overlaps(word, other))
+            for word in self.vocabulary
+        }
+
+    @staticmethod
+    def overlaps(word: str, other: str) -> bool:
+        """other が word の一致範囲内から始まり得るか"""
+        return other in word or any(word.endswith(other[:size]) for size in range(1, len(other)))
+
+    def match(self, content: str) -> Tuple[int, int, int, bool, bool]:
+        """(具体性語数, 実用性語数, 価値語数, 数字有無, 構造記号有無) を返す"""
+        has_digit = self.digit_search(content) is not None
+        has_structure = any(char in content for char in self.structure_chars)
+
+        found = set(self.keyword_findall(content))
+        if not found:
+            return 0, 0, 0, has_digit, has_structure
+
+        # 非重複走査で読み飛ばした可能性のある語のみ個別に確認
+        for word in tuple(found):
+            for other in self.shadowed[word]:
+                if other not in found and other in content:
+                    found.add(other)
+
+        return (
+            len(self.concrete_words.intersection(found)),
+            len(self.action_words.intersection(found)),
+            len(self.value_words.intersection(found)),
+            has_digit,
+            has_structure
+        )
+
+
+class QualityScorer:
+    """投稿候補の品質スコア計算"""
+
+    def __init__(self):
+        self.matcher = KeywordMatcher()
+
+    def score(self, content: str, topic_info: Optional[Dict[str, Any]] = None) -> float:
+        """詳細品質スコア計算"""
+        concrete_count, action_count, value_count, has_digit, has_structure = self.matcher.match(content)
+        return self.combine(concrete_count, action_count, value_count, has_digit, has_structure,
+                            self.length_bonus(len(content)), topic_info)
+
+    def optimistic_score(self, content: str, remaining: int, topic_info: Optional[Dict[str, Any]] = None,
+                         chars_per_keyword: int = KEYWORD_SPACING) -> float:
+        """生成途中の本文の見込みスコア（残り remaining 文字に chars_per_keyword 文字毎にキーワードが入る楽観値）"""
+        if remaining <= 0:
+            return self.score(content, topic_info)
+
+        concrete_count, action_count, value_count, has_digit, has_structure = self.matcher.match(content)
+
+        # 追加見込みの語を加点の大きい順（価値 → 具体性・実用性）に配分
+        extra = remaining // chars_per_keyword
+        if value_count == 0 and extra:
+            value_count, extra = 1, extra - 1
+        added = min(extra, max(3 - concrete_count, 0))
+        concrete_count, extra = concrete_count + added, extra - added
+        action_count += min(extra, max(2 - action_count, 0))
+
+        length = len(content)
+        best_length_bonus = max(
+            self.length_bonus(final_length)
+            for final_length in (length, length + remaining, min(max(length, 90), length + remaining))
+        )
+        return self.combine(concrete_count, action_count, value_count, True, True,
+                            best_length_bonus, topic_info)
+
+    @staticmethod
+    def length_bonus(content_length: int) -> float:
+        """文字数最適化 (+0.05)"""
+        if 90 <= content_length <= 180:
+            return 0.05
+        if 70 <= content_length <= 220:
+            return 0.03
+        return 0.0
+
+    @staticmethod
+    def combine(concrete_count: int, action_count: int, value_count: int, has_digit: bool,
+                has_structure: bool, length_bonus: float, topic_info: Optional[Dict[str, Any]]) -> float:
+        """指標別の加点を合算しトピック倍率を適用"""
+        score = 0.6  # ベーススコア
+
+        # 具体性指標 (+0.15)
+        if concrete_count >= 3:
+            score += 0.15
+        elif concrete_count >= 2:
+            score += 0.1
+        elif concrete_count >= 1:
+            score += 0.05
+
+        # 実用性指標 (+0.1)
+        if action_count >= 2:
+            score += 0.1
+        elif action_count >= 1:
+            score += 0.05
+
+        # 価値・効果指標 (+0.1)
+        if value_count >= 1:
+            score += 0.1
+
+        # 数値・具体例 (+0.05)
+        if has_digit:
+            score += 0.03
+        if has_structure:
+            score += 0.02
+
+        score += length_bonus
+
+        # トピック品質倍率適用
+        multiplier = topic_info.get('quality_multiplier', 1.0) if topic_info else 1.0
+        final_score = score * multiplier
+
+        return round(min(final_score, 1.0), 3)
+
+    def score_batch(self, contents: Iterable[str],
+                    topic_info: Optional[Dict[str, Any]] = None) -> List[float]:
+        """複数候補の一括採点"""
+        score = self.score
+        return [score(content, topic_info) for content in contents]
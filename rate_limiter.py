@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+APIレート制限管理
+- エンドポイント×アカウント単位のトークンバケット
+- x-rate-limit-* / x-user-limit-24hour-* ヘッダーで残量・リセット時刻を補正
+- 待機せず「次に実行可能な時刻」を返し、呼び出し側で再スケジュール・スキップを判断
+- 状態はJSONに保存し、次回実行に引き継ぐ
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, Mapping, Optional, Tuple
+
+# 無料枠の既定上限: (回数, 期間秒)
+DEFAULT_LIMITS = {
+    'create_tweet': (17, 24 * 3600),
+    'get_me': (25, 24 * 3600),
+}
+
+# (残量ヘッダー, リセット時刻ヘッダー)
+HEADER_PAIRS = [
+    ('x-rate-limit-remaining', 'x-rate-limit-reset'),
+    ('x-user-limit-24hour-remaining', 'x-user-limit-24hour-reset'),
+    ('x-app-limit-24hour-remaining', 'x-app-limit-24hour-reset'),
+]
+
+
+class RateLimiter:
+    """トークンバケット方式のレート制限管理"""
+
+    def __init__(self, state_file: Optional[str] = 'rate_limits.json',
+                 limits: Optional[Dict[str, Tuple[int, int]]] = None):
+        self.state_file = state_file
+        self.limits = dict(DEFAULT_LIMITS, **(limits or {}))
+        self.lock = threading.Lock()
+        self.buckets: Dict[str, Dict[str, float]] = self.load()
+
+    def load(self) -> Dict[str, Dict[str, float]]:
+        """状態読み込み"""
+        if not self.state_file:
+            return {}
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def save(self) -> None:
+        """状態保存（一時ファイル経由で置換）"""
+        if not self.state_file:
+            return
+        tmp_file = f"{self.state_file}.tmp"
+        with self.lock:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.buckets, f, indent=2)
+            os.replace(tmp_file, self.state_file)
+
+    def bucket(self, endpoint: str, account: str, now: float) -> Dict[str, float]:
+        """バケット取得（経過時間分のトークンを補充）"""
+        capacity, window = self.limits.get(endpoint, (1, 1))
+        key = f"{account}:{endpoint}"
+        bucket = self.buckets.setdefault(key, {'tokens': capacity, 'updated': now, 'blocked_until': 0.0})
+
+        elapsed = max(0.0, now - bucket['updated'])
+        bucket['tokens'] = min(capacity, bucket['tokens'] + elapsed * capacity / window)
+        bucket['updated'] = now
+        return bucket
+
+    def earliest_allowed(self, endpoint: str, account: str = 'default', now: Optional[float] = None) -> float:
+        """次に呼び出し可能な時刻（UNIX時刻）"""
+        now = time.time() if now is None else now
+        with self.lock:
+            return self._earliest(endpoint, account, now)
+
+    def _earliest(self, endpoint: str, account: str, now: float) -> float:
+        bucket = self.bucket(endpoint, account, now)
+        capacity, window = self.limits.get(endpoint, (1, 1))
+        earliest = max(now, bucket['blocked_until'])
+        if bucket['tokens'] < 1:
+            earliest = max(earliest, now + (1 - bucket['tokens']) * window / capacity)
+        return earliest
+
+    def acquire(self, endpoint: str, account: str = 'default', now: Optional[float] = None) -> Tuple[bool, float]:
+        """呼び出し枠の確保（待機しない）
+
+        戻り値: (許可, 次に呼び出し可能な時刻)。許可時はトークンを1つ消費する
+        """
+        now = time.time() if now is None else now
+        with self.lock:
+            earliest = self._earliest(endpoint, account, now)
+            if earliest > now:
+                return False, earliest
+            self.bucket(endpoint, account, now)['tokens'] -= 1
+            return True, now
+
+    def update_from_headers(self, endpoint: str, account: str, headers: Optional[Mapping[str, Any]],
+                            now: Optional[float] = None) -> float:
+        """レスポンスヘッダーで残量・リセット時刻を補正し、次に呼び出し可能な時刻を返す"""
+        now = time.time() if now is None else now
+        headers = {key.lower(): value for key, value in (headers or {}).items()}
+
+        with self.lock:
+            bucket = self.bucket(endpoint, account, now)
+            for remaining_header, reset_header in HEADER_PAIRS:
+                if remaining_header not in headers:
+                    continue
+                try:
+                    remaining = int(headers[remaining_header])
+                    reset_at = float(headers.get(reset_header, 0))
+                except (TypeError, ValueError):
+                    continue
+
+                if remaining <= 0 and reset_at > now:
+                    # リセット時刻までは停止し、リセット後はサーバー側の枠回復に合わせて即再開
+                    bucket['blocked_until'] = max(bucket['blocked_until'], reset_at)
+                    bucket['tokens'] = max(bucket['tokens'], 1.0)
+                else:
+                    bucket['tokens'] = min(bucket['tokens'], remaining)
+
+            return self._earliest(endpoint, account, now)
+
+    def defer(self, endpoint: str, account: str, seconds: float, now: Optional[float] = None) -> float:
+        """一時的な失敗などで一定時間呼び出しを見送る"""
+        now = time.time() if now is None else now
+        with self.lock:
+            bucket = self.bucket(endpoint, account, now)
+            bucket['blocked_until'] = max(bucket['blocked_until'], now + seconds)
+            return bucket['blocked_until']
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RSSフィード永続キャッシュ
+- ETag / Last-Modified を保存し条件付きGETに利用
+- 304応答時は前回の解析結果を再利用
+- フィード障害時はキャッシュから継続稼働
+"""
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class FeedCache:
+    """条件付きGET用フィードキャッシュ"""
+
+    def __init__(self, cache_file: str = 'feed_cache.json'):
+        self.cache_file = cache_file
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.feeds = self.load()
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """キャッシュ読み込み"""
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"フィードキャッシュ読み込みエラー: {e}")
+            return {}
+
+    def save(self) -> None:
+        """キャッシュ保存（変更時のみ、一時ファイル経由で置換）"""
+        with self.lock:
+            if not self.dirty:
+                return
+            snapshot = json.dumps(self.feeds, ensure_ascii=False)
+            self.dirty = False
+
+        tmp_file = f"{self.cache_file}.tmp"
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                f.write(snapshot)
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            logger.warning(f"フィードキャッシュ保存エラー: {e}")
+
+    def conditional_headers(self, feed_url: str) -> Dict[str, str]:
+        """条件付きGETヘッダー生成"""
+        with self.lock:
+            cached = self.feeds.get(feed_url)
+
+        headers = {}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+        return headers
+
+    def get_entries(self, feed_url: str) -> Optional[List[Dict[str, Any]]]:
+        """キャッシュ済みエントリ取得"""
+        with self.lock:
+            cached = self.feeds.get(feed_url)
+        return cached['entries'] if cached else None
+
+    def store(self, feed_url: str, entries: List[Dict[str, Any]],
+              etag: Optional[str], last_modified: Optional[str]) -> None:
+        """解析結果と検証子を保存"""
+        with self.lock:
+            self.feeds[feed_url] = {
+                'etag': etag,
+                'last_modified': last_modified,
+                'entries': entries,
+                'fetched_at': datetime.now().isoformat()
+            }
+            self.dirty = True
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RSSフィード並行収集モジュール
+- 有界スレッドプールで全フィードを同時取得
+- フィード単位のタイムアウトと全体デッドライン（本文受信中も経過時間で打ち切り）
+- 期限内に完了したフィードのみ返却
+- ETag / Last-Modified による条件付きGETとキャッシュ再利用
+- ストリーミング解析で先頭N件取得後に受信を打ち切り
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Iterator, List, Any, Optional
+
+import requests
+
+from feed_cache import FeedCache
+from feed_parser import parse_feed_stream, parse_with_feedparser
+
+logger = logging.getLogger(__name__)
+
+
+class FeedCollector:
+    """RSSフィード並行収集クラス"""
+
+    def __init__(self, max_workers: int = 16, feed_timeout: float = 5.0,
+                 overall_timeout: float = 15.0, max_entries: int = 5,
+                 cache: Optional[FeedCache] = None, streaming: bool = True):
+        self.max_workers = max_workers
+        self.feed_timeout = feed_timeout
+        self.overall_timeout = overall_timeout
+        self.max_entries = max_entries
+        self.cache = cache
+        self.streaming = streaming
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = 'ai-tweet-bot/1.0 (+feed collector)'
+
+    def fetch_feed(self, feed_url: str, deadline: Optional[float] = None) -> List[Dict[str, Any]]:
+        """単一フィード取得・解析（未更新・取得失敗時はキャッシュを返却）"""
+        headers = self.cache.conditional_headers(feed_url) if self.cache else {}
+        # requests の timeout はソケット読み込み1回ごとの上限のため、取得全体の期限は別に管理
+        feed_deadline = time.monotonic() + self.feed_timeout
+        if deadline is not None:
+            feed_deadline = min(feed_deadline, deadline)
+
+        try:
+            response = self.session.get(
+                feed_url, timeout=max(feed_deadline - time.monotonic(), 0.1), headers=headers, stream=True
+            )
+            if response.status_code == 304 and self.cache:
+                response.close()
+                cached = self.cache.get_entries(feed_url)
+                if cached is not None:
+                    return cached
+            response.raise_for_status()
+        except Exception as e:
+            cached = self.cache.get_entries(feed_url) if self.cache else None
+            if cached is None:
+                raise
+            logger.debug(f"RSS取得失敗、キャッシュ使用: {feed_url} - {e}")
+            return cached
+
+        try:
+            entries = self.parse_entries(response, feed_deadline)
+        except TimeoutError as e:
+            cached = self.cache.get_entries(feed_url) if self.cache else None
+            if cached is None:
+                raise
+            logger.debug(f"RSS受信打ち切り、キャッシュ使用: {feed_url} - {e}")
+            return cached
+        finally:
+            # 残りの本文を受信せずに接続を閉じる
+            response.close()
+
+        if self.cache:
+            self.cache.store(
+                feed_url, entries,
+                response.headers.get('ETag'),
+                response.headers.get('Last-Modified')
+            )
+        return entries
+
+    def parse_entries(self, response: requests.Response, deadline: float) -> List[Dict[str, Any]]:
+        """レスポンス本文からエントリ抽出"""
+        chunks = self.read_chunks(response, deadline)
+        if self.streaming:
+            return parse_feed_stream(chunks, self.max_entries)
+        return parse_with_feedparser(b''.join(chunks), self.max_entries)
+
+    @staticmethod
+    def read_chunks(response: requests.Response, deadline: float) -> Iterator[bytes]:
+        """本文をチャンク単位で受信（期限を過ぎたら TimeoutError、少量ずつ送り続けるフィード対策）"""
+        for chunk in response.iter_content(chunk_size=16384):
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"受信期限超過: {response.url}")
+            yield chunk
+
+    def collect(self, feed_urls: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """全フィード並行収集（全体デッドライン内に完了した分のみ返却）"""
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        if not feed_urls:
+            return results
+
+        deadline = time.monotonic() + self.overall_timeout
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(feed_urls)))
+
+        try:
+            pending = {executor.submit(self.fetch_feed, url, deadline): url for url in feed_urls}
+
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+
+                done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    feed_url = pending.pop(future)
+                    try:
+                        entries = future.result()
+                        if entries:
+                            results[feed_url] = entries
+                    except Exception as e:
+                        logger.debug(f"RSS取得エラー: {feed_url} - {e}")
+
+            if pending:
+                logger.warning(f"RSS収集デッドライン超過: {len(pending)}/{len(feed_urls)}件を打ち切り")
+
+        finally:
+            # 未完了分は待たずに破棄（実行中の受信も全体デッドラインで打ち切られ、スレッドは速やかに終了する）
+            executor.shutdown(wait=False, cancel_futures=True)
+            if self.cache:
+                self.cache.save()
+
+        return results
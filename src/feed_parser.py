@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+軽量ストリーミングRSS/Atomパーサー
+- 受信チャンクを逐次解析し、先頭N件で打ち切り
+- title / link / published のみ抽出
+- 不正なXMLはfeedparserにフォールバック
+"""
+
+import logging
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterable, List, Any
+
+import feedparser
+
+logger = logging.getLogger(__name__)
+
+ENTRY_TAGS = ('item', 'entry')
+PUBLISHED_TAGS = ('pubDate', 'published', 'updated', 'date')
+
+
+def local_name(tag: str) -> str:
+    """名前空間を除いたタグ名"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def extract_entry(element: ET.Element) -> Dict[str, Any]:
+    """item/entry要素から必要項目のみ抽出"""
+    entry = {'title': '', 'link': '', 'published': ''}
+
+    for child in element:
+        name = local_name(child.tag)
+        if name == 'title' and not entry['title']:
+            entry['title'] = (child.text or '').strip()
+        elif name == 'link':
+            # Atom: <link rel="alternate" href="..."/> / RSS: <link>...</link>
+            href = child.get('href')
+            if href:
+                if child.get('rel', 'alternate') == 'alternate' or not entry['link']:
+                    entry['link'] = href
+            elif not entry['link']:
+                entry['link'] = (child.text or '').strip()
+        elif name in PUBLISHED_TAGS and not entry['published']:
+            entry['published'] = (child.text or '').strip()
+
+    return entry
+
+
+def parse_with_feedparser(content: bytes, limit: int) -> List[Dict[str, Any]]:
+    """feedparserによる全体解析"""
+    feed = feedparser.parse(content)
+    return [
+        {
+            'title': entry.get('title', ''),
+            'link': entry.get('link', ''),
+            'published': entry.get('published', '')
+        }
+        for entry in feed.entries[:limit]
+    ]
+
+
+def parse_feed_stream(chunks: Iterable[bytes], limit: int = 5) -> List[Dict[str, Any]]:
+    """チャンク列を逐次解析し先頭limit件のエントリを返却"""
+    chunks = iter(chunks)
+    received: List[bytes] = []
+    entries: List[Dict[str, Any]] = []
+    parser = ET.XMLPullParser(events=('end',))
+
+    try:
+        for chunk in chunks:
+            received.append(chunk)
+            parser.feed(chunk)
+
+            for _, element in parser.read_events():
+                if local_name(element.tag) not in ENTRY_TAGS:
+                    continue
+                entries.append(extract_entry(element))
+                element.clear()
+                if len(entries) >= limit:
+                    return entries
+
+        parser.close()
+        return entries
+
+    except ET.ParseError as e:
+        # 不正なXML（HTML実体参照・未対応エンコーディング等）は全体を受信してfeedparserで解析
+        logger.debug(f"ストリーミング解析失敗、feedparserにフォールバック: {e}")
+        content = b''.join(received) + b''.join(chunks)
+        return parse_with_feedparser(content, limit)
@@ -13,9 +13,16 @@ import random
 import time
 from datetime import datetime
 from typing import List
-import feedparser
 import tweepy
 
+# 台帳・設定はリポジトリ直下のモジュールを使用
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api_ledger import ApiLedger, BudgetExceeded
+from config import RSS_FEEDS
+from feed_cache import FeedCache
+from feed_collector import FeedCollector
+
 # ログ設定
 logging.basicConfig(
     level=logging.INFO,
@@ -27,9 +34,14 @@ logger = logging.getLogger(__name__)
 class BasicAITweetBot:
     """基本版AIツイートボット（正常稼働確認済み）"""
     
+    # AI関連RSS
+    RSS_FEEDS = RSS_FEEDS
+    
     def __init__(self):
+        self.api_ledger = ApiLedger()
         self.setup_credentials()
         self.setup_twitter_api()
+        self.feed_collector = FeedCollector(cache=FeedCache())
     
     def setup_credentials(self):
         """認証情報設定"""
@@ -71,13 +83,6 @@ class BasicAITweetBot:
         """バズ記事情報収集"""
         candidates = []
         
-        # AI関連RSS
-        rss_feeds = [
-            "https://blog.openai.com/rss.xml",
-            "https://ai.googleblog.com/feeds/posts/default",
-            "https://blogs.nvidia.com/feed/",
-        ]
-        
         ai_topics = [
             "DALL-E 3の生成速度向上について調べてた。コスト効率と品質のバランスを分析中。",
             "Stable Diffusion 3の安定性改善について調べてた。ワークフロー最適化での活用を研究。",
@@ -86,16 +91,14 @@ class BasicAITweetBot:
             "Flux AIの画質向上アップデートについて調べてた。VJ制作での新しい可能性を探る。",
         ]
         
-        # RSS収集試行
-        for feed_url in rss_feeds:
-            try:
-                feed = feedparser.parse(feed_url)
-                if feed.entries:
-                    entry = random.choice(feed.entries[:5])
-                    title = entry.title[:50] + "について調べてた。"
-                    candidates.append(title + "新しい発見が続々と。")
-            except Exception as e:
-                logger.debug(f"RSS取得エラー: {feed_url} - {e}")
+        # RSS並行収集（期限内に取得できたフィードのみ使用）
+        feed_results = self.feed_collector.collect(self.RSS_FEEDS)
+        for feed_url in self.RSS_FEEDS:
+            entries = [entry for entry in feed_results.get(feed_url, []) if entry['title']]
+            if entries:
+                entry = random.choice(entries)
+                title = entry['title'][:50] + "について調べてた。"
+                candidates.append(title + "新しい発見が続々と。")
         
         # フォールバック候補追加
         candidates.extend(ai_topics)
@@ -122,7 +125,7 @@ class BasicAITweetBot:
         try:
             logger.info("投稿処理開始...")
             
-            response = self.client.create_tweet(text=content)
+            response = self.api_ledger.call('create_tweet', self.client.create_tweet, text=content)
             
             if response.data:
                 logger.info("ツイート投稿成功")
@@ -133,6 +136,10 @@ class BasicAITweetBot:
                 logger.info(f"投稿予定内容: {content}")
                 return True  # シミュレーションとして成功扱い
                 
+        except BudgetExceeded as e:
+            logger.warning(f"投稿見送り: {e}")
+            return False
+            
         except Exception as e:
             logger.error(f"ツイート投稿エラー: {e}")
             logger.info("投稿シミュレーションモード実行")
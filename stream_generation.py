@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+ストリーミング生成の打ち切り処理
+- 生成テキストを受信しながら候補別に組み立て、投稿文字数（加重文字数、全角=2）の上限に達したら文末で確定
+- 文末ごとに品質スコアの見込み（残り文字数での楽観値）を判定し、基準に届かない候補は途中で破棄
+- 全候補が確定した時点でストリームを閉じ、以降の生成（トークン消費）を止める
+"""
+
+from typing import Dict, Any, Iterable, List, Optional
+
+from quality_scorer import QualityScorer
+
+TWEET_WEIGHTED_LIMIT = 280
+SENTENCE_ENDINGS = frozenset('。！？!?\n')
+
+# 加重1として数える文字範囲（Twitter の文字数計算: それ以外は2）
+LIGHT_RANGES = ((0, 4351), (8192, 8205), (8208, 8223), (8242, 8247))
+
+
+def char_weight(char: str) -> int:
+    """1文字の加重（半角=1、全角=2）"""
+    code = ord(char)
+    for lower, upper in LIGHT_RANGES:
+        if lower <= code <= upper:
+            return 1
+    return 2
+
+
+def weighted_length(text: str) -> int:
+    """投稿文字数（加重文字数）"""
+    return sum(char_weight(char) for char in text)
+
+
+def truncate_to_budget(text: str, budget: int, suffix: str = '...') -> str:
+    """加重文字数 budget 以内に切り詰め（文末があれば文末で、なければ suffix 付きで切断）"""
+    if weighted_length(text) <= budget:
+        return text
+
+    used, last_sentence_end, cut = 0, 0, 0
+    limit = budget - weighted_length(suffix)
+    for index, char in enumerate(text):
+        used += char_weight(char)
+        if used > budget:
+            break
+        if char in SENTENCE_ENDINGS:
+            last_sentence_end = index + 1
+        if used <= limit:
+            cut = index + 1
+
+    if last_sentence_end:
+        return text[:last_sentence_end].rstrip()
+    return text[:cut] + suffix
+
+
+class StreamCandidate:
+    """受信中の候補1件"""
+
+    def __init__(self):
+        self.parts: List[str] = []
+        self.weight = 0
+        self.tokens = 0
+        self.done = False
+        self.rejected = False
+        self.truncated = False
+
+    def text(self) -> str:
+        """受信済みテキスト"""
+        return ''.join(self.parts)
+
+
+class StreamResult:
+    """ストリーミング生成結果（usage は api_ledger の記録用、受信チャンク数から推定）"""
+
+    def __init__(self, texts: List[str], usage: Dict[str, int], aborted: bool, rejected: int, truncated: int):
+        self.texts = texts
+        self.usage = usage
+        self.aborted = aborted
+        self.rejected = rejected
+        self.truncated = truncated
+
+
+def collect_stream(chunks: Iterable[Any], count: int, budget: int, threshold: float,
+                   scorer: Optional[QualityScorer] = None, topic_info: Optional[Dict[str, Any]] = None,
+                   prompt_tokens: int = 0) -> StreamResult:
+    """stream=True 応答を候補別に組み立て、文字数上限・品質見込みで打ち切り"""
+    candidates = [StreamCandidate() for _ in range(count)]
+    aborted = False
+
+    for chunk in chunks:
+        for choice in chunk.choices:
+            candidate = candidates[choice.index]
+            if candidate.done:
+                continue
+
+            delta = choice.delta.get('content') or ''
+            if delta:
+                candidate.tokens += 1
+                candidate.parts.append(delta)
+                candidate.weight += weighted_length(delta)
+
+                if candidate.weight >= budget:
+                    # 上限到達: 文末で確定し、この候補の残りは受信しない
+                    text = truncate_to_budget(candidate.text(), budget)
+                    candidate.parts = [text]
+                    candidate.truncated = True
+                    candidate.done = True
+                elif scorer and delta[-1] in SENTENCE_ENDINGS:
+                    # 文末ごとに残り文字数での見込みスコアを確認
+                    if scorer.optimistic_score(candidate.text(), budget - candidate.weight, topic_info) < threshold:
+                        candidate.rejected = True
+                        candidate.done = True
+
+            if choice.get('finish_reason'):
+                candidate.done = True
+
+        if all(candidate.done for candidate in candidates):
+            # 全候補確定: 未受信の生成を打ち切り
+            close = getattr(chunks, 'close', None)
+            if close:
+                close()
+            aborted = any(candidate.truncated or candidate.rejected for candidate in candidates)
+            break
+
+    completion_tokens = sum(candidate.tokens for candidate in candidates)
+    return StreamResult(
+        texts=[candidate.text().strip() for candidate in candidates if not candidate.rejected and candidate.parts],
+        usage={'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+               'total_tokens': prompt_tokens + completion_tokens},
+        aborted=aborted,
+        rejected=sum(1 for candidate in candidates if candidate.rejected),
+        truncated=sum(1 for candidate in candidates if candidate.truncated)
+    )
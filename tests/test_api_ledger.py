@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+外部API呼び出し台帳のテスト（月間予算・拒否・月替わり・ストリーミング生成のトークン計上）
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api_ledger import ApiLedger, BudgetExceeded  # noqa: E402
+from clock import VirtualClock  # noqa: E402
+from stream_generation import collect_stream  # noqa: E402
+
+BUDGETS = {
+    'create_tweet': {'monthly_requests': 2},
+    'chat_completion': {'monthly_requests': 10, 'monthly_tokens': 1000},
+}
+
+
+def chunk(index, content=None, finish_reason=None):
+    """stream=True 応答のチャンク"""
+    delta = {'content': content} if content else {}
+    choice = SimpleNamespace(index=index, delta=delta, get={'finish_reason': finish_reason}.get)
+    return SimpleNamespace(choices=[choice])
+
+
+class ApiLedgerTest(unittest.TestCase):
+    """ApiLedger"""
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.clock = VirtualClock(datetime(2024, 1, 31, 23, 0))
+        self.ledger = self.create_ledger()
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def create_ledger(self):
+        return ApiLedger(ledger_file=os.path.join(self.workdir.name, 'api_ledger.jsonl'),
+                         summary_file=os.path.join(self.workdir.name, 'api_ledger_summary.json'),
+                         budgets=BUDGETS, clock=self.clock)
+
+    def test_request_budget_refuses_before_calling(self):
+        calls = []
+        for _ in range(2):
+            self.ledger.call('create_tweet', calls.append, 'text')
+
+        with self.assertRaises(BudgetExceeded) as raised:
+            self.ledger.call('create_tweet', calls.append, 'text')
+        self.assertEqual((raised.exception.used, raised.exception.limit), (2, 2))
+        self.assertEqual(len(calls), 2)
+        totals = self.ledger.totals('create_tweet')
+        self.assertEqual((totals['requests'], totals['refused']), (2, 1))
+
+    def test_errors_are_recorded_and_reraised(self):
+        def fail():
+            raise RuntimeError('boom')
+
+        with self.assertRaises(RuntimeError):
+            self.ledger.call('create_tweet', fail, account='main')
+        self.assertEqual(self.ledger.totals('create_tweet')['errors'], 1)
+
+        with open(self.ledger.ledger_file, encoding='utf-8') as f:
+            entry = json.loads(f.readline())
+        self.assertEqual((entry['status'], entry['account']), ('RuntimeError', 'main'))
+
+    def test_token_budget_uses_reported_usage_and_estimate(self):
+        usage = {'prompt_tokens': 300, 'completion_tokens': 500, 'total_tokens': 800}
+        self.ledger.call('chat_completion', lambda: SimpleNamespace(usage=usage))
+
+        self.assertEqual(self.ledger.totals('chat_completion')['total_tokens'], 800)
+        with self.assertRaises(BudgetExceeded):
+            self.ledger.call('chat_completion', lambda: None, estimated_tokens=201)
+        self.ledger.call('chat_completion', lambda: None, estimated_tokens=200)
+
+    def test_streamed_usage_counts_against_token_budget(self):
+        chunks = [chunk(0, 'テスト' * 5), chunk(0, '本文。'), chunk(0, finish_reason='stop')]
+
+        result = self.ledger.call('chat_completion', collect_stream, chunks, 1, 280, 0.8, prompt_tokens=120)
+        totals = self.ledger.totals('chat_completion')
+        self.assertEqual(result.texts, ['テスト' * 5 + '本文。'])
+        self.assertEqual((totals['prompt_tokens'], totals['completion_tokens'], totals['total_tokens']),
+                         (120, 2, 122))
+
+    def test_budget_resets_at_month_rollover(self):
+        for _ in range(2):
+            self.ledger.call('create_tweet', lambda: None)
+        self.clock.advance(3600)
+
+        self.ledger.call('create_tweet', lambda: None)
+        self.assertEqual(self.ledger.totals('create_tweet')['requests'], 1)
+        self.assertEqual(self.ledger.totals('create_tweet', '2024-01')['requests'], 2)
+
+        report = self.create_ledger().report('2024-01')
+        self.assertEqual(report['create_tweet']['request_budget'], 2)
+        self.assertEqual(report['chat_completion']['requests'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+常駐Botのスケジューラーのテスト（実行順序・再登録・例外時の再試行・投稿枠の算出）
+"""
+
+import os
+import sys
+import time
+import unittest
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot_daemon import PRIORITY_FEEDS, PRIORITY_POST, PRIORITY_REFILL, Scheduler, next_slot_time  # noqa: E402
+
+TOKYO = ZoneInfo('Asia/Tokyo')
+
+
+class SchedulerTest(unittest.TestCase):
+    """Scheduler"""
+
+    def setUp(self):
+        self.scheduler = Scheduler()
+        self.executed = []
+
+    def task(self, name, next_run=None):
+        def run():
+            self.executed.append(name)
+            return next_run
+        return run
+
+    def test_runs_by_time_then_priority_then_registration_order(self):
+        now = time.time() - 10
+        self.scheduler.schedule(now, PRIORITY_FEEDS, 'feeds', self.task('feeds'))
+        self.scheduler.schedule(now, PRIORITY_REFILL, 'refill', self.task('refill'))
+        self.scheduler.schedule(now - 5, PRIORITY_FEEDS, 'early', self.task('early'))
+        self.scheduler.schedule(now, PRIORITY_POST, 'post', self.task('post'))
+        self.scheduler.schedule(now, PRIORITY_POST, 'post-retry', self.task('post-retry'))
+
+        self.scheduler.run()
+        self.assertEqual(self.executed, ['early', 'post', 'post-retry', 'refill', 'feeds'])
+
+    def test_task_is_rescheduled_until_stopped(self):
+        def repeat():
+            self.executed.append('repeat')
+            if len(self.executed) == 3:
+                self.scheduler.stop()
+            return time.time()
+
+        self.scheduler.schedule(time.time(), PRIORITY_REFILL, 'repeat', repeat)
+        self.scheduler.run()
+        self.assertEqual(self.executed, ['repeat'] * 3)
+        self.assertEqual(len(self.scheduler.queue), 1)
+
+    def test_failed_task_is_retried_later(self):
+        def fail():
+            raise RuntimeError('boom')
+
+        started = time.time()
+        self.scheduler.schedule(started, PRIORITY_POST, 'fail', fail)
+        self.scheduler.schedule(started, PRIORITY_REFILL, 'next', self.task('next'))
+        self.scheduler.schedule(started, PRIORITY_FEEDS, 'stop', self.scheduler.stop)
+        with self.assertLogs('bot_daemon', level='ERROR'):
+            self.scheduler.run()
+
+        self.assertEqual(self.executed, ['next'])
+        run_at, _, _, name, _ = self.scheduler.queue[0]
+        self.assertEqual(name, 'fail')
+        self.assertGreaterEqual(run_at, started + 300)
+
+
+class NextSlotTimeTest(unittest.TestCase):
+    """next_slot_time"""
+
+    def test_picks_next_slot_today_or_tomorrow(self):
+        now = datetime(2024, 5, 1, 12, 30, tzinfo=TOKYO)
+
+        self.assertEqual(next_slot_time(['09:00', '13:00', '21:00'], TOKYO, now),
+                         datetime(2024, 5, 1, 13, 0, tzinfo=TOKYO).timestamp())
+        self.assertEqual(next_slot_time(['09:00', '12:30'], TOKYO, now),
+                         datetime(2024, 5, 2, 9, 0, tzinfo=TOKYO).timestamp())
+
+
+if __name__ == "__main__":
+    unittest.main()
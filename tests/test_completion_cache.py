@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+OpenAI生成結果キャッシュのテスト（未使用・使用済みの払い出し、有効期限、容量上限、再利用）
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clock import VirtualClock  # noqa: E402
+from completion_cache import CompletionCache, completion_key  # noqa: E402
+
+REQUEST = {'model': 'gpt-3.5-turbo', 'messages': [{'role': 'user', 'content': 'プロンプト'}], 'temperature': 0.7}
+
+
+class CompletionCacheTest(unittest.TestCase):
+    """CompletionCache"""
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.cache_file = os.path.join(self.workdir.name, 'completion_cache.json')
+        self.clock = VirtualClock(datetime(2024, 5, 1, 9, 0))
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def create_cache(self, **kwargs):
+        return CompletionCache(cache_file=self.cache_file, clock=self.clock, **kwargs)
+
+    def test_key_ignores_candidate_count_and_stream_flag(self):
+        key = completion_key(REQUEST)
+
+        self.assertEqual(completion_key(dict(REQUEST, n=5, stream=True)), key)
+        self.assertNotEqual(completion_key(dict(REQUEST, temperature=0.9)), key)
+
+    def test_unused_results_are_handed_out_once_and_persist(self):
+        cache = self.create_cache()
+        cache.put('k', ['a', 'b', 'c'], used=['x'])
+
+        self.assertEqual(cache.take('k', 2), ['a', 'b'])
+        reloaded = self.create_cache()
+        self.assertEqual(reloaded.take('k', 2), ['c'])
+        self.assertEqual(reloaded.take('k', 2), [])
+        self.assertEqual(reloaded.stats(), {'keys': 1, 'unused': 0, 'used': 4})
+
+    def test_put_returns_taken_results_to_unused(self):
+        cache = self.create_cache()
+        cache.put('k', ['a', 'b'])
+        taken = cache.take('k', 2)
+
+        # 採用しなかった結果をそのまま戻すと未使用に戻り、重複登録されない
+        cache.put('k', taken[1:])
+        self.assertEqual(cache.stats(), {'keys': 1, 'unused': 1, 'used': 1})
+        self.assertEqual(cache.take('k', 3), ['b'])
+
+    def test_results_expire_after_ttl(self):
+        cache = self.create_cache(ttl=3600)
+        cache.put('k', ['old'])
+        self.clock.advance(1800)
+        cache.put('k', ['new'])
+        self.clock.advance(1801)
+
+        self.assertEqual(cache.take('k', 2), ['new'])
+        self.clock.advance(3600)
+        self.assertEqual(self.create_cache(ttl=3600).take('k', 1), [])
+
+    def test_least_recently_used_keys_are_dropped(self):
+        cache = self.create_cache(max_keys=2)
+        cache.put('a', ['a1'])
+        cache.put('b', ['b1'])
+        cache.take('a', 0)
+        cache.put('c', ['c1'])
+
+        self.assertEqual(list(cache.entries), ['a', 'c'])
+
+    def test_total_limit_drops_used_results_first(self):
+        cache = self.create_cache(max_completions=3)
+        cache.put('a', ['a1'], used=['a0'])
+        cache.put('b', ['b1', 'b2'])
+
+        self.assertEqual(cache.stats(), {'keys': 2, 'unused': 3, 'used': 0})
+        cache.put('c', ['c1'])
+        self.assertEqual(cache.stats()['unused'], 3)
+        self.assertNotIn('a', cache.entries)
+
+    def test_replay_reuses_oldest_used_results(self):
+        cache = self.create_cache(replay=True)
+        cache.put('k', ['a'], used=['b', 'c'])
+
+        self.assertEqual(cache.take('k', 2), ['a', 'b'])
+        self.assertEqual(cache.take('k', 2), ['c', 'a'])
+        self.assertEqual(self.create_cache().take('k', 2), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+投稿候補プールのテスト（トピックの重み付き巡回・取り出し時の重複破棄）
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from content_pool import ContentPool  # noqa: E402
+
+
+def candidate(topic, index, score=0.85):
+    """テスト用候補"""
+    text = f"{topic}の候補{index}"
+    return {'topic': topic, 'content': text, 'base_content': text, 'quality_score': score}
+
+
+class ContentPoolTest(unittest.TestCase):
+    """ContentPool.pop_next"""
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.pool = ContentPool(os.path.join(self.workdir.name, 'content_pool.json'))
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def test_rotates_topics_and_takes_best_score_within_topic(self):
+        self.pool.add_candidates([candidate('A', i, 0.9 + i / 100) for i in range(3)]
+                                 + [candidate('B', i, 0.8) for i in range(3)])
+
+        popped = [self.pool.pop_next(0.8) for _ in range(4)]
+        self.assertEqual([entry['topic'] for entry in popped], ['A', 'B', 'A', 'B'])
+        self.assertEqual(popped[0]['content'], 'Aの候補2')
+        self.assertEqual(popped[2]['content'], 'Aの候補1')
+        self.assertNotIn('pool_key', popped[0])
+
+    def test_weights_share_of_pops(self):
+        self.pool.add_candidates([candidate(topic, i) for topic in ('A', 'B') for i in range(20)])
+        weights = {'A': 3.0, 'B': 1.0}
+
+        counts = Counter(self.pool.pop_next(0.8, weights)['topic'] for _ in range(8))
+        self.assertEqual(counts, {'A': 6, 'B': 2})
+
+    def test_rotation_persists_across_instances(self):
+        self.pool.add_candidates([candidate(topic, i) for topic in ('A', 'B') for i in range(3)])
+        first = self.pool.pop_next(0.8)['topic']
+
+        reopened = ContentPool(self.pool.pool_file)
+        self.assertNotEqual(reopened.pop_next(0.8)['topic'], first)
+
+    def test_low_score_topics_are_skipped(self):
+        self.pool.add_candidates([candidate('A', 0, 0.5), candidate('B', 0, 0.9)])
+
+        self.assertEqual(self.pool.pop_next(0.8)['topic'], 'B')
+        self.assertIsNone(self.pool.pop_next(0.8))
+        self.assertEqual(self.pool.size(), 1)
+
+    def test_duplicates_are_discarded_on_pop(self):
+        self.pool.add_candidates([candidate('A', 0, 0.95), candidate('A', 1, 0.9), candidate('B', 0, 0.85)])
+
+        entry = self.pool.pop_next(0.8, is_duplicate=lambda entry: entry['topic'] == 'A')
+        self.assertEqual(entry['topic'], 'B')
+        self.assertEqual(self.pool.size(), 0)
+
+    def test_add_candidates_skips_whitespace_variants(self):
+        added = self.pool.add_candidates([candidate('A', 0), dict(candidate('A', 0), base_content='Aの 候補0')])
+        self.assertEqual(added, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+投稿済みコンテンツ重複ストアのテスト（リングバッファ・Bloomフィルターの永続化・破損時の復旧・旧形式照合）
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dedup_store import BloomFilter, ContentHashStore, RingBufferStore  # noqa: E402
+
+
+def digest(index):
+    """テスト用ダイジェスト"""
+    return hashlib.md5(f"投稿{index}".encode()).digest()
+
+
+class DedupStoreTest(unittest.TestCase):
+    """RingBufferStore / BloomFilter / ContentHashStore"""
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.ring_file = os.path.join(self.workdir.name, 'content_hashes.ring')
+        self.bloom_file = os.path.join(self.workdir.name, 'content_hashes.bloom')
+        self.legacy_file = os.path.join(self.workdir.name, 'content_hashes.json')
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def create_store(self, capacity=4):
+        return ContentHashStore(ring_file=self.ring_file, bloom_file=self.bloom_file, capacity=capacity,
+                                bloom_capacity=1000, legacy_file=self.legacy_file)
+
+    def test_ring_persists_in_insertion_order_and_evicts_oldest(self):
+        ring = RingBufferStore(self.ring_file, capacity=3)
+        for i in range(5):
+            ring.append(digest(i))
+
+        reloaded = RingBufferStore(self.ring_file, capacity=3)
+        self.assertEqual(reloaded.recent(), [digest(2), digest(3), digest(4)])
+        self.assertNotIn(digest(1), reloaded)
+        self.assertFalse(os.path.exists(f"{self.ring_file}.tmp"))
+
+    def test_ring_capacity_change_keeps_newest(self):
+        ring = RingBufferStore(self.ring_file, capacity=4)
+        for i in range(6):
+            ring.append(digest(i))
+
+        shrunk = RingBufferStore(self.ring_file, capacity=2)
+        self.assertEqual(shrunk.recent(), [digest(4), digest(5)])
+        shrunk.append(digest(6))
+        self.assertEqual(RingBufferStore(self.ring_file, capacity=2).recent(), [digest(5), digest(6)])
+
+        grown = RingBufferStore(self.ring_file, capacity=5)
+        grown.append(digest(7))
+        self.assertEqual(RingBufferStore(self.ring_file, capacity=5).recent(), [digest(5), digest(6), digest(7)])
+
+    def test_bloom_persists_across_instances(self):
+        bloom = BloomFilter(self.bloom_file, capacity=1000)
+        for i in range(50):
+            bloom.add(digest(i))
+
+        reloaded = BloomFilter(self.bloom_file, capacity=1000)
+        self.assertEqual(reloaded.count, 50)
+        self.assertTrue(all(digest(i) in reloaded for i in range(50)))
+        # 設定が異なる場合は作り直し
+        self.assertEqual(BloomFilter(self.bloom_file, capacity=2000).count, 0)
+
+    def test_store_remembers_digests_after_ring_eviction(self):
+        store = self.create_store(capacity=2)
+        for i in range(5):
+            store.add(digest(i))
+
+        reloaded = self.create_store(capacity=2)
+        self.assertEqual(len(reloaded.ring), 2)
+        self.assertTrue(all(digest(i) in reloaded for i in range(5)))
+        self.assertNotIn(digest(99), reloaded)
+
+    def test_truncated_files_are_reinitialized(self):
+        store = self.create_store()
+        store.add(digest(0))
+        for path, size in ((self.ring_file, 10), (self.bloom_file, 20)):
+            with open(path, 'r+b') as f:
+                f.truncate(size)
+
+        with self.assertLogs('dedup_store', level='WARNING'):
+            reloaded = self.create_store()
+        self.assertNotIn(digest(0), reloaded)
+        reloaded.add(digest(1))
+        self.assertIn(digest(1), self.create_store())
+
+    def test_truncated_ring_body_is_reinitialized(self):
+        ring = RingBufferStore(self.ring_file, capacity=4)
+        ring.append(digest(0))
+        size = os.path.getsize(self.ring_file)
+        with open(self.ring_file, 'r+b') as f:
+            f.truncate(size - 1)
+
+        with self.assertLogs('dedup_store', level='WARNING'):
+            reloaded = RingBufferStore(self.ring_file, capacity=4)
+        self.assertEqual(len(reloaded), 0)
+        self.assertEqual(os.path.getsize(self.ring_file), size)
+
+    def test_legacy_prefix_digests_are_matched(self):
+        content = "旧形式で投稿済みの本文。" * 20
+        with open(self.legacy_file, 'w') as f:
+            json.dump([hashlib.md5(content[:100].encode()).hexdigest()], f)
+
+        store = self.create_store()
+        self.assertTrue(store.contains_legacy(content))
+        # 先頭100文字が同じなら末尾が異なっても一致（旧形式の判定方法）
+        self.assertTrue(store.contains_legacy(content[:100] + "末尾だけ違う"))
+        self.assertFalse(store.contains_legacy("別の本文"))
+
+    def test_broken_legacy_file_is_ignored(self):
+        with open(self.legacy_file, 'w') as f:
+            f.write('["zz", ')
+
+        self.assertFalse(self.create_store().contains_legacy("本文"))
+
+
+if __name__ == "__main__":
+    unittest.main()
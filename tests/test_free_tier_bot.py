@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+FreeTierOptimizedBot のテスト（生成結果キャッシュへの返却・フィード見出しの扱い・重複判定の並行実行）
+
+OpenAI 呼び出しは応答を返すだけのテスト用オブジェクトに差し替え、ネットワークには接続しない
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from completion_cache import completion_key  # noqa: E402
+from free_tier_bot import FreeTierOptimizedBot  # noqa: E402
+from identity_cache import IdentityCache, credential_fingerprint  # noqa: E402
+from rate_limiter import RateLimiter  # noqa: E402
+
+CREDENTIALS = {
+    'bearer_token': 'test',
+    'consumer_key': 'test',
+    'consumer_secret': 'test',
+    'access_token': 'test',
+    'access_token_secret': 'test',
+}
+
+
+def setUpModule():
+    # configure_logging が作業ディレクトリに実行ログを作らないようにする
+    logging.getLogger().addHandler(logging.NullHandler())
+
+
+class FakeChatCompletion:
+    """ChatCompletion.create の代替（呼び出しを記録し、毎回異なる本文を返す）"""
+
+    def __init__(self, suffix=''):
+        self.requests = []
+        self.suffix = suffix
+
+    def create(self, n=1, **request):
+        self.requests.append(request)
+        texts = [f"会議前に決めることを{len(self.requests)}-{i}個書き出す。議論の脱線が減り30分が15分に短縮できる。{self.suffix}"
+                 for i in range(n)]
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=text)) for text in texts],
+            usage={'prompt_tokens': 100, 'completion_tokens': 50 * n, 'total_tokens': 100 + 50 * n}
+        )
+
+
+class FixedScorer:
+    """常に同じスコアを返す採点器"""
+
+    def score(self, content, topic_info):
+        return 0.9
+
+
+class FreeTierBotTestCase(unittest.TestCase):
+    """一時ディレクトリに状態を置いたBot"""
+
+    quality_scorer = None
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        # 認証確認（get_me）を省略
+        IdentityCache(os.path.join(self.workdir.name, 'identity_cache.json')).store(
+            credential_fingerprint(CREDENTIALS), 1, 'test')
+        self.bot = FreeTierOptimizedBot(
+            credentials=CREDENTIALS,
+            state_dir=self.workdir.name,
+            rate_limiter=RateLimiter(state_file=None),
+            quality_scorer=self.quality_scorer
+        )
+        self.bot.STREAM_GENERATION = False
+        self.chat = FakeChatCompletion()
+        self.bot.openai_module = SimpleNamespace(ChatCompletion=self.chat)
+        self.topic = self.bot.PREMIUM_TOPICS[0]
+
+    def tearDown(self):
+        self.bot.close()
+        self.workdir.cleanup()
+
+
+class FeedContextCacheTest(FreeTierBotTestCase):
+    """フィード見出しと生成結果キャッシュ"""
+
+    def test_headlines_are_sent_but_not_part_of_cache_key(self):
+        self.bot.feed_headlines = ['見出しA']
+        first = self.bot.request_completions(self.topic)
+
+        self.assertEqual(len(self.chat.requests), 1)
+        self.assertIn('見出しA', self.chat.requests[0]['messages'][-1]['content'])
+
+        # 見出しが更新されても先読み済みの結果を払い出す
+        self.bot.feed_headlines = ['見出しB']
+        second = self.bot.request_completions(self.topic)
+        self.assertEqual(len(self.chat.requests), 1)
+        self.assertEqual(len(second), self.bot.CANDIDATES_PER_REQUEST)
+        self.assertFalse(set(first) & set(second))
+
+    def test_prompt_without_headlines(self):
+        self.bot.request_completions(self.topic)
+
+        self.assertEqual(self.chat.requests[0]['messages'][-1]['content'], self.topic['prompt'])
+
+
+class UnusedCandidateCacheTest(FreeTierBotTestCase):
+    """採用しなかった候補の生成結果キャッシュへの返却"""
+
+    quality_scorer = FixedScorer()
+
+    def test_unused_candidates_return_raw_completions_to_cache(self):
+        # 投稿文字数の上限を超え、候補作成時に切り詰められる生成結果
+        self.chat.suffix = "さらに毎回の会議の最後に決定事項と担当者を読み上げて確認する。" * 5
+        self.bot.PREMIUM_TOPICS = [self.topic]
+
+        adopted = self.bot.generate_premium_content()
+        self.assertNotEqual(adopted['base_content'], adopted['raw_content'])
+
+        entry = self.bot.completion_cache.entries[completion_key(self.bot.build_completion_request(self.topic))]
+        returned = {item['text'] for item in entry['unused']}
+        generated = {f"会議前に決めることを1-{i}個書き出す。議論の脱線が減り30分が15分に短縮できる。{self.chat.suffix}"
+                     for i in range(6)}
+        self.assertEqual(returned, generated - {adopted['raw_content']})
+        self.assertEqual([item['text'] for item in entry['used']], [adopted['raw_content']])
+
+
+class DuplicateCheckTest(FreeTierBotTestCase):
+    """重複判定と記録の直列化"""
+
+    def test_concurrent_checks_record_content_once(self):
+        content = "会議開始前に今日決める3つのことを書く。議論の脱線が減り30分が15分に短縮できる。 #効率化 #会議術"
+        barrier = threading.Barrier(8)
+        results = []
+
+        def worker():
+            barrier.wait()
+            results.append(self.bot.check_content_duplicate(content))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(results), [False] + [True] * 7)
+        self.assertEqual(len(self.bot.get_near_duplicate_index()), 1)
+        self.assertEqual(len(self.bot.content_hash_store.ring), 1)
+
+    def test_recorded_post_is_detected_with_other_hashtags(self):
+        content = "会議開始前に今日決める3つのことを書く。議論の脱線が減り30分が15分に短縮できる。"
+        self.bot.record_posted(f"{content} #効率化 #会議術")
+
+        self.assertTrue(self.bot.check_content_duplicate(f"{content} #生産性 #時短術", record=False))
+
+
+if __name__ == "__main__":
+    unittest.main()
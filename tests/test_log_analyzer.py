@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+実行ログ増分解析のテスト（複数回のローテーションをまたぐ集計）
+
+使い方: python -m pytest tests / python -m unittest discover tests
+"""
+
+import logging
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_analyzer import LogAnalyzer  # noqa: E402
+from logging_setup import SegmentedFileHandler  # noqa: E402
+
+
+class LogAnalyzerRotationTest(unittest.TestCase):
+    """ローテーションをまたいだ増分解析"""
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.log_file = os.path.join(self.workdir.name, 'bot_execution.log')
+        self.state_file = os.path.join(self.workdir.name, 'log_analytics.json')
+        self.iteration = 0
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def write_runs(self, count, max_bytes=2000, compress=True, backup_count=30):
+        """実行count回分のログを書き込み（max_bytes ごとにローテーション）"""
+        handler = SegmentedFileHandler(self.log_file, max_bytes=max_bytes, backup_count=backup_count,
+                                       rotate_daily=False, compress=compress)
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        logger = logging.getLogger('bot')
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        logger.addHandler(handler)
+        try:
+            for _ in range(count):
+                self.iteration += 1
+                # 各行に通し番号を含め、セグメント先頭が同一ミリ秒でも区別できるようにする
+                logger.info(f"[{self.iteration}] 🎨 プレミアムコンテンツ準備中...")
+                logger.info(f"[{self.iteration}] ✅ 高品質ツイート投稿成功!")
+                logger.info(f"[{self.iteration}] ⏱️ 実行時間: 0.5秒")
+        finally:
+            logger.removeHandler(handler)
+            handler.close()
+
+    def analyze(self):
+        """状態ファイルを引き継いで解析（実行毎に別プロセスで動く監視ツールを模擬）"""
+        return LogAnalyzer(self.log_file, self.state_file).update()
+
+    def segment_count(self):
+        """退避済みセグメント数"""
+        return len(LogAnalyzer(self.log_file, self.state_file).segment_paths())
+
+    def test_counts_every_segment_across_multiple_rotations(self):
+        for count in (5, 5, 30):
+            before = self.segment_count()
+            self.write_runs(count)
+            self.analyze()
+
+        # 最後の書き込みで複数回ローテーションしていること
+        self.assertGreater(self.segment_count() - before, 1)
+        state = LogAnalyzer(self.log_file, self.state_file).state
+        self.assertEqual(state['counters']['posts'], 40)
+        self.assertEqual(state['runs'], 40)
+        self.assertEqual(state['counters']['errors'], 0)
+
+    def test_uncompressed_segments(self):
+        for count in (3, 25, 3):
+            self.write_runs(count, compress=False)
+            self.analyze()
+
+        state = LogAnalyzer(self.log_file, self.state_file).state
+        self.assertEqual(state['counters']['posts'], 31)
+        self.assertEqual(state['runs'], 31)
+
+    def test_no_double_count_without_rotation(self):
+        self.write_runs(3, max_bytes=0)
+        self.analyze()
+        self.analyze()
+        self.write_runs(2, max_bytes=0)
+        self.analyze()
+
+        state = LogAnalyzer(self.log_file, self.state_file).state
+        self.assertEqual(state['counters']['posts'], 5)
+        self.assertEqual(state['rotations'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
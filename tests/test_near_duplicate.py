@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+類似コンテンツ検出インデックスのテスト（MinHash閾値・正規化・永続化・件数上限）
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from near_duplicate import NearDuplicateIndex, optimal_bands  # noqa: E402
+
+BASE = "会議開始前に今日決める3つのことをホワイトボードに書く。議論が脱線した時の軌道修正が劇的に早くなる。"
+UNRELATED = "毎朝5分間で今日の最重要タスクを1つ決める習慣。緊急の仕事に追われてもこれだけは必ず終わらせる。"
+
+
+class NearDuplicateIndexTest(unittest.TestCase):
+    """NearDuplicateIndex"""
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.index_file = os.path.join(self.workdir.name, 'near_duplicate_index.jsonl')
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def create_index(self, **kwargs):
+        return NearDuplicateIndex(index_file=self.index_file, **kwargs)
+
+    def test_hashtags_urls_and_spacing_are_ignored(self):
+        index = self.create_index()
+        index.add(f"{BASE} #効率化 #会議術")
+
+        match = index.query(f"{BASE.replace('。', '。 ')} #生産性 https://example.com/a")
+        self.assertIsNotNone(match)
+        self.assertEqual(match[1], 1.0)
+
+    def test_small_edit_matches_and_unrelated_text_does_not(self):
+        index = self.create_index()
+        index.add(BASE)
+
+        self.assertIsNotNone(index.query(BASE.replace('劇的に', 'かなり')))
+        self.assertIsNone(index.query(UNRELATED))
+
+    def test_threshold_controls_matches(self):
+        edited = BASE[:30] + "参加者全員で共有すると会議の時間が半分になる。"
+        similarity = None
+        for threshold in (0.3, 0.95):
+            index = NearDuplicateIndex(index_file=os.path.join(self.workdir.name, f'{threshold}.jsonl'),
+                                       threshold=threshold)
+            index.add(BASE)
+            match = index.query(edited)
+            if threshold == 0.3:
+                self.assertIsNotNone(match)
+                similarity = match[1]
+            else:
+                self.assertIsNone(match)
+        self.assertLess(similarity, 0.95)
+
+    def test_signatures_persist_and_bad_lines_are_skipped(self):
+        index = self.create_index()
+        entry_id = index.add(BASE)
+        with open(self.index_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'sig': index.encode(index.signature(UNRELATED))}) + '\n')
+            f.write('3\n')
+            f.write('{"id": 9, "si')
+
+        reloaded = self.create_index()
+        self.assertEqual(len(reloaded), 1)
+        self.assertEqual(reloaded.query(BASE)[0], entry_id)
+        self.assertIsNone(reloaded.query(UNRELATED))
+
+    def test_oldest_entries_are_evicted_and_file_compacted(self):
+        index = self.create_index(max_entries=2)
+        texts = [BASE, UNRELATED, "週1回の振り返りで改善点を1つだけ決めると、チームの作業時間が4割短縮できる。"]
+        for text in texts * 2:
+            index.add(text)
+
+        self.assertEqual(len(index), 2)
+        self.assertIsNone(index.query(texts[0]))
+        self.assertIsNotNone(index.query(texts[2]))
+        self.assertLessEqual(index.file_lines, 4)
+        self.assertEqual(len(self.create_index(max_entries=2)), 2)
+
+    def test_concurrent_adds_and_queries(self):
+        index = self.create_index(max_entries=50)
+        texts = [f"{i}番目の投稿。{BASE[i % 10:]}{UNRELATED[:i % 7]}" for i in range(80)]
+        errors = []
+
+        def worker(chunk):
+            try:
+                for text in chunk:
+                    index.add(text)
+                    index.query(text)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(texts[i::4],)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(index), 50)
+        self.assertEqual(len(self.create_index(max_entries=50)), 50)
+
+    def test_optimal_bands_divide_signature(self):
+        for threshold in (0.5, 0.8, 0.9):
+            bands, rows = optimal_bands(threshold, 64)
+            self.assertEqual(bands * rows, 64)
+        # 閾値が高いほど1バンドの行数は多い
+        self.assertLessEqual(optimal_bands(0.5, 64)[1], optimal_bands(0.9, 64)[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
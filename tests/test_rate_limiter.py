@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+レート制限管理のテスト（トークンバケットの補充・レート制限ヘッダー・見送り・状態の引き継ぎ）
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rate_limiter import RateLimiter  # noqa: E402
+
+NOW = 1_700_000_000.0
+# 1時間に4回（15分で1トークン補充）
+LIMITS = {'create_tweet': (4, 3600)}
+
+
+class RateLimiterTest(unittest.TestCase):
+    """RateLimiter"""
+
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.state_file = os.path.join(self.workdir.name, 'rate_limits.json')
+        self.limiter = RateLimiter(self.state_file, LIMITS)
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def drain(self, account='default'):
+        for _ in range(4):
+            self.assertTrue(self.limiter.acquire('create_tweet', account, now=NOW)[0])
+
+    def test_bucket_empties_and_refills_over_window(self):
+        self.drain()
+
+        allowed, earliest = self.limiter.acquire('create_tweet', now=NOW)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(earliest, NOW + 900)
+        self.assertFalse(self.limiter.acquire('create_tweet', now=NOW + 899)[0])
+        self.assertTrue(self.limiter.acquire('create_tweet', now=NOW + 900)[0])
+        # 補充は容量で頭打ち
+        self.assertAlmostEqual(self.limiter.bucket('create_tweet', 'default', NOW + 100000)['tokens'], 4)
+
+    def test_accounts_have_separate_buckets(self):
+        self.drain('a')
+
+        self.assertFalse(self.limiter.acquire('create_tweet', 'a', now=NOW)[0])
+        self.assertTrue(self.limiter.acquire('create_tweet', 'b', now=NOW)[0])
+
+    def test_exhausted_headers_block_until_reset_then_resume(self):
+        headers = {'X-Rate-Limit-Remaining': '0', 'X-Rate-Limit-Reset': str(int(NOW + 600))}
+
+        earliest = self.limiter.update_from_headers('create_tweet', 'default', headers, now=NOW)
+        self.assertEqual(earliest, NOW + 600)
+        self.assertFalse(self.limiter.acquire('create_tweet', now=NOW + 599)[0])
+        # リセット後はサーバー側の枠回復に合わせて即再開
+        self.assertTrue(self.limiter.acquire('create_tweet', now=NOW + 600)[0])
+
+    def test_remaining_header_caps_tokens(self):
+        headers = {'x-user-limit-24hour-remaining': '1', 'x-user-limit-24hour-reset': str(NOW + 86400)}
+
+        self.assertEqual(self.limiter.update_from_headers('create_tweet', 'default', headers, now=NOW), NOW)
+        self.assertTrue(self.limiter.acquire('create_tweet', now=NOW)[0])
+        self.assertFalse(self.limiter.acquire('create_tweet', now=NOW)[0])
+
+    def test_missing_or_invalid_headers_leave_bucket_unchanged(self):
+        for headers in (None, {}, {'x-rate-limit-remaining': 'abc'}):
+            self.assertEqual(self.limiter.update_from_headers('create_tweet', 'default', headers, now=NOW), NOW)
+        self.drain()
+
+    def test_429_without_headers_falls_back_to_defer(self):
+        # ヘッダーなしの429: 呼び出し側は defer で15分窓の終了まで見送る
+        self.assertEqual(self.limiter.update_from_headers('create_tweet', 'default', {}, now=NOW), NOW)
+        blocked_until = self.limiter.defer('create_tweet', 'default', 900, now=NOW)
+
+        self.assertEqual(blocked_until, NOW + 900)
+        self.assertEqual(self.limiter.acquire('create_tweet', now=NOW + 10), (False, NOW + 900))
+        # より短い見送りで解除時刻が早まらない
+        self.assertEqual(self.limiter.defer('create_tweet', 'default', 60, now=NOW), NOW + 900)
+
+    def test_state_carries_over_to_next_run(self):
+        self.drain()
+        self.limiter.defer('create_tweet', 'default', 1800, now=NOW)
+        self.limiter.save()
+
+        reloaded = RateLimiter(self.state_file, LIMITS)
+        self.assertEqual(reloaded.earliest_allowed('create_tweet', now=NOW), NOW + 1800)
+        self.assertFalse(os.path.exists(f"{self.state_file}.tmp"))
+
+    def test_broken_state_file_starts_fresh(self):
+        with open(self.state_file, 'w', encoding='utf-8') as f:
+            f.write('{"default:create_tweet": ')
+
+        self.assertTrue(RateLimiter(self.state_file, LIMITS).acquire('create_tweet', now=NOW)[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+ストリーミング生成の打ち切り処理のテスト（加重文字数・文末での切り詰め・上限到達/見込み不足での打ち切り）
+"""
+
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stream_generation import collect_stream, truncate_to_budget, weighted_length  # noqa: E402
+
+
+def chunk(index, content=None, finish_reason=None):
+    """stream=True 応答のチャンク"""
+    delta = {'content': content} if content else {}
+    choice = SimpleNamespace(index=index, delta=delta, get={'finish_reason': finish_reason}.get)
+    return SimpleNamespace(choices=[choice])
+
+
+class ClosableStream:
+    """close() で受信を止められるストリーム"""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.received = 0
+        self.closed = False
+
+    def __iter__(self):
+        for item in self.chunks:
+            if self.closed:
+                return
+            self.received += 1
+            yield item
+
+    def close(self):
+        self.closed = True
+
+
+class PessimisticScorer:
+    """特定の文を含む候補の見込みスコアを低く返す採点器"""
+
+    def optimistic_score(self, text, remaining, topic_info):
+        return 0.1 if '宣伝' in text else 0.95
+
+
+class WeightedLengthTest(unittest.TestCase):
+    """weighted_length / truncate_to_budget"""
+
+    def test_cjk_and_fullwidth_count_double(self):
+        self.assertEqual(weighted_length('abc 123'), 7)
+        self.assertEqual(weighted_length('会議'), 4)
+        self.assertEqual(weighted_length('ｱ！'), 4)
+        self.assertEqual(weighted_length('Aの—'), 4)
+
+    def test_truncate_prefers_sentence_end(self):
+        text = '最初の文。二番目の文！三番目の文'
+
+        self.assertEqual(truncate_to_budget(text, 100), text)
+        self.assertEqual(truncate_to_budget(text, 22), '最初の文。二番目の文！')
+        self.assertEqual(truncate_to_budget(text, 12), '最初の文。')
+
+    def test_truncate_without_sentence_end_adds_suffix(self):
+        truncated = truncate_to_budget('区切りのない長い文章' * 3, 20)
+
+        self.assertEqual(truncated, '区切りのない長い...')
+        self.assertLessEqual(weighted_length(truncated), 20)
+
+
+class CollectStreamTest(unittest.TestCase):
+    """collect_stream"""
+
+    def test_finished_choices_are_assembled_with_usage(self):
+        chunks = [chunk(0, '一つ目'), chunk(1, '二つ目'), chunk(0, '。'), chunk(0, finish_reason='stop'),
+                  chunk(1, finish_reason='stop')]
+
+        result = collect_stream(chunks, 2, 280, 0.8, prompt_tokens=10)
+        self.assertEqual(result.texts, ['一つ目。', '二つ目'])
+        self.assertEqual(result.usage, {'prompt_tokens': 10, 'completion_tokens': 3, 'total_tokens': 13})
+        self.assertFalse(result.aborted)
+
+    def test_stream_is_closed_when_every_candidate_hits_budget(self):
+        stream = ClosableStream([chunk(0, '短い文。'), chunk(0, '続きの文章が長く続く'), chunk(0, '受信しない')])
+
+        result = collect_stream(stream, 1, 20, 0.8)
+        self.assertTrue(stream.closed)
+        self.assertEqual(stream.received, 2)
+        self.assertTrue(result.aborted)
+        self.assertEqual((result.texts, result.truncated), (['短い文。'], 1))
+
+    def test_low_prospect_candidates_are_rejected_mid_stream(self):
+        stream = ClosableStream([chunk(0, '今すぐ試せる手順。'), chunk(1, 'これは宣伝です。'), chunk(1, '受信しない'),
+                                 chunk(0, finish_reason='stop'), chunk(1, 'これも受信しない')])
+
+        result = collect_stream(stream, 2, 280, 0.8, PessimisticScorer(), {})
+        self.assertEqual(result.texts, ['今すぐ試せる手順。'])
+        self.assertEqual(result.rejected, 1)
+        self.assertTrue(result.aborted)
+        self.assertEqual(stream.received, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
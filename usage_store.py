@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+使用量データストア
+- JsonUsageStore: 従来の usage_data.json（一時ファイル経由のアトミック置換）
+- SqliteUsageStore: SQLite WAL（カウンター単一行更新・投稿履歴は件数無制限で索引付き）
+- どちらも usage_data.json 互換形式でエクスポート可能（ワークフローのレポート・監視ツール用）
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Any, List, Optional
+
+COUNTER_FIELDS = ('daily_count', 'monthly_count', 'total_posts', 'quality_posts')
+STATE_FIELDS = ('current_date', 'current_month', 'system_start', 'last_reset', 'last_update')
+HISTORY_LIMIT = 50
+
+
+def write_json_atomic(path: str, data: Dict[str, Any]) -> None:
+    """一時ファイルに書き込んでから置換（書き込み途中のクラッシュで破損しない）"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class UsageStore(ABC):
+    """使用量ストア基底クラス"""
+
+    @abstractmethod
+    def load(self) -> Optional[Dict[str, Any]]:
+        """使用量データ読み込み（未作成ならNone）"""
+
+    @abstractmethod
+    def save(self, data: Dict[str, Any]) -> None:
+        """使用量データ全体の保存"""
+
+    @abstractmethod
+    def record_post(self, data: Dict[str, Any], post_record: Dict[str, Any]) -> None:
+        """投稿成功の記録（dataは更新済みのメモリ上データ）"""
+
+    def export_json(self, path: str) -> None:
+        """usage_data.json 互換形式でエクスポート"""
+        data = self.load()
+        if data is not None:
+            write_json_atomic(path, data)
+
+    def close(self) -> None:
+        """ストアを閉じる"""
+
+
+class JsonUsageStore(UsageStore):
+    """JSONファイルストア"""
+
+    def __init__(self, path: str = 'usage_data.json'):
+        self.path = path
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, data: Dict[str, Any]) -> None:
+        write_json_atomic(self.path, data)
+
+    def record_post(self, data: Dict[str, Any], post_record: Dict[str, Any]) -> None:
+        self.save(data)
+
+    def export_json(self, path: str) -> None:
+        if os.path.abspath(path) != os.path.abspath(self.path):
+            super().export_json(path)
+
+
+class SqliteUsageStore(UsageStore):
+    """SQLite WALストア"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS state (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+        CREATE TABLE IF NOT EXISTS counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS post_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT NOT NULL,
+            tweet_id TEXT,
+            quality_score REAL,
+            topic TEXT,
+            content_length INTEGER,
+            hashtags TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_post_history_timestamp ON post_history (timestamp);
+    """
+
+    def __init__(self, path: str = 'usage_data.db', legacy_json: Optional[str] = 'usage_data.json'):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(self.SCHEMA)
+
+        if legacy_json and self.is_empty():
+            legacy = JsonUsageStore(legacy_json).load()
+            if legacy:
+                self.import_data(legacy)
+
+    def is_empty(self) -> bool:
+        """未初期化判定"""
+        with self.lock:
+            return self.conn.execute('SELECT COUNT(*) FROM state').fetchone()[0] == 0
+
+    def import_data(self, data: Dict[str, Any]) -> None:
+        """既存JSONデータの取り込み（履歴含む）"""
+        self.save(data)
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            for record in data.get('post_history', []):
+                self.insert_history(record)
+            self.conn.execute('COMMIT')
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            state = dict(self.conn.execute('SELECT key, value FROM state'))
+            if not state:
+                return None
+            counters = dict(self.conn.execute('SELECT name, value FROM counters'))
+
+        data: Dict[str, Any] = {key: state.get(key) for key in STATE_FIELDS if key in state}
+        for name in COUNTER_FIELDS:
+            data[name] = counters.get(name, 0)
+        data['post_history'] = self.history(limit=HISTORY_LIMIT)
+        return data
+
+    def save(self, data: Dict[str, Any]) -> None:
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)',
+                [(key, data[key]) for key in STATE_FIELDS if key in data]
+            )
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO counters (name, value) VALUES (?, ?)',
+                [(name, data.get(name, 0)) for name in COUNTER_FIELDS]
+            )
+            self.conn.execute('COMMIT')
+
+    def record_post(self, data: Dict[str, Any], post_record: Dict[str, Any]) -> None:
+        with self.lock:
+            self.conn.execute('BEGIN IMMEDIATE')
+            self.conn.execute(
+                f"UPDATE counters SET value = value + 1 WHERE name IN ({','.join('?' * len(COUNTER_FIELDS))})",
+                COUNTER_FIELDS
+            )
+            self.insert_history(post_record)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO state (key, value) VALUES ('last_update', ?)",
+                (data.get('last_update'),)
+            )
+            self.conn.execute('COMMIT')
+
+    def insert_history(self, record: Dict[str, Any]) -> None:
+        """履歴1件追加（トランザクション内で呼び出す）"""
+        self.conn.execute(
+            'INSERT INTO post_history (timestamp, tweet_id, quality_score, topic, content_length, hashtags) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (
+                record.get('timestamp'), record.get('tweet_id'), record.get('quality_score'),
+                record.get('topic'), record.get('content_length'),
+                json.dumps(record.get('hashtags', []), ensure_ascii=False)
+            )
+        )
+
+    def history(self, since: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """投稿履歴取得（古い順、sinceはISO形式の下限時刻）"""
+        query = 'SELECT timestamp, tweet_id, quality_score, topic, content_length, hashtags FROM post_history'
+        params: List[Any] = []
+        if since:
+            query += ' WHERE timestamp >= ?'
+            params.append(since)
+        query += ' ORDER BY timestamp DESC, id DESC'
+        if limit:
+            query += ' LIMIT ?'
+            params.append(limit)
+
+        with self.lock:
+            rows = self.conn.execute(query, params).fetchall()
+
+        return [
+            {
+                'timestamp': timestamp,
+                'tweet_id': tweet_id,
+                'quality_score': quality_score,
+                'topic': topic,
+                'content_length': content_length,
+                'hashtags': json.loads(hashtags) if hashtags else []
+            }
+            for timestamp, tweet_id, quality_score, topic, content_length, hashtags in reversed(rows)
+        ]
+
+    def close(self) -> None:
+        with self.lock:
+            self.conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            self.conn.close()
+
+
+def create_usage_store(backend: Optional[str] = None, state_dir: str = '.') -> UsageStore:
+    """環境変数 USAGE_STORE (json / sqlite) に応じたストア生成"""
+    backend = (backend or os.getenv('USAGE_STORE', 'json')).lower()
+    json_path = os.path.join(state_dir, 'usage_data.json')
+    if backend == 'sqlite':
+        return SqliteUsageStore(os.path.join(state_dir, 'usage_data.db'), legacy_json=json_path)
+    if backend == 'json':
+        return JsonUsageStore(json_path)
+    raise ValueError(f"未対応の使用量ストア: {backend}")
+
+
+def main():
+    """usage_data.json 互換エクスポート"""
+    parser = argparse.ArgumentParser(description='使用量データのJSONエクスポート')
+    parser.add_argument('--backend', default=None, help='json / sqlite（省略時は USAGE_STORE）')
+    parser.add_argument('--state-dir', default='.', help='状態ファイルのディレクトリ')
+    parser.add_argument('--output', default='usage_data.json')
+    args = parser.parse_args()
+
+    store = create_usage_store(args.backend, args.state_dir)
+    try:
+        store.export_json(args.output)
+    finally:
+        store.close()
+    print(f"📤 使用量データをエクスポート: {args.output}")
+
+
+if __name__ == "__main__":
+    main()